@@ -0,0 +1,312 @@
+"""
+Загрузка CPU и памяти BMC во время нагрузочного теста.
+
+Источники:
+    RedfishDiagnosticsSource - Manager ManagerDiagnosticData (ProcessorStatistics,
+        MemoryStatistics; есть в bmcweb и в эмуляторе) или числовые метрики в Manager Oem;
+    SshProcSource - /proc/stat, /proc/meminfo и /proc/<pid>/stat процесса bmcweb по SSH (paramiko).
+
+BmcMonitor снимает показания источника с интервалом и в ту же секунду -
+текущие rps/перцентили locust, поэтому ряды выровнены по времени без
+постобработки. saturation_report() делит прогон на ступени нагрузки (по числу
+пользователей) и находит ступень, на которой bmcweb насыщается: rps перестает
+расти, CPU упирается в предел или p95 растет в разы.
+
+    python bmc_monitor.py reports/loadtest/saturation_bmc.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from statistics import mean, median
+
+DIAGNOSTIC_KEYS = {
+    'cpu_percent': ('ProcessorUtilizationPercent', 'CPUUtilization', 'CpuUtilization', 'CPUUtilizationPercent'),
+    'memory_percent': ('MemoryUtilizationPercent', 'MemoryUtilization'),
+}
+CSV_FIELDS = ('timestamp', 'users', 'rps', 'fail_rps', 'p50_ms', 'p95_ms', 'p99_ms',
+              'cpu_percent', 'memory_percent', 'process_cpu_percent', 'process_rss_bytes')
+
+
+class RedfishDiagnosticsSource:
+    """Загрузка BMC из Redfish: ManagerDiagnosticData, а если его нет - из Manager Oem"""
+
+    name = 'redfish'
+
+    def __init__(self, client, manager_path='/redfish/v1/Managers/bmc'):
+        self.client = client
+        self.manager_path = manager_path
+        self._diagnostics_path = None
+        self._oem = False
+
+    def _discover(self):
+        manager = self.client.get(self.manager_path, max_age=0).json()
+        link = manager.get('ManagerDiagnosticData', {}).get('@odata.id')
+        if link:
+            self._diagnostics_path = link
+        elif self._from_oem(manager.get('Oem') or {}):
+            # Oem у bmcweb есть всегда (вентиляторы, PID) - годится, только если в нем есть метрики загрузки
+            self._diagnostics_path = self.manager_path
+            self._oem = True
+        else:
+            known = ', '.join(name for names in DIAGNOSTIC_KEYS.values() for name in names)
+            raise RuntimeError(f"{self.manager_path}: нет ManagerDiagnosticData, "
+                               f"в Oem нет метрик загрузки ({known})")
+
+    def sample(self):
+        if self._diagnostics_path is None:
+            self._discover()
+        data = self.client.get(self._diagnostics_path, max_age=0).json()
+        if self._oem:
+            return self._from_oem(data.get('Oem', {}))
+        cpu = data.get('ProcessorStatistics', {})
+        memory = data.get('MemoryStatistics', {})
+        total = memory.get('TotalBytes')
+        used = memory.get('UsedBytes')
+        if used is None and total and memory.get('AvailableBytes') is not None:
+            used = total - memory['AvailableBytes']
+        top = (data.get('TopProcesses') or [{}])[0]
+        return {
+            'cpu_percent': (cpu.get('UserPercent') or 0) + (cpu.get('KernelPercent') or 0),
+            'memory_percent': used / total * 100 if total and used is not None else None,
+            'process_rss_bytes': top.get('ResidentSetSizeBytes'),
+        }
+
+    @staticmethod
+    def _from_oem(oem):
+        """Ищет известные ключи метрик на любом уровне вложенности Oem"""
+        found = {}
+        stack = [oem]
+        while stack:
+            item = stack.pop()
+            for key, value in item.items():
+                if isinstance(value, dict):
+                    stack.append(value)
+                    continue
+                for field, names in DIAGNOSTIC_KEYS.items():
+                    if key in names and isinstance(value, (int, float)):
+                        found.setdefault(field, value)
+        return found
+
+
+class SshProcSource:
+    """Загрузка BMC по SSH из /proc; соединение одно на весь прогон"""
+
+    name = 'ssh'
+    COMMAND = "cat /proc/stat /proc/meminfo; cat /proc/$(pidof -s {process})/stat 2>/dev/null"
+
+    def __init__(self, host, username, password, port=22, process='bmcweb', timeout=10):
+        self.host = host
+        self.username = username
+        self.password = password
+        self.port = port
+        self.process = process
+        self.timeout = timeout
+        self._ssh = None
+        self._last = None
+
+    def _connect(self):
+        import paramiko
+        self._ssh = paramiko.SSHClient()
+        self._ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        self._ssh.connect(self.host, port=self.port, username=self.username, password=self.password,
+                          timeout=self.timeout, look_for_keys=False, allow_agent=False)
+
+    def sample(self):
+        if self._ssh is None:
+            self._connect()
+        _, stdout, _ = self._ssh.exec_command(self.COMMAND.format(process=self.process), timeout=self.timeout)
+        return self.parse(stdout.read().decode(errors='replace'))
+
+    def parse(self, text):
+        cpu_total = cpu_idle = process_ticks = None
+        memory = {}
+        for line in text.splitlines():
+            fields = line.split()
+            if not fields:
+                continue
+            if fields[0] == 'cpu':
+                ticks = [int(value) for value in fields[1:]]
+                cpu_total, cpu_idle = sum(ticks), ticks[3] + (ticks[4] if len(ticks) > 4 else 0)
+            elif fields[0].endswith(':') and len(fields) >= 2:
+                memory[fields[0][:-1]] = int(fields[1]) * 1024
+            elif len(fields) > 23 and fields[1].startswith('('):
+                # /proc/<pid>/stat: utime и stime - поля 14 и 15, rss (в страницах) - 24
+                process_ticks = int(fields[13]) + int(fields[14])
+                memory['process_rss'] = int(fields[23]) * 4096
+
+        result = {'process_rss_bytes': memory.get('process_rss')}
+        if memory.get('MemTotal') and 'MemAvailable' in memory:
+            result['memory_percent'] = (1 - memory['MemAvailable'] / memory['MemTotal']) * 100
+        current = (cpu_total, cpu_idle, process_ticks)
+        if self._last and cpu_total is not None:
+            total_delta = cpu_total - self._last[0]
+            if total_delta > 0:
+                result['cpu_percent'] = (1 - (cpu_idle - self._last[1]) / total_delta) * 100
+                if process_ticks is not None and self._last[2] is not None:
+                    # Процент от одного ядра, как в top: строк cpuN в /proc/stat по числу ядер
+                    cores = max(1, text.count('\ncpu'))
+                    result['process_cpu_percent'] = (process_ticks - self._last[2]) / total_delta * 100 * cores
+        self._last = current
+        return result
+
+    def close(self):
+        if self._ssh is not None:
+            self._ssh.close()
+
+
+class BmcMonitor:
+    """
+    Поток, снимающий source.sample() раз в interval секунд.
+    load_stats - функция без аргументов, возвращающая текущие метрики нагрузки
+    (users, rps, p95_ms, ...) - они пишутся в ту же строку.
+    """
+
+    def __init__(self, source, interval=1.0, load_stats=None):
+        self.source = source
+        self.interval = interval
+        self.load_stats = load_stats
+        self.rows = []
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample_once(self):
+        row = {'timestamp': time.time()}
+        if self.load_stats is not None:
+            row.update(self.load_stats())
+        try:
+            row.update(self.source.sample())
+        except Exception as e:
+            self.errors += 1
+            row['error'] = str(e)
+        self.rows.append(row)
+        return row
+
+    def _run(self):
+        started = time.monotonic()
+        tick = 0
+        while not self._stop.is_set():
+            self.sample_once()
+            tick += 1
+            self._stop.wait(max(0.0, started + tick * self.interval - time.monotonic()))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='bmc-monitor', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        close = getattr(self.source, 'close', None)
+        if close:
+            close()
+
+    def write_csv(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(self.rows)
+
+
+def read_csv(path):
+    rows = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for record in csv.DictReader(f):
+            rows.append({key: float(value) if value not in ('', None) else None for key, value in record.items()})
+    return rows
+
+
+def saturation_report(rows, cpu_limit=90.0, latency_factor=3.0, min_gain=0.05):
+    """
+    Ступени нагрузки (строки с одинаковым числом пользователей) и точка насыщения:
+    первая ступень, где rps вырос меньше чем на min_gain при росте пользователей,
+    CPU BMC >= cpu_limit или p95 > latency_factor x p95 первой ступени.
+    """
+    steps = {}
+    for row in rows:
+        if row.get('users') and row.get('rps') is not None:
+            steps.setdefault(int(row['users']), []).append(row)
+
+    def avg(values):
+        values = [v for v in values if v is not None]
+        return mean(values) if values else None
+
+    table = []
+    for users, step_rows in sorted(steps.items()):
+        # Первая секунда ступени - переходный процесс, ее не учитываем, если есть другие
+        step_rows = step_rows[1:] or step_rows
+        table.append({
+            'users': users,
+            'samples': len(step_rows),
+            'rps': avg(r['rps'] for r in step_rows),
+            'p95_ms': median([r['p95_ms'] for r in step_rows if r.get('p95_ms') is not None] or [0]),
+            'cpu_percent': avg(r.get('cpu_percent') for r in step_rows),
+            'memory_percent': avg(r.get('memory_percent') for r in step_rows),
+        })
+
+    saturated_at = None
+    reason = None
+    for i, step in enumerate(table):
+        base = table[0]
+        if step['cpu_percent'] is not None and step['cpu_percent'] >= cpu_limit:
+            reason = f"CPU BMC {step['cpu_percent']:.0f}% >= {cpu_limit:.0f}%"
+        elif i and base['p95_ms'] and step['p95_ms'] > latency_factor * base['p95_ms']:
+            reason = f"p95 {step['p95_ms']:.0f} мс > {latency_factor:g} x {base['p95_ms']:.0f} мс"
+        elif i and table[i - 1]['rps'] and step['rps'] < table[i - 1]['rps'] * (1 + min_gain):
+            reason = f"rps не растет: {table[i - 1]['rps']:.1f} -> {step['rps']:.1f}"
+        if reason:
+            saturated_at = i
+            break
+
+    if saturated_at is None:
+        sustainable = table[-1] if table else None
+    else:
+        sustainable = table[saturated_at - 1] if saturated_at > 0 else None
+    return {
+        'steps': table,
+        'saturated': saturated_at is not None,
+        'saturation_users': table[saturated_at]['users'] if saturated_at is not None else None,
+        'reason': reason,
+        'max_sustainable_rps': sustainable['rps'] if sustainable else None,
+    }
+
+
+def print_report(report):
+    print(f"{'Польз.':>7} {'rps':>9} {'p95, мс':>9} {'CPU, %':>8} {'Память, %':>10}")
+    for step in report['steps']:
+        cpu = '-' if step['cpu_percent'] is None else f"{step['cpu_percent']:.1f}"
+        memory = '-' if step['memory_percent'] is None else f"{step['memory_percent']:.1f}"
+        print(f"{step['users']:7d} {step['rps'] or 0:9.1f} {step['p95_ms']:9.1f} {cpu:>8} {memory:>10}")
+    if report['saturated']:
+        print(f"Насыщение на {report['saturation_users']} пользователях: {report['reason']}")
+    else:
+        print("Насыщение не достигнуто")
+    if report['max_sustainable_rps'] is not None:
+        print(f"Устойчивая нагрузка: {report['max_sustainable_rps']:.1f} rps")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Отчет о насыщении BMC по CSV мониторинга нагрузки')
+    parser.add_argument('csv', help='CSV, записанный BmcMonitor (locust_saturation.py)')
+    parser.add_argument('--cpu-limit', type=float, default=90.0)
+    parser.add_argument('--latency-factor', type=float, default=3.0)
+    parser.add_argument('--json', help='Сохранить отчет в JSON')
+    args = parser.parse_args()
+
+    report = saturation_report(read_csv(args.csv), args.cpu_limit, args.latency_factor)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
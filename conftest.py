@@ -0,0 +1,53 @@
+"""
+Планирование тестов по ресурсам BMC.
+
+Тесты с маркером readonly берут разделяемую блокировку BMC, mutates_power -
+эксклюзивную. Блокировка - flock на файле, общем для всех процессов на агенте,
+поэтому при запуске через pytest-xdist (-n auto) readonly-тесты идут
+параллельно, а изменяющие питание ждут, пока BMC освободится, и сами никого
+не пускают. Тесты без маркеров не блокируются.
+
+    python -m pytest test-redfish.py -n auto --dist loadgroup
+"""
+import fcntl
+import hashlib
+import os
+import tempfile
+
+import pytest
+
+POWER_GROUP = "bmc-power"
+
+
+def bmc_lock_path(base_url):
+    digest = hashlib.sha1(base_url.encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"openbmc-{digest}.lock")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    # При --dist loadgroup все изменяющие питание тесты попадают на один воркер
+    # и выполняются в порядке объявления (включение, затем выключение)
+    for item in items:
+        if item.get_closest_marker("mutates_power") and not item.get_closest_marker("xdist_group"):
+            item.add_marker(pytest.mark.xdist_group(POWER_GROUP))
+
+
+@pytest.fixture(autouse=True)
+def bmc_lock(request):
+    """Разделяемая (readonly) или эксклюзивная (mutates_power) блокировка BMC на время теста"""
+    if request.node.get_closest_marker("mutates_power"):
+        mode = fcntl.LOCK_EX
+    elif request.node.get_closest_marker("readonly"):
+        mode = fcntl.LOCK_SH
+    else:
+        yield
+        return
+
+    base_url = request.getfixturevalue("base_url")
+    with open(bmc_lock_path(base_url), "a") as lock_file:
+        fcntl.flock(lock_file, mode)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,120 @@
+"""
+Поддельный ipmitool для CI: отвечает на команды, которые использует ipmi_sensors.py,
+данными датчиков из дерева эмулятора Redfish (Thermal: Temperatures и Fans).
+
+Поддерживаются: sdr info, sdr dump <файл>, sdr elist [full], sensor list,
+exec <файл>; глобальные опции -I/-H/-U/-P/-p/-L принимаются и игнорируются,
+-S <файл> читает SDR из локального кэша.
+
+Переменные окружения:
+    FAKE_IPMI_TREE       - JSON-дерево (по умолчанию redfish_mock_tree.json)
+    FAKE_IPMI_SDR_TIME   - "Most recent Addition" (смена значения = новый SDR)
+    FAKE_IPMI_SDR_DELAY  - задержка на чтение одной SDR-записи без кэша, с
+    FAKE_IPMI_LOG        - файл, куда дописывается строка на каждый запуск (= сессию)
+
+    OPENBMC_IPMITOOL="python fake_ipmitool.py" python -m pytest test-redfish.py
+"""
+import json
+import os
+import shlex
+import sys
+import time
+
+DEFAULT_TREE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'redfish_mock_tree.json')
+THERMAL_PATH = '/redfish/v1/Chassis/chassis/Thermal'
+
+# Redfish PhysicalContext -> IPMI entity ID
+CONTEXT_ENTITY = {'CPU': 3, 'SystemBoard': 7, 'Memory': 32, 'Fan': 29, 'Intake': 55, 'Exhaust': 64}
+
+GLOBAL_OPTIONS = {'-I', '-H', '-U', '-P', '-p', '-L', '-S', '-y', '-k', '-C'}
+
+
+def load_sensors():
+    """Записи SDR и текущие показания из ресурса Thermal дерева эмулятора"""
+    with open(os.getenv('FAKE_IPMI_TREE', DEFAULT_TREE), encoding='utf-8') as f:
+        thermal = json.load(f).get(THERMAL_PATH, {})
+    sensors = []
+    for item in thermal.get('Temperatures', []):
+        sensors.append({'name': item.get('MemberId') or item['Name'], 'reading': item.get('ReadingCelsius'),
+                        'unit': 'degrees C', 'context': item.get('PhysicalContext')})
+    for item in thermal.get('Fans', []):
+        sensors.append({'name': item.get('MemberId') or item['Name'], 'reading': item.get('Reading'),
+                        'unit': 'RPM', 'context': item.get('PhysicalContext')})
+    for number, sensor in enumerate(sensors, 1):
+        sensor['number'] = number
+        sensor['entity'] = f"{CONTEXT_ENTITY.get(sensor.pop('context'), 7)}.{number}"
+    return sensors
+
+
+def sdr_records(sdr_cache):
+    """SDR из кэша (-S) или "с BMC" - с задержкой на каждую запись"""
+    if sdr_cache:
+        with open(sdr_cache, encoding='utf-8') as f:
+            return json.load(f)['records']
+    sensors = load_sensors()
+    time.sleep(float(os.getenv('FAKE_IPMI_SDR_DELAY', '0')) * len(sensors))
+    return [{key: sensor[key] for key in ('name', 'number', 'entity', 'unit')} for sensor in sensors]
+
+
+def format_reading(sensor):
+    if sensor['reading'] is None:
+        return 'No Reading'
+    return f"{sensor['reading']:g} {sensor['unit']}"
+
+
+def run_command(args, sdr_cache):
+    readings = {sensor['name']: sensor for sensor in load_sensors()}
+    if args[:2] == ['sdr', 'info']:
+        # Get SDR Repository Info всегда идет к BMC, -S на нее не влияет
+        print(f"SDR Version                         : 0x51\n"
+              f"Record Count                        : {len(readings)}\n"
+              f"Free Space                          : 65535 bytes\n"
+              f"Most recent Addition                : {os.getenv('FAKE_IPMI_SDR_TIME', '01/01/2024 00:00:00')}\n"
+              f"Most recent Erase                   : Not Supported\n"
+              f"SDR overflow                        : no")
+    elif args[:2] == ['sdr', 'dump'] and len(args) == 3:
+        with open(args[2], 'w', encoding='utf-8') as f:
+            json.dump({'records': sdr_records(None)}, f)
+        print(f"Dumping Sensor Data Repository to '{args[2]}'")
+    elif args[:2] == ['sdr', 'elist']:
+        for record in sdr_records(sdr_cache):
+            sensor = readings.get(record['name'], dict(record, reading=None))
+            status = 'ok' if sensor['reading'] is not None else 'ns'
+            print(f"{record['name']:16} | {record['number']:02X}h | {status:3} | {record['entity']:>5} | "
+                  f"{format_reading(sensor)}")
+    elif args[:2] == ['sensor', 'list']:
+        for record in sdr_records(sdr_cache):
+            sensor = readings.get(record['name'], dict(record, reading=None))
+            value = 'na' if sensor['reading'] is None else f"{sensor['reading']:.3f}"
+            print(f"{record['name']:16} | {value:10} | {record['unit']:10} | ok    | na        | na        | na")
+    else:
+        print(f"Invalid command: {' '.join(args)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv):
+    sdr_cache = None
+    i = 0
+    while i < len(argv) and argv[i] in GLOBAL_OPTIONS:
+        if argv[i] == '-S':
+            sdr_cache = argv[i + 1]
+        i += 2
+    args = argv[i:]
+
+    if os.getenv('FAKE_IPMI_LOG'):
+        with open(os.environ['FAKE_IPMI_LOG'], 'a', encoding='utf-8') as f:
+            f.write(' '.join(args) + '\n')
+
+    if args[:1] == ['exec'] and len(args) == 2:
+        status = 0
+        with open(args[1], encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    status = run_command(shlex.split(line), sdr_cache) or status
+        return status
+    return run_command(args, sdr_cache)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,213 @@
+"""
+Чтение датчиков BMC по IPMI через ipmitool с кэшем SDR.
+
+`ipmitool sensor list` каждый раз заново читает весь репозиторий SDR и только
+потом показания - на реальном BMC это 10-20 с. Здесь SDR выгружается один раз
+(`sdr dump`) в локальный кэш, ключ которого - время последнего изменения SDR
+из `sdr info`; дальше показания читаются с `-S <кэш>`. Команды одного чтения
+(`sdr info` + `sdr elist full`) отправляются пакетом через `ipmitool exec` -
+одна сессия lanplus на все датчики. Если SDR на BMC изменился, кэш
+пересоздается автоматически.
+
+Для CI есть fake_ipmitool.py:
+    OPENBMC_IPMITOOL="python fake_ipmitool.py" python ipmi_sensors.py
+"""
+import hashlib
+import json
+import os
+import re
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+
+from sensor_match import Sensor
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'openbmc', 'sdr')
+# Поля sdr info, изменение которых означает новый SDR
+SDR_VERSION_FIELDS = ('Record Count', 'Most recent Addition', 'Most recent Erase')
+
+_READING_RE = re.compile(r'^(-?\d+(?:\.\d+)?)\s*(.*)$')
+
+
+class IpmiError(Exception):
+    """ipmitool завершился с ошибкой или не ответил"""
+
+
+class IpmiReading:
+    """Строка `sdr elist full`: имя, номер, статус, entity, значение и единицы"""
+
+    __slots__ = ('name', 'number', 'status', 'entity_id', 'entity_instance', 'value', 'unit')
+
+    def __init__(self, name, number, status, entity_id, entity_instance, value, unit):
+        self.name = name
+        self.number = number
+        self.status = status
+        self.entity_id = entity_id
+        self.entity_instance = entity_instance
+        self.value = value
+        self.unit = unit
+
+    def to_sensor(self):
+        return Sensor(self.name, self.value, number=self.number, entity_id=self.entity_id)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def parse_sdr_info(lines):
+    info = {}
+    for line in lines:
+        key, sep, value = line.partition(':')
+        if sep and '|' not in line:
+            info[key.strip()] = value.strip()
+    return info
+
+
+def parse_sdr_elist(lines):
+    """Разбирает `sdr elist full`: CPU0_Temp | 01h | ok | 3.1 | 45 degrees C"""
+    readings = []
+    for line in lines:
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) != 5:
+            continue
+        name, number, status, entity, reading = parts
+        try:
+            number = int(number.rstrip('h'), 16)
+        except ValueError:
+            number = None
+        entity_id, _, entity_instance = entity.partition('.')
+        match = _READING_RE.match(reading)
+        value, unit = (float(match.group(1)), match.group(2)) if match else (None, reading)
+        readings.append(IpmiReading(
+            name, number, status,
+            int(entity_id) if entity_id.isdigit() else None,
+            int(entity_instance) if entity_instance.isdigit() else None,
+            value, unit))
+    return readings
+
+
+class IpmiSensorReader:
+    """
+    host=None - локальный ipmitool без -H (in-band, как раньше в test_07);
+    ipmitool - команда запуска (строка или список), например "python fake_ipmitool.py".
+    """
+
+    def __init__(self, host=None, username=None, password=None, interface='lanplus', port=623,
+                 ipmitool='ipmitool', cache_dir=DEFAULT_CACHE_DIR, timeout=30):
+        self.host = host
+        self.username = username
+        self.password = password
+        self.interface = interface
+        self.port = port
+        self.ipmitool = shlex.split(ipmitool) if isinstance(ipmitool, str) else list(ipmitool)
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.sessions = 0
+        self.sdr_refreshes = 0
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        return cls(host=os.getenv('OPENBMC_IPMI_HOST') or None,
+                   username=os.getenv('OPENBMC_USERNAME', 'root'),
+                   password=os.getenv('OPENBMC_PASSWORD', '0penBmc'),
+                   port=int(os.getenv('OPENBMC_IPMI_PORT', '623')),
+                   ipmitool=os.getenv('OPENBMC_IPMITOOL', 'ipmitool'),
+                   **kwargs)
+
+    def command(self, sdr_cache=None):
+        cmd = list(self.ipmitool)
+        if self.host:
+            cmd += ['-I', self.interface, '-H', self.host, '-p', str(self.port)]
+            if self.username:
+                cmd += ['-U', self.username]
+            if self.password:
+                cmd += ['-P', self.password]
+        if sdr_cache:
+            cmd += ['-S', sdr_cache]
+        return cmd
+
+    def _exec(self, commands, sdr_cache=None):
+        """Выполняет пакет команд в одном запуске ipmitool (одна сессия) и возвращает строки вывода"""
+        with tempfile.NamedTemporaryFile('w', suffix='.ipmi', delete=False) as batch:
+            batch.write('\n'.join(commands) + '\n')
+        try:
+            self.sessions += 1
+            completed = subprocess.run(self.command(sdr_cache) + ['exec', batch.name],
+                                       capture_output=True, text=True, timeout=self.timeout)
+        except subprocess.TimeoutExpired as e:
+            raise IpmiError(f"ipmitool не ответил за {self.timeout} с") from e
+        finally:
+            os.unlink(batch.name)
+        if completed.returncode != 0:
+            raise IpmiError(f"ipmitool завершился с кодом {completed.returncode}: {completed.stderr.strip()}")
+        return completed.stdout.splitlines()
+
+    # --- кэш SDR ---------------------------------------------------------
+
+    def _cache_prefix(self):
+        target = f"{self.host or 'local'}:{self.port}:{self.interface}"
+        return os.path.join(self.cache_dir, hashlib.sha1(target.encode()).hexdigest()[:12])
+
+    def _load_meta(self):
+        try:
+            with open(self._cache_prefix() + '.json', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if os.path.exists(meta.get('sdr_file', '')) else None
+
+    def refresh_sdr(self):
+        """Выгружает SDR с BMC в кэш; возвращает метаданные кэша"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        prefix = self._cache_prefix()
+        tmp_file = f"{prefix}.{os.getpid()}.tmp"
+        lines = self._exec(['sdr info', f'sdr dump {shlex.quote(tmp_file)}'])
+        version = {field: parse_sdr_info(lines).get(field) for field in SDR_VERSION_FIELDS}
+        sdr_file = f"{prefix}-{hashlib.sha1(json.dumps(version).encode()).hexdigest()[:12]}.sdr"
+        os.replace(tmp_file, sdr_file)
+        meta = {'sdr_file': sdr_file, 'version': version}
+        # Через временный файл: кэш могут одновременно обновлять несколько pytest-воркеров
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_file, prefix + '.json')
+        self.sdr_refreshes += 1
+        return meta
+
+    # --- чтение ----------------------------------------------------------
+
+    def read(self):
+        """Все показания датчиков одним пакетом; SDR берется из кэша, если он актуален"""
+        meta = self._load_meta() or self.refresh_sdr()
+        lines = self._exec(['sdr info', 'sdr elist full'], sdr_cache=meta['sdr_file'])
+        version = {field: parse_sdr_info(lines).get(field) for field in SDR_VERSION_FIELDS}
+        if version != meta['version']:
+            # SDR на BMC изменился после выгрузки - обновляем кэш и читаем заново
+            meta = self.refresh_sdr()
+            lines = self._exec(['sdr elist full'], sdr_cache=meta['sdr_file'])
+        return parse_sdr_elist(lines)
+
+    def temperatures(self):
+        """Показания датчиков температуры (градусы Цельсия)"""
+        return [reading for reading in self.read()
+                if reading.value is not None and reading.unit.lower() == 'degrees c']
+
+
+def main():
+    reader = IpmiSensorReader.from_env()
+    for attempt in ('холодный', 'теплый'):
+        started = time.perf_counter()
+        try:
+            readings = reader.read()
+        except (IpmiError, FileNotFoundError) as e:
+            print(f"Ошибка IPMI: {e}")
+            return 1
+        print(f"{attempt} запуск: {len(readings)} датчиков за {time.perf_counter() - started:.3f} с")
+    for reading in readings:
+        print(json.dumps(reading.to_dict(), ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,315 @@
+"""
+Потоковое чтение и запись больших JSONL (записи трафика redfish_capture.py).
+
+Файл пишется блоками по block_records записей. Сжатие выбирается по
+расширению: .gz - gzip, .zst - zstd (пакет zstandard, ставится отдельно).
+Каждый блок сжатого файла - самостоятельный member gzip / кадр zstd, поэтому
+чтение можно начать с начала любого блока. Рядом лежит индекс <файл>.idx:
+строка "ts<TAB>смещение" на блок, где ts - время первой записи блока.
+
+iter_records(path, start, end) читает генератором и по индексу сразу
+переходит к нужному блоку; stream_stats() за один проход с постоянной памятью
+считает по каждому endpoint число запросов, ошибки, объем и перцентили
+задержки (по гистограмме HDR из latency_histogram.py). Если установлен orjson, строки
+разбираются им - в несколько раз быстрее json.
+
+    python jsonl_stream.py stats reports/capture/day.jsonl.zst --from 2024-05-01T10:00 --to 2024-05-01T11:00
+    python jsonl_stream.py index reports/capture/day.jsonl
+"""
+import argparse
+import bisect
+import gzip
+import io
+import json
+import os
+import sys
+from datetime import datetime
+
+from latency_histogram import LatencyHistogram
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+TIME_KEY = 'ts'
+BLOCK_RECORDS = 4096
+BUFFER_SIZE = 1 << 20
+# Запись может стартовать раньше предыдущих (ts - начало запроса, пишется по завершении),
+# поэтому чтение диапазона заканчивается, только когда ts ушло за конец на MAX_SKEW секунд
+MAX_SKEW = 60.0
+
+
+def compression_for(path):
+    if path.endswith('.gz'):
+        return 'gzip'
+    if path.endswith('.zst'):
+        return 'zstd'
+    return None
+
+
+def index_path(path):
+    return path + '.idx'
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("Для .zst нужен пакет zstandard: pip install zstandard") from None
+    return zstandard
+
+
+class JsonlWriter:
+    """
+    Буферизованная дозапись JSONL с индексом блоков.
+    index=False - без индекса (его можно построить позже build_index для несжатого файла).
+    """
+
+    def __init__(self, path, block_records=BLOCK_RECORDS, buffer_size=BUFFER_SIZE, index=True,
+                 time_key=TIME_KEY):
+        self.path = path = os.fspath(path)
+        self.block_records = block_records
+        self.buffer_size = buffer_size
+        self.time_key = time_key
+        self.compression = compression_for(path)
+        self.records = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, 'ab')
+        self._index = open(index_path(path), 'a', encoding='utf-8') if index else None
+        self._buffer = []
+        self._buffered = 0
+        self._block_count = 0
+        self._compressor = _zstandard().ZstdCompressor() if self.compression == 'zstd' else None
+
+    def write(self, record):
+        self.write_line(json.dumps(record, ensure_ascii=False), record.get(self.time_key))
+
+    def write_line(self, line, ts=None):
+        """Уже сериализованная запись (без перевода строки); ts - для индекса"""
+        if self._block_count == 0:
+            # Блок начинается с границы файла/member, чтобы с него можно было начать чтение
+            self.flush()
+            if self._index is not None:
+                self._index.write(f"{ts if ts is not None else ''}\t{self._file.tell()}\n")
+        data = line + '\n'
+        self._buffer.append(data)
+        self._buffered += len(data)
+        self.records += 1
+        self._block_count += 1
+        if self._block_count >= self.block_records:
+            self._block_count = 0
+        # Несжатый файл можно сбрасывать внутри блока; сжатый - только целыми блоками
+        if self.compression is None and self._buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        data = ''.join(self._buffer).encode()
+        if self.compression == 'gzip':
+            data = gzip.compress(data, compresslevel=6)
+        elif self.compression == 'zstd':
+            data = self._compressor.compress(data)
+        self._file.write(data)
+        self._file.flush()
+        if self._index is not None:
+            self._index.flush()
+        self._buffer = []
+        self._buffered = 0
+
+    def close(self):
+        self.flush()
+        self._file.close()
+        if self._index is not None:
+            self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_index(path):
+    """[(ts, смещение)] блоков или None, если индекса нет"""
+    if not os.path.exists(index_path(path)):
+        return None
+    entries = []
+    with open(index_path(path), encoding='utf-8') as f:
+        for line in f:
+            ts, _, offset = line.rstrip('\n').partition('\t')
+            if ts:
+                entries.append((float(ts), int(offset)))
+    return entries
+
+
+def build_index(path, block_records=BLOCK_RECORDS, time_key=TIME_KEY):
+    """Индекс для несжатого файла, записанного без него; один проход по файлу"""
+    if compression_for(path):
+        raise ValueError(f"{path}: индекс сжатого файла строится только при записи")
+    count = 0
+    with open(path, 'rb') as f, open(index_path(path), 'w', encoding='utf-8') as index:
+        offset = 0
+        for line in f:
+            if count % block_records == 0 and line.strip():
+                ts = json.loads(line).get(time_key)
+                if ts is not None:
+                    index.write(f"{ts}\t{offset}\n")
+            offset += len(line)
+            count += 1
+    return count
+
+
+def _open_binary(raw, compression):
+    if compression == 'gzip':
+        # GzipFile читает подряд все member'ы начиная с текущей позиции raw
+        return io.BufferedReader(gzip.GzipFile(fileobj=raw), BUFFER_SIZE)
+    if compression == 'zstd':
+        reader = _zstandard().ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=False)
+        return io.BufferedReader(reader, BUFFER_SIZE)
+    return raw
+
+
+def iter_records(path, start=None, end=None, time_key=TIME_KEY):
+    """Записи по одной; start/end (секунды epoch) ограничивают диапазон [start, end)"""
+    path = os.fspath(path)
+    offset = 0
+    if start is not None:
+        index = load_index(path)
+        if index:
+            # Последний блок, начавшийся не позже start - MAX_SKEW
+            i = bisect.bisect_right([ts for ts, _ in index], start - MAX_SKEW) - 1
+            offset = index[i][1] if i >= 0 else 0
+    with open(path, 'rb', buffering=BUFFER_SIZE) as raw:
+        raw.seek(offset)
+        for line in _open_binary(raw, compression_for(path)):
+            if not line.strip():
+                continue
+            record = _loads(line)
+            ts = record.get(time_key)
+            if ts is not None:
+                if start is not None and ts < start:
+                    continue
+                if end is not None and ts >= end:
+                    if ts >= end + MAX_SKEW:
+                        return
+                    continue
+            yield record
+
+
+class EndpointStats:
+    __slots__ = ('requests', 'errors', 'bytes', 'total_ms', 'max_ms', 'histogram')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.bytes = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.histogram = LatencyHistogram()
+
+    def add(self, record):
+        elapsed = record.get('elapsed_ms') or 0.0
+        self.requests += 1
+        status = record.get('status')
+        if status is None or status >= 400:
+            self.errors += 1
+        self.bytes += record.get('size') or 0
+        self.total_ms += elapsed
+        if elapsed > self.max_ms:
+            self.max_ms = elapsed
+        self.histogram.record(elapsed)
+
+
+def stream_stats(records, key=None):
+    """
+    Один проход по записям: {endpoint: сводка} в формате LoadStats.summary()
+    плюс mean_ms и bytes, и длительность записи в секундах. key(record) -> endpoint,
+    по умолчанию 'METHOD путь' без query.
+    """
+    endpoints = {}
+    # EndpointStats по (method, path) как есть - без сборки имени на каждую запись
+    by_request = {}
+    first = last = None
+    for record in records:
+        if record.get('stream'):
+            continue
+        ts = record.get(TIME_KEY)
+        if ts is not None:
+            if first is None:
+                first = last = ts
+            elif ts < first:
+                first = ts
+            elif ts > last:
+                last = ts
+        if key is None:
+            request = (record['method'], record['path'])
+            stats = by_request.get(request)
+            if stats is None:
+                name = f"{request[0]} {request[1].partition('?')[0]}"
+                stats = by_request[request] = endpoints.setdefault(name, EndpointStats())
+        else:
+            name = key(record)
+            stats = endpoints.get(name)
+            if stats is None:
+                stats = endpoints[name] = EndpointStats()
+        stats.add(record)
+
+    duration = (last - first) if first is not None else 0.0
+    summary = {}
+    for name, stats in sorted(endpoints.items()):
+        summary[name] = {
+            'requests': stats.requests,
+            'errors': stats.errors,
+            'rps': stats.requests / duration if duration else 0.0,
+            'mean_ms': stats.total_ms / stats.requests,
+            'p50_ms': stats.histogram.percentile(50),
+            'p95_ms': stats.histogram.percentile(95),
+            'p99_ms': stats.histogram.percentile(99),
+            'max_ms': stats.max_ms,
+            'bytes': stats.bytes,
+        }
+    return summary, duration
+
+
+def parse_time(value):
+    """Секунды epoch или ISO 8601 (локальное время, если не указан пояс)"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Потоковая обработка JSONL с записью трафика Redfish')
+    commands = parser.add_subparsers(dest='command', required=True)
+    stats_parser = commands.add_parser('stats', help='Сводка по endpoint за один проход')
+    stats_parser.add_argument('path')
+    stats_parser.add_argument('--from', dest='start', help='Начало диапазона: epoch или ISO 8601')
+    stats_parser.add_argument('--to', dest='end', help='Конец диапазона: epoch или ISO 8601')
+    stats_parser.add_argument('--json', help='Сохранить сводку в JSON')
+    index_parser = commands.add_parser('index', help='Построить индекс для несжатого файла')
+    index_parser.add_argument('path')
+    index_parser.add_argument('--block-records', type=int, default=BLOCK_RECORDS)
+    args = parser.parse_args()
+
+    if args.command == 'index':
+        count = build_index(args.path, args.block_records)
+        print(f"{args.path}: {count} записей, индекс {index_path(args.path)}")
+        return 0
+
+    from redfish_load import print_summary
+    summary, duration = stream_stats(iter_records(args.path, parse_time(args.start), parse_time(args.end)))
+    print_summary(summary, duration)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'summary': summary, 'duration': duration}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
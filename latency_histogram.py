@@ -0,0 +1,297 @@
+"""
+Гистограммы задержек в духе HdrHistogram и запись задержек клиентов Redfish.
+
+LatencyHistogram хранит значения в микросекундах в корзинах HDR: степень
+двойки плюс линейная подкорзина, так что относительная ошибка перцентиля не
+больше 10^-significant_digits на всем диапазоне, а память не зависит от
+числа значений (разреженный словарь непустых корзин).
+
+LatencyRecorder подключается к RedfishClient/AsyncRedfishClient
+(latency=LatencyRecorder()) и на каждый запрос пишет задержку в гистограмму
+endpoint'а ('METHOD путь'): total - весь запрос, ttfb - от отправки до
+заголовков ответа; у AsyncRedfishClient (httpx) еще connect (TCP, вместе с
+DNS) и tls для новых соединений. Рядом хранятся счетчики прогона (counters,
+например попадания в кэш клиента). Сводка сохраняется в JSON и сравнивается с
+базовой (compare_baseline). Под pytest-xdist свойства testsuite из воркеров в
+JUnit не попадают, поэтому объединенную сводку в JUnit XML пишет --junitxml:
+
+    python latency_histogram.py reports/latency/redfish_latency*.json --baseline reports/latency/baseline.json \
+        --junitxml reports/junit/test_redfish_results.xml
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import xml.etree.ElementTree as ET
+
+PHASES = ('total', 'ttfb', 'connect', 'tls')
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+class LatencyHistogram:
+    """Гистограмма задержек в мс; внутри - целые микросекунды в корзинах HDR"""
+
+    def __init__(self, significant_digits=3):
+        self.significant_digits = significant_digits
+        # Число линейных подкорзин - степень двойки не меньше 2 * 10^digits
+        self.sub_bucket_bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self.sub_bucket_count = 1 << self.sub_bucket_bits
+        self.sub_bucket_mask = self.sub_bucket_count - 1
+        self.counts = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = 0
+
+    def _index(self, value_us):
+        bucket = max(0, (value_us | self.sub_bucket_mask).bit_length() - self.sub_bucket_bits)
+        return (bucket << self.sub_bucket_bits) + (value_us >> bucket)
+
+    def _value(self, index):
+        """Середина диапазона значений корзины, мкс"""
+        bucket, sub_bucket = divmod(index, self.sub_bucket_count)
+        return (sub_bucket << bucket) + ((1 << bucket) >> 1)
+
+    def record(self, value_ms, count=1):
+        value_us = int(value_ms * 1000) if value_ms > 0 else 0
+        index = self._index(value_us)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total_us += value_us * count
+        if self.min_us is None or value_us < self.min_us:
+            self.min_us = value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def percentile(self, q):
+        """Перцентиль q (0..100) в мс"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q / 100 * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._value(index), self.max_us) / 1000
+        return self.max_us / 1000
+
+    @property
+    def mean(self):
+        return self.total_us / self.count / 1000 if self.count else 0.0
+
+    def merge(self, other):
+        if other.sub_bucket_bits != self.sub_bucket_bits:
+            raise ValueError("Гистограммы с разной точностью не объединяются")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None and (self.min_us is None or other.min_us < self.min_us):
+            self.min_us = other.min_us
+        self.max_us = max(self.max_us, other.max_us)
+        return self
+
+    def summary(self):
+        result = {'count': self.count, 'min_ms': (self.min_us or 0) / 1000, 'mean_ms': self.mean,
+                  'max_ms': self.max_us / 1000}
+        for q in PERCENTILES:
+            result[f"p{q:g}_ms"] = self.percentile(q)
+        return result
+
+    def to_dict(self):
+        return {'significant_digits': self.significant_digits, 'count': self.count,
+                'total_us': self.total_us, 'min_us': self.min_us, 'max_us': self.max_us,
+                'counts': {str(index): count for index, count in sorted(self.counts.items())}}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data['significant_digits'])
+        histogram.counts = {int(index): count for index, count in data['counts'].items()}
+        histogram.count = data['count']
+        histogram.total_us = data['total_us']
+        histogram.min_us = data['min_us']
+        histogram.max_us = data['max_us']
+        return histogram
+
+
+def endpoint_name(method, path):
+    """'METHOD путь' без query, хоста и завершающего /"""
+    if '://' in path:
+        path = '/' + path.split('://', 1)[1].partition('/')[2]
+    return f"{method} {path.partition('?')[0].rstrip('/') or '/'}"
+
+
+class LatencyRecorder:
+    """Потокобезопасный набор гистограмм {endpoint: {фаза: LatencyHistogram}} и счетчиков прогона"""
+
+    def __init__(self, significant_digits=3):
+        self.significant_digits = significant_digits
+        self.endpoints = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def record(self, method, url, phases):
+        """phases - {фаза: секунды}; отсутствующие фазы не пишутся"""
+        name = endpoint_name(method, url)
+        with self._lock:
+            histograms = self.endpoints.get(name)
+            if histograms is None:
+                histograms = self.endpoints[name] = {}
+            for phase, seconds in phases.items():
+                if seconds is None:
+                    continue
+                histogram = histograms.get(phase)
+                if histogram is None:
+                    histogram = histograms[phase] = LatencyHistogram(self.significant_digits)
+                histogram.record(seconds * 1000)
+
+    def merge(self, other):
+        with self._lock:
+            for name, phases in other.endpoints.items():
+                histograms = self.endpoints.setdefault(name, {})
+                for phase, histogram in phases.items():
+                    if phase in histograms:
+                        histograms[phase].merge(histogram)
+                    else:
+                        histograms[phase] = LatencyHistogram.from_dict(histogram.to_dict())
+            for name, value in other.counters.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+        return self
+
+    def summary(self):
+        """{endpoint: {фаза: {count, min/mean/max, p50..p99.9}}} в мс"""
+        with self._lock:
+            return {name: {phase: histogram.summary() for phase, histogram in sorted(phases.items())}
+                    for name, phases in sorted(self.endpoints.items())}
+
+    def to_dict(self):
+        with self._lock:
+            histograms = {name: {phase: histogram.to_dict() for phase, histogram in phases.items()}
+                          for name, phases in sorted(self.endpoints.items())}
+        return {'summary': self.summary(), 'histograms': histograms, 'counters': dict(self.counters)}
+
+    @classmethod
+    def from_dict(cls, data):
+        recorder = cls()
+        for name, phases in data['histograms'].items():
+            recorder.endpoints[name] = {phase: LatencyHistogram.from_dict(h) for phase, h in phases.items()}
+        recorder.counters = dict(data.get('counters', {}))
+        return recorder
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+def compare_baseline(summary, baseline, percentile='p95_ms', tolerance=0.5, slack_ms=2.0, min_count=20):
+    """
+    Регрессии задержки total против базовой сводки: endpoint, где перцентиль вырос
+    больше чем на tolerance (доля) и на slack_ms, при не менее min_count значений
+    в обеих сводках. Возвращает список {endpoint, baseline_ms, current_ms, change}.
+    """
+    regressions = []
+    for name, phases in summary.items():
+        current = phases.get('total')
+        reference = baseline.get(name, {}).get('total')
+        if not current or not reference or min(current['count'], reference['count']) < min_count:
+            continue
+        limit = max(reference[percentile] * (1 + tolerance), reference[percentile] + slack_ms)
+        if current[percentile] > limit:
+            regressions.append({
+                'endpoint': name,
+                'baseline_ms': reference[percentile],
+                'current_ms': current[percentile],
+                'change': current[percentile] / reference[percentile] - 1 if reference[percentile] else None,
+            })
+    return regressions
+
+
+def junit_properties(recorder, regressions=None):
+    """Свойства testsuite JUnit: перцентили total по endpoint, счетчики и число регрессий"""
+    properties = {}
+    for endpoint, phases in recorder.summary().items():
+        total = phases.get('total')
+        if total:
+            for field in ('count', 'p50_ms', 'p95_ms', 'p99_ms'):
+                properties[f"latency {endpoint} {field}"] = round(total[field], 3)
+    properties.update(sorted(recorder.counters.items()))
+    if regressions is not None:
+        properties['latency_regressions'] = len(regressions)
+    return properties
+
+
+def write_junit_properties(path, properties):
+    """Добавляет (или заменяет) свойства первого testsuite в готовом JUnit XML"""
+    tree = ET.parse(path)
+    root = tree.getroot()
+    suite = root if root.tag == 'testsuite' else root.find('testsuite')
+    if suite is None:
+        raise ValueError(f"{path}: нет элемента testsuite")
+    container = suite.find('properties')
+    if container is None:
+        container = ET.Element('properties')
+        suite.insert(0, container)
+    existing = {item.get('name'): item for item in container.findall('property')}
+    for name, value in properties.items():
+        item = existing.get(name)
+        if item is None:
+            item = ET.SubElement(container, 'property', name=name)
+        item.set('value', str(value))
+    tree.write(path, encoding='utf-8', xml_declaration=True)
+
+
+def print_summary(summary, phases=('total',)):
+    print(f"{'Endpoint':55} {'фаза':>7} {'n':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for name, histograms in summary.items():
+        for phase in phases:
+            row = histograms.get(phase)
+            if row:
+                print(f"{name:55} {phase:>7} {row['count']:6d} {row['p50_ms']:8.2f} {row['p95_ms']:8.2f} "
+                      f"{row['p99_ms']:8.2f} {row['max_ms']:8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Сводка задержек Redfish и сравнение с базовой')
+    parser.add_argument('reports', nargs='+', help='JSON LatencyRecorder (несколько - объединяются)')
+    parser.add_argument('--baseline', help='Базовый JSON для проверки регрессий')
+    parser.add_argument('--percentile', default='p95_ms')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='Допустимый рост перцентиля, доля')
+    parser.add_argument('--phases', default='total', help='Фазы через запятую: ' + ','.join(PHASES))
+    parser.add_argument('--output', help='Сохранить объединенный отчет')
+    parser.add_argument('--junitxml', help='Записать сводку в свойства testsuite этого JUnit XML')
+    args = parser.parse_args()
+
+    recorder = LatencyRecorder.load(args.reports[0])
+    for path in args.reports[1:]:
+        recorder.merge(LatencyRecorder.load(path))
+    summary = recorder.summary()
+    print_summary(summary, args.phases.split(','))
+    if args.output:
+        recorder.save(args.output)
+    regressions = None
+    if args.baseline:
+        baseline = LatencyRecorder.load(args.baseline).summary()
+        regressions = compare_baseline(summary, baseline, args.percentile, args.tolerance)
+    if args.junitxml and os.path.exists(args.junitxml):
+        write_junit_properties(args.junitxml, junit_properties(recorder, regressions))
+    if regressions is None:
+        return 0
+    for item in regressions:
+        print(f"РЕГРЕССИЯ {item['endpoint']}: {args.percentile} {item['baseline_ms']:.2f} -> {item['current_ms']:.2f} мс")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+Проверка регрессий производительности по CSV locust против базы.
+
+Из <prefix>_stats_history.csv берутся посекундные ряды p50/p95/p99 и rps по
+каждому endpoint (с --csv-full-history) и по Aggregated, из <prefix>_stats.csv -
+число запросов и ошибок. Медиана ряда текущего прогона сравнивается с медианой
+рядов базы: доверительный интервал изменения строится блочным бутстрепом
+(соседние отсчеты locust зависимы - перцентили считаются по окну 10 с).
+Регрессия - когда весь интервал хуже допуска: задержка выросла больше чем на
+--tolerance и на --slack-ms (locust округляет перцентили до мс) или общий rps
+упал больше чем на --tolerance; а также рост доли ошибок больше --error-tolerance.
+rps отдельных endpoint'ов не проверяется: при выборе запросов по весам это доля
+в смеси, а не пропускная способность.
+
+База - каталог прогонов по версиям прошивки (<store>/<версия>/<время>.json),
+по --keep последних прогонов на версию. Сравнение идет с прогонами той же версии,
+если они есть (повторные прогоны одной сборки не должны уплывать), иначе - с
+последней сохраненной версией (или --baseline-firmware); прогон без регрессий
+добавляется в базу.
+
+Код выхода: 0 - регрессий нет, 1 - есть регрессия, 2 - ошибка самой проверки
+(нет CSV, недоступен BMC и т.п.), сравнение не выполнено.
+
+    python locust_regression.py reports/loadtest/locust --store baselines/locust --url https://bmc:2443
+"""
+import argparse
+import csv
+import glob
+import json
+import math
+import os
+import re
+import shutil
+import sys
+from datetime import datetime
+
+import numpy as np
+
+DEFAULT_STORE = os.path.join('baselines', 'locust')
+EXIT_REGRESSION = 1
+EXIT_ERROR = 2
+AGGREGATED = 'Aggregated'
+# Ряд истории locust -> метрика; для задержки регрессия - рост, для rps - падение
+METRICS = {'50%': 'p50_ms', '95%': 'p95_ms', '99%': 'p99_ms', 'Requests/s': 'rps'}
+HIGHER_IS_WORSE = {'p50_ms': True, 'p95_ms': True, 'p99_ms': True, 'rps': False}
+
+
+def endpoint_key(row):
+    return f"{row['Type']} {row['Name']}".strip()
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def read_history(path, warmup=10.0):
+    """{endpoint: {метрика: [значения]}} по stats_history.csv без первых warmup секунд и пустых строк"""
+    series = {}
+    started = None
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            timestamp = _number(row['Timestamp'])
+            if not _number(row.get('User Count')) or not _number(row.get('Total Request Count')):
+                continue
+            started = timestamp if started is None else started
+            if timestamp - started < warmup:
+                continue
+            endpoint = series.setdefault(endpoint_key(row), {metric: [] for metric in METRICS.values()})
+            values = {metric: _number(row[column]) for column, metric in METRICS.items()}
+            # N/A в перцентилях - в окне не было запросов; такие строки не берем целиком
+            if any(value is None for value in values.values()):
+                continue
+            for metric, value in values.items():
+                endpoint[metric].append(value)
+    return series
+
+
+def read_stats(path):
+    """{endpoint: {requests, failures}} по итоговому stats.csv"""
+    stats = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            stats[endpoint_key(row)] = {'requests': int(row['Request Count']),
+                                        'failures': int(row['Failure Count'])}
+    return stats
+
+
+def load_run(prefix, warmup=10.0):
+    return {'stats': read_stats(f"{prefix}_stats.csv"),
+            'history': read_history(f"{prefix}_stats_history.csv", warmup)}
+
+
+def bootstrap_change(baseline, current, resamples=2000, block=10, confidence=0.95, seed=0):
+    """
+    Относительное изменение медианы current против baseline и его доверительный
+    интервал (блочный бутстреп): (изменение, нижняя граница, верхняя граница)
+    """
+    rng = np.random.default_rng(seed)
+    baseline = np.asarray(baseline, dtype=np.float64)
+    current = np.asarray(current, dtype=np.float64)
+
+    def medians(values):
+        n = len(values)
+        length = min(block, n)
+        blocks = math.ceil(n / length)
+        starts = rng.integers(0, n - length + 1, size=(resamples, blocks))
+        index = (starts[:, :, None] + np.arange(length)).reshape(resamples, -1)[:, :n]
+        return np.median(values[index], axis=1)
+
+    reference = np.median(baseline)
+    if reference <= 0:
+        return None, None, None
+    changes = medians(current) / np.maximum(medians(baseline), 1e-9) - 1
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(changes, [alpha, 1 - alpha])
+    return float(np.median(current) / reference - 1), float(low), float(high)
+
+
+def compare_runs(baseline_runs, current, tolerance=0.1, error_tolerance=0.01, slack_ms=5.0, min_samples=10,
+                 resamples=2000, block=10, confidence=0.95):
+    """Список проверок {endpoint, metric, baseline, current, change, low, high, regression}"""
+    results = []
+    for endpoint in sorted(current['history']):
+        pooled = {metric: [] for metric in METRICS.values()}
+        for run in baseline_runs:
+            for metric, values in run['history'].get(endpoint, {}).items():
+                pooled[metric].extend(values)
+        for metric, values in current['history'][endpoint].items():
+            reference = pooled[metric]
+            if metric == 'rps' and endpoint != AGGREGATED:
+                continue
+            if min(len(values), len(reference)) < min_samples:
+                continue
+            change, low, high = bootstrap_change(reference, values, resamples, block, confidence)
+            if change is None:
+                continue
+            if HIGHER_IS_WORSE[metric]:
+                regression = low > tolerance and low * np.median(reference) > slack_ms
+            else:
+                regression = high < -tolerance
+            results.append({'endpoint': endpoint, 'metric': metric,
+                            'baseline': float(np.median(reference)), 'current': float(np.median(values)),
+                            'change': change, 'low': low, 'high': high, 'regression': bool(regression)})
+
+    for endpoint, row in sorted(current['stats'].items()):
+        base_requests = sum(run['stats'].get(endpoint, {}).get('requests', 0) for run in baseline_runs)
+        base_failures = sum(run['stats'].get(endpoint, {}).get('failures', 0) for run in baseline_runs)
+        if not base_requests or not row['requests']:
+            continue
+        base_rate = base_failures / base_requests
+        rate = row['failures'] / row['requests']
+        results.append({'endpoint': endpoint, 'metric': 'error_rate', 'baseline': base_rate, 'current': rate,
+                        'change': rate - base_rate, 'low': None, 'high': None,
+                        'regression': rate > base_rate + error_tolerance})
+    return results
+
+
+class BaselineStore:
+    """Каталог прогонов: <root>/<версия прошивки>/<время>.json, последние keep на версию"""
+
+    def __init__(self, root=DEFAULT_STORE, keep=5, keep_firmwares=10):
+        self.root = root
+        self.keep = keep
+        self.keep_firmwares = keep_firmwares
+
+    def _directory(self, firmware):
+        return os.path.join(self.root, re.sub(r'[^A-Za-z0-9._-]+', '_', firmware or 'unknown'))
+
+    def _paths(self, firmware):
+        return sorted(glob.glob(os.path.join(self._directory(firmware), '*.json')))
+
+    def firmwares(self):
+        """Версии от последней сохраненной к первой"""
+        latest = {}
+        for path in glob.glob(os.path.join(self.root, '*', '*.json')):
+            with open(path, encoding='utf-8') as f:
+                run = json.load(f)
+            latest[run['firmware']] = max(latest.get(run['firmware'], ''), run['timestamp'])
+        return sorted(latest, key=latest.get, reverse=True)
+
+    def runs(self, firmware):
+        runs = []
+        for path in self._paths(firmware)[-self.keep:]:
+            with open(path, encoding='utf-8') as f:
+                runs.append(json.load(f))
+        return runs
+
+    def reference_firmware(self, current):
+        """Сама текущая версия, если ее прогоны есть в базе, иначе последняя сохраненная"""
+        firmwares = self.firmwares()
+        if current in firmwares:
+            return current
+        return firmwares[0] if firmwares else None
+
+    def add(self, run):
+        directory = self._directory(run['firmware'])
+        os.makedirs(directory, exist_ok=True)
+        stamp = run['timestamp'].replace(':', '')
+        with open(os.path.join(directory, f"{stamp}.json"), 'w', encoding='utf-8') as f:
+            json.dump(run, f)
+        for path in self._paths(run['firmware'])[:-self.keep]:
+            os.remove(path)
+        for firmware in self.firmwares()[self.keep_firmwares:]:
+            shutil.rmtree(self._directory(firmware), ignore_errors=True)
+
+
+def firmware_version(url, username, password):
+    from redfish_client import RedfishClient
+    client = RedfishClient(url, username, password, pool_size=1)
+    try:
+        client.login()
+        return client.get('/redfish/v1/Managers/bmc').json().get('FirmwareVersion')
+    finally:
+        client.logout()
+        client.close()
+
+
+def print_results(results):
+    print(f"{'Endpoint':45} {'метрика':>10} {'база':>9} {'сейчас':>9} {'изм.':>7} {'интервал':>17}")
+    for r in results:
+        if r['metric'] == 'error_rate' and not r['baseline'] and not r['current']:
+            continue
+        interval = '' if r['low'] is None else f"[{r['low']:+.0%}, {r['high']:+.0%}]"
+        if r['metric'] == 'error_rate':
+            values = f"{r['baseline']:9.2%} {r['current']:9.2%} {r['change']:+7.2%}"
+        else:
+            values = f"{r['baseline']:9.1f} {r['current']:9.1f} {r['change']:+7.0%}"
+        mark = '  РЕГРЕССИЯ' if r['regression'] else ''
+        print(f"{r['endpoint']:45} {r['metric']:>10} {values} {interval:>17}{mark}")
+
+
+def check(args):
+    firmware = args.firmware or firmware_version(args.url, args.username, args.password) or 'unknown'
+    current = load_run(args.prefix, args.warmup)
+    current['firmware'] = firmware
+    current['timestamp'] = datetime.now().isoformat(timespec='seconds')
+    store = BaselineStore(args.store, args.keep)
+
+    reference = args.baseline_firmware or store.reference_firmware(firmware)
+    baseline_runs = store.runs(reference) if reference else []
+    if baseline_runs:
+        print(f"Прошивка {firmware} против {reference} ({len(baseline_runs)} прогонов в базе)")
+        results = compare_runs(baseline_runs, current, args.tolerance, args.error_tolerance, args.slack_ms,
+                               args.min_samples, args.resamples, args.block, args.confidence)
+        print_results(results)
+    else:
+        print(f"В базе {args.store} нет прогонов для сравнения - прогон {firmware} станет первым")
+        results = []
+    regressions = [r for r in results if r['regression']]
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'firmware': firmware, 'baseline_firmware': reference if baseline_runs else None,
+                       'results': results}, f, indent=2, ensure_ascii=False)
+    if regressions:
+        print(f"Регрессий: {len(regressions)} - прогон в базу не добавлен")
+        return EXIT_REGRESSION
+    if not args.no_store:
+        store.add(current)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Регрессии производительности по CSV locust')
+    parser.add_argument('prefix', help='Префикс --csv прогона locust (reports/loadtest/locust)')
+    parser.add_argument('--store', default=os.getenv('OPENBMC_LOCUST_BASELINE_DIR', DEFAULT_STORE),
+                        help='Каталог базы прогонов')
+    parser.add_argument('--firmware', default=os.getenv('OPENBMC_FIRMWARE'),
+                        help='Версия прошивки; по умолчанию - FirmwareVersion BMC по --url')
+    parser.add_argument('--baseline-firmware', help='Сравнивать с этой версией вместо выбранной автоматически')
+    parser.add_argument('--url', default=os.getenv('OPENBMC_URL', 'https://localhost:2443'))
+    parser.add_argument('--username', default=os.getenv('OPENBMC_USERNAME', 'root'))
+    parser.add_argument('--password', default=os.getenv('OPENBMC_PASSWORD', '0penBmc'))
+    parser.add_argument('--tolerance', type=float, default=0.1, help='Допустимое изменение, доля')
+    parser.add_argument('--slack-ms', type=float, default=5.0, help='Допустимый рост задержки, мс')
+    parser.add_argument('--error-tolerance', type=float, default=0.01, help='Допустимый рост доли ошибок')
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--resamples', type=int, default=2000)
+    parser.add_argument('--block', type=int, default=10, help='Длина блока бутстрепа, отсчетов')
+    parser.add_argument('--warmup', type=float, default=10, help='Отбросить первые N секунд прогона')
+    parser.add_argument('--min-samples', type=int, default=10)
+    parser.add_argument('--keep', type=int, default=5, help='Прогонов на версию в базе')
+    parser.add_argument('--no-store', action='store_true', help='Не добавлять прогон в базу')
+    parser.add_argument('--json', help='Сохранить результаты в JSON')
+    args = parser.parse_args()
+
+    try:
+        return check(args)
+    except Exception as e:
+        # Сбой самой проверки не должен выглядеть как регрессия
+        print(f"Ошибка проверки регрессий: {e!r}", file=sys.stderr)
+        return EXIT_ERROR
+
+
+if __name__ == '__main__':
+    sys.exit(main())
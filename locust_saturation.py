@@ -0,0 +1,114 @@
+"""
+Поиск точки насыщения bmcweb: ступенчатая нагрузка locust + мониторинг BMC.
+
+Число пользователей растет ступенями (--step-users каждые --step-time секунд
+до --max-users), пользователи шлют запросы без пауз. Параллельно BmcMonitor
+раз в --bmc-interval секунд записывает загрузку CPU/памяти BMC вместе с
+текущими rps и перцентилями locust. В конце пишутся <csv>_bmc.csv и
+<csv>_saturation.json, а в консоль - таблица ступеней и точка насыщения.
+
+    locust -f locust_saturation.py --headless --host https://bmc:2443 \\
+        --step-users 5 --step-time 30 --max-users 60 --csv reports/loadtest/saturation
+"""
+import os
+import json
+from urllib.parse import urlsplit
+
+from locust import LoadTestShape, constant, events
+from locust.runners import WorkerRunner
+
+import locustfile
+from bmc_monitor import BmcMonitor, RedfishDiagnosticsSource, SshProcSource, print_report, saturation_report
+from redfish_client import RedfishClient
+
+DEFAULT_PREFIX = 'reports/loadtest/saturation'
+
+
+class SaturationUser(locustfile.OpenBMCUser):
+    # Замкнутый цикл без пауз: нагрузку задает только число пользователей
+    wait_time = constant(0)
+
+
+class StepLoadShape(LoadTestShape):
+    def tick(self):
+        options = self.runner.environment.parsed_options
+        step = int(self.get_run_time() // options.step_time) + 1
+        users = step * options.step_users
+        if users > options.max_users:
+            return None
+        return users, users
+
+
+@events.init_command_line_parser.add_listener
+def add_arguments(parser):
+    parser.add_argument('--step-users', type=int, default=5, help='Прирост пользователей на ступень')
+    parser.add_argument('--step-time', type=float, default=30, help='Длительность ступени, с')
+    parser.add_argument('--max-users', type=int, default=50, help='Последняя ступень')
+    parser.add_argument('--bmc-source', choices=['redfish', 'ssh', 'none'], default='redfish',
+                        help='Откуда брать загрузку BMC')
+    parser.add_argument('--bmc-interval', type=float, default=1.0)
+    parser.add_argument('--cpu-limit', type=float, default=90.0)
+
+
+_monitor = None
+
+
+def _make_source(environment):
+    options = environment.parsed_options
+    username = os.getenv('OPENBMC_USERNAME', 'root')
+    password = os.getenv('OPENBMC_PASSWORD', '0penBmc')
+    if options.bmc_source == 'ssh':
+        return SshProcSource(urlsplit(environment.host).hostname,
+                             os.getenv('OPENBMC_SSH_USERNAME', username),
+                             os.getenv('OPENBMC_SSH_PASSWORD', password),
+                             port=int(os.getenv('OPENBMC_SSH_PORT', '22')))
+    client = RedfishClient(environment.host, username, password, pool_size=1)
+    client.login()
+    return RedfishDiagnosticsSource(client)
+
+
+class _NoSource:
+    def sample(self):
+        return {}
+
+
+@events.test_start.add_listener
+def start_monitor(environment, **kwargs):
+    global _monitor
+    if isinstance(environment.runner, WorkerRunner):
+        return
+    options = environment.parsed_options
+    source = _NoSource() if options.bmc_source == 'none' else _make_source(environment)
+
+    def load_stats():
+        total = environment.runner.stats.total
+        return {
+            'users': environment.runner.user_count,
+            'rps': total.current_rps,
+            'fail_rps': total.current_fail_per_sec,
+            'p50_ms': total.get_current_response_time_percentile(0.5),
+            'p95_ms': total.get_current_response_time_percentile(0.95),
+            'p99_ms': total.get_current_response_time_percentile(0.99),
+        }
+
+    _monitor = BmcMonitor(source, options.bmc_interval, load_stats).start()
+
+
+@events.test_stop.add_listener
+def stop_monitor(environment, **kwargs):
+    global _monitor
+    if _monitor is None:
+        return
+    _monitor.stop()
+    client = getattr(_monitor.source, 'client', None)
+    if client is not None:
+        client.close()
+
+    prefix = environment.parsed_options.csv_prefix or DEFAULT_PREFIX
+    _monitor.write_csv(f"{prefix}_bmc.csv")
+    report = saturation_report(_monitor.rows, environment.parsed_options.cpu_limit)
+    report['monitor_errors'] = _monitor.errors
+    with open(f"{prefix}_saturation.json", 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print_report(report)
+    _monitor = None
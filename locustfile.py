@@ -1,85 +1,142 @@
-from locust import HttpUser, task, between
+from locust import HttpUser, events, task
 import json
+import os
+import time
 
-class OpenBMCUser(HttpUser):
-    wait_time = between(1, 3)
+from redfish_workload import Workload
+
+SESSIONS_PATH = '/redfish/v1/SessionService/Sessions'
+
+# Описание нагрузки читается один раз на процесс locust (OPENBMC_WORKLOAD - свой файл)
+WORKLOAD = Workload.from_file()
+
+
+@events.init_command_line_parser.add_listener
+def add_arguments(parser):
+    parser.add_argument('--session-lifetime', type=float, env_var='OPENBMC_SESSION_LIFETIME', default=0,
+                        help='SessionUser: пересоздавать сессию каждые N секунд (0 - одна сессия на пользователя)')
+
+
+class RedfishWorkloadUser(HttpUser):
+    """
+    Воспроизводит redfish_workload.json: запросы по весам, паузы по распределениям.
+    Базовый класс без собственных пользователей (abstract); по умолчанию Basic auth,
+    другой способ входа задается переопределением request_auth().
+    """
+
+    abstract = True
     host = "https://localhost:2443"
-    
+    workload = WORKLOAD
+
     def on_start(self):
-        self.auth = ("root", "0penBmc") 
-        
-    @task(3)
-    def get_system_info(self):
-        with self.client.get("/redfish/v1/Systems/system", 
-                           auth=self.auth,
-                           catch_response=True,
-                           name="Get System Info") as response:
-            if response.status_code == 200:
-                try:
-                    system_data = response.json()
-                    # Проверяем наличие необходимых полей
-                    if 'Id' in system_data and 'Name' in system_data:
-                        response.success()
-                    else:
-                        response.failure("Invalid response format")
-                except json.JSONDecodeError:
-                    response.failure("Invalid JSON response")
-            else:
-                response.failure(f"Status code: {response.status_code}")
-    
-    @task(2)
-    def get_power_state(self):
-        with self.client.get("/redfish/v1/Systems/system", 
-                           auth=self.auth,
-                           catch_response=True,
-                           name="Get Power State") as response:
-            if response.status_code == 200:
-                try:
-                    system_data = response.json()
-                    power_state = system_data.get('PowerState')
-                    if power_state in ['On', 'Off']:
-                        response.success()
-                    else:
-                        response.failure(f"Invalid power state: {power_state}")
-                except (json.JSONDecodeError, AttributeError):
-                    response.failure("Invalid JSON response")
-            else:
-                response.failure(f"Status code: {response.status_code}")
+        self.username = os.getenv('OPENBMC_USERNAME', 'root')
+        self.password = os.getenv('OPENBMC_PASSWORD', '0penBmc')
+        self.client.verify = False
+        self._last = None
 
-class PublicAPIUser(HttpUser):
-    wait_time = between(1, 5)
-    host = "https://jsonplaceholder.typicode.com"
-    
-    @task(4)
-    def get_posts(self):
-        with self.client.get("/posts", 
-                           catch_response=True,
-                           name="Get Posts List") as response:
-            if response.status_code == 200:
-                try:
-                    posts = response.json()
-                    if isinstance(posts, list) and len(posts) > 0:
-                        response.success()
-                    else:
-                        response.failure("Empty or invalid posts list")
-                except json.JSONDecodeError:
-                    response.failure("Invalid JSON response")
-            else:
+    def wait_time(self):
+        if self._last is None:
+            return 0
+        return self.workload.think(self._last)
+
+    def request_auth(self):
+        """Аргументы авторизации для self.client.request()"""
+        return {'auth': (self.username, self.password)}
+
+    def unauthorized(self):
+        """Ответ 401 на запрос нагрузки"""
+
+    @task
+    def replay(self):
+        request = self.workload.choose()
+        self._last = request
+        body = request.render_body(self.username, self.password)
+        location = None
+        with self.client.request(request.method, request.path,
+                                 json=body,
+                                 catch_response=True,
+                                 name=request.name,
+                                 **self.request_auth()) as response:
+            if response.status_code == 401:
+                self.unauthorized()
+            if response.status_code not in request.expect:
                 response.failure(f"Status code: {response.status_code}")
-    
-    @task(1)
-    def get_weather(self):
-        with self.client.get("https://wttr.in/Novosibirsk?format=j1", 
-                           catch_response=True,
-                           name="Get Weather Data") as response:
-            if response.status_code == 200:
+                return
+            if request.method == 'GET':
                 try:
-                    weather_data = response.json()
-                    if 'current_condition' in weather_data:
-                        response.success()
-                    else:
-                        response.failure("Invalid weather data format")
+                    data = response.json()
                 except json.JSONDecodeError:
                     response.failure("Invalid JSON response")
-            else:
-                response.failure(f"Status code: {response.status_code}")
\ No newline at end of file
+                    return
+                # Каждый ресурс Redfish обязан содержать @odata.id
+                if '@odata.id' not in data:
+                    response.failure("Invalid response format")
+                    return
+            response.success()
+            location = response.headers.get('Location')
+        if request.cleanup and location:
+            self.client.request(request.cleanup, location, name=f"{request.name} (cleanup)", **self.request_auth())
+
+
+class OpenBMCUser(RedfishWorkloadUser):
+    """Basic auth на каждом запросе: BMC проверяет пароль (PAM) каждый раз"""
+
+
+class SessionUser(RedfishWorkloadUser):
+    """
+    Авторизация как у наших утилит: сессия SessionService на пользователя и X-Auth-Token.
+    Создание и удаление сессии идут в отчет отдельными строками (Session Create/Delete),
+    чтобы стоимость входа не смешивалась с задержками данных. С --session-lifetime
+    сессия пересоздается по истечении срока.
+    """
+
+    def on_start(self):
+        super().on_start()
+        self.token = None
+        self.session_location = None
+        self.session_started = 0.0
+        self.session_lifetime = self.environment.parsed_options.session_lifetime \
+            if self.environment.parsed_options else 0
+        self.create_session()
+
+    def on_stop(self):
+        self.delete_session()
+
+    def create_session(self):
+        with self.client.post(SESSIONS_PATH,
+                              json={'UserName': self.username, 'Password': self.password},
+                              catch_response=True,
+                              name="Session Create") as response:
+            token = response.headers.get('X-Auth-Token')
+            if response.status_code not in (200, 201) or not token:
+                response.failure(f"Status code: {response.status_code}")
+                return
+            self.token = token
+            self.session_location = response.headers.get('Location')
+            self.session_started = time.monotonic()
+
+    def delete_session(self):
+        if self.token is None:
+            return
+        if self.session_location:
+            with self.client.delete(self.session_location,
+                                    headers={'X-Auth-Token': self.token},
+                                    catch_response=True,
+                                    name="Session Delete") as response:
+                if response.status_code not in (200, 204):
+                    response.failure(f"Status code: {response.status_code}")
+        self.token = None
+        self.session_location = None
+
+    def request_auth(self):
+        if self.token is None:
+            self.create_session()
+        elif self.session_lifetime and time.monotonic() - self.session_started >= self.session_lifetime:
+            self.delete_session()
+            self.create_session()
+        return {'headers': {'X-Auth-Token': self.token or ''}}
+
+    def unauthorized(self):
+        # Сессию удалили или она истекла на стороне BMC - следующий запрос войдет заново
+        self.token = None
+        self.session_location = None
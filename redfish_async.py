@@ -0,0 +1,251 @@
+"""
+Асинхронный клиент Redfish на httpx.
+
+Один процесс держит пул keep-alive соединений (HTTP/1.1, по желанию HTTP/2)
+и сотни одновременных запросов; число одновременных запросов к каждому BMC
+ограничено семафором. Для GET/HEAD транспортные ошибки и 502/503/504
+повторяются с экспоненциальной задержкой, POST/PATCH/DELETE - только если
+соединение не установилось; на 401 клиент перелогинивается. С capture=CaptureWriter
+каждая попытка запроса дописывается в JSONL (redfish_capture.py), с
+latency=LatencyRecorder - ее задержка по фазам из трассировки httpx (connect, tls,
+ttfb, total) пишется в гистограммы (latency_histogram.py).
+
+    async with AsyncRedfishClient("https://bmc:2443", "root", "0penBmc") as client:
+        system = await client.get_system()
+        await client.reset("ForceOn")
+"""
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+SERVICE_ROOT = '/redfish/v1/'
+SESSIONS_PATH = '/redfish/v1/SessionService/Sessions'
+RETRY_STATUSES = (502, 503, 504)
+# Повторять можно только запросы без побочных эффектов: повтор POST ComputerSystem.Reset,
+# который BMC уже принял, перезагрузил бы хост второй раз
+IDEMPOTENT_METHODS = ('GET', 'HEAD')
+# Ошибки до отправки запроса - BMC его не видел, повтор безопасен для любого метода
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+# События трассировки httpcore, длительность которых пишется как фаза запроса
+TRACE_PHASES = {'connection.connect_tcp': 'connect', 'connection.start_tls': 'tls'}
+
+
+def phase_tracer(phases):
+    """Обработчик extensions={'trace': ...} httpx: заполняет phases длительностями фаз, с"""
+    marks = {}
+
+    async def trace(name, info):
+        event, _, stage = name.rpartition('.')
+        now = time.perf_counter()
+        if stage == 'started':
+            marks[event] = now
+        elif stage == 'complete':
+            if event in TRACE_PHASES:
+                phases[TRACE_PHASES[event]] = now - marks.get(event, now)
+            elif event.endswith('.receive_response_headers'):
+                sent = next((marks[e] for e in marks if e.endswith('.send_request_headers')), now)
+                phases['ttfb'] = now - sent
+    return trace
+
+
+class RedfishError(Exception):
+    """Неуспешный ответ Redfish"""
+
+    def __init__(self, method, url, status_code, body=''):
+        super().__init__(f"{method} {url}: {status_code} {body[:200]}")
+        self.status_code = status_code
+
+
+class AsyncRedfishClient:
+    """
+    auth='session' - вход через SessionService и X-Auth-Token,
+    auth='basic' - HTTP Basic на каждый запрос (как у старых тестов и locust).
+    """
+
+    def __init__(self, base_url, username, password, auth='session', http2=False,
+                 max_connections=100, per_host_concurrency=32, timeout=30.0,
+                 retries=2, retry_backoff=0.2, verify=False, capture=None, latency=None):
+        if auth not in ('session', 'basic'):
+            raise ValueError(f"Неизвестный режим аутентификации: {auth}")
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.auth = auth
+        self.http2 = http2
+        self.per_host_concurrency = per_host_concurrency
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.capture = capture
+        self.latency = latency
+        self.session_uri = None
+        self._token = None
+        self._semaphores = {}
+        self._auth_lock = asyncio.Lock()
+        self._client = httpx.AsyncClient(
+            http2=http2,
+            verify=verify,
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+            auth=(username, password) if auth == 'basic' else None,
+        )
+
+    async def __aenter__(self):
+        if self.auth == 'session':
+            await self.login()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def url(self, path):
+        if path.startswith(('http://', 'https://')):
+            return path
+        return self.base_url + path
+
+    def _semaphore(self, url):
+        host = urlsplit(url).netloc
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return semaphore
+
+    # --- сессии ----------------------------------------------------------
+
+    async def create_session(self):
+        """Создает сессию Redfish; возвращает (X-Auth-Token, URI сессии)"""
+        response = await self._client.post(
+            self.url(SESSIONS_PATH),
+            json={'UserName': self.username, 'Password': self.password},
+            auth=None)
+        token = response.headers.get('X-Auth-Token')
+        if response.status_code not in (200, 201) or not token:
+            raise RedfishError('POST', SESSIONS_PATH, response.status_code, response.text)
+        session_uri = response.headers.get('Location')
+        if not session_uri:
+            session_uri = response.json().get('@odata.id')
+        return token, session_uri
+
+    async def delete_session(self, session_uri, token=None):
+        headers = {'X-Auth-Token': token} if token else None
+        response = await self._client.delete(self.url(session_uri), headers=headers)
+        return response.status_code
+
+    async def login(self):
+        self._token, self.session_uri = await self.create_session()
+        self._client.headers['X-Auth-Token'] = self._token
+
+    async def logout(self):
+        if self.session_uri and self._token:
+            try:
+                await self.delete_session(self.session_uri)
+            except httpx.HTTPError:
+                pass
+        self.session_uri = None
+        self._token = None
+        self._client.headers.pop('X-Auth-Token', None)
+
+    async def close(self):
+        await self.logout()
+        await self._client.aclose()
+
+    # --- запросы ---------------------------------------------------------
+
+    async def request(self, method, path, **kwargs):
+        """
+        Запрос с ограничением конкурентности на хост, повторами и перелогином на 401.
+        GET/HEAD повторяются при сетевых ошибках и 502/503/504, остальные методы -
+        только если соединение не удалось установить и запрос не был отправлен.
+        """
+        url = self.url(path)
+        async with self._semaphore(url):
+            return await self._request(method, url, **kwargs)
+
+    async def _request(self, method, url, **kwargs):
+        """Попытки запроса; вызывается под семафором хоста"""
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempt = 0
+        relogged = False
+        while True:
+            token = self._token
+            started, began = time.time(), time.perf_counter()
+            attempt_kwargs = kwargs
+            if self.latency is not None:
+                phases = {}
+                attempt_kwargs = dict(kwargs, extensions={**kwargs.get('extensions', {}),
+                                                          'trace': phase_tracer(phases)})
+            try:
+                response = await self._client.request(method, url, **attempt_kwargs)
+            except (httpx.TransportError, httpx.TimeoutException) as e:
+                if self.capture is not None:
+                    self.capture.record(method, url, kwargs.get('json'), started,
+                                        time.perf_counter() - began, error=repr(e))
+                if attempt >= self.retries or not (idempotent or isinstance(e, UNSENT_ERRORS)):
+                    raise
+            else:
+                if self.latency is not None:
+                    phases['total'] = time.perf_counter() - began
+                    self.latency.record(method, url, phases)
+                if self.capture is not None:
+                    self.capture.record(method, url, kwargs.get('json'), started, time.perf_counter() - began,
+                                        response.status_code, len(response.content))
+                if response.status_code == 401 and token is not None and not relogged:
+                    relogged = True
+                    async with self._auth_lock:
+                        if self._token == token:
+                            await self.login()
+                    continue
+                if not idempotent or response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return response
+            attempt += 1
+            await asyncio.sleep(self.retry_backoff * (2 ** (attempt - 1)))
+
+    async def get_json(self, path):
+        response = await self.request('GET', path)
+        if response.status_code != 200:
+            raise RedfishError('GET', path, response.status_code, response.text)
+        return response.json()
+
+    async def timed_request(self, method, path, **kwargs):
+        """
+        Запрос с замером времени: (response или исключение, секунды). Время идет от
+        захвата семафора хоста, то есть от отправки: ожидание в очереди клиента в него не входит.
+        """
+        url = self.url(path)
+        async with self._semaphore(url):
+            started = time.perf_counter()
+            try:
+                response = await self._request(method, url, **kwargs)
+            except httpx.HTTPError as e:
+                return e, time.perf_counter() - started
+            return response, time.perf_counter() - started
+
+    # --- типовые ресурсы -------------------------------------------------
+
+    async def get_service_root(self):
+        return await self.get_json(SERVICE_ROOT)
+
+    async def get_system(self, system_id='system'):
+        return await self.get_json(f'/redfish/v1/Systems/{system_id}')
+
+    async def get_power_state(self, system_id='system'):
+        return (await self.get_system(system_id)).get('PowerState')
+
+    async def reset(self, reset_type, system_id='system'):
+        """ComputerSystem.Reset; возвращает код ответа (202/204 - команда принята)"""
+        path = f'/redfish/v1/Systems/{system_id}/Actions/ComputerSystem.Reset'
+        response = await self.request('POST', path, json={'ResetType': reset_type})
+        if response.status_code not in (200, 202, 204):
+            raise RedfishError('POST', path, response.status_code, response.text)
+        return response.status_code
+
+    async def get_thermal(self, chassis_id='chassis'):
+        return await self.get_json(f'/redfish/v1/Chassis/{chassis_id}/Thermal')
+
+    async def get_thermal_metrics(self, chassis_id='chassis'):
+        return await self.get_json(f'/redfish/v1/Chassis/{chassis_id}/ThermalSubsystem/ThermalMetrics')
+
+    async def get_manager(self, manager_id='bmc'):
+        return await self.get_json(f'/redfish/v1/Managers/{manager_id}')
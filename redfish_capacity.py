@@ -0,0 +1,200 @@
+"""
+Поиск максимальной устойчивой нагрузки bmcweb по SLO.
+
+Для каждого endpoint и режима аутентификации (session, basic) интенсивность
+открытого цикла (redfish_load.run_open_loop) растет в --growth раз за пробу,
+начиная с --start-rate, пока проба не нарушит SLO: p99 задержки от планового
+времени отправки больше --slo-p99 мс или доля ошибок больше --slo-errors.
+Затем граница уточняется двоичным поиском между последней выдержанной и
+первой нарушившей интенсивностью до точности --resolution.
+
+Итог - максимальная устойчивая интенсивность (rps) на endpoint и режим, вместе
+с версией прошивки BMC; это число сравнивается между сборками. Если решающую
+пробу испортил сам генератор (опоздание больше половины p99 SLO), ограничение
+отмечается как 'client' - предел BMC выше найденного.
+
+    python redfish_capacity.py --url https://bmc:2443 --slo-p99 500 --json reports/loadtest/capacity.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+
+from redfish_async import AsyncRedfishClient
+from redfish_load import run_open_loop
+
+DEFAULT_ENDPOINTS = ['/redfish/v1/Systems/system', '/redfish/v1/Chassis/chassis/Thermal',
+                     '/redfish/v1/Managers/bmc', '/redfish/v1/']
+AUTH_MODES = ('session', 'basic')
+
+
+class Slo:
+    def __init__(self, p99_ms=500.0, error_rate=0.01):
+        self.p99_ms = p99_ms
+        self.error_rate = error_rate
+
+    def check(self, row, info):
+        """(выдержано, причина) для пробы; row - сводка endpoint'а, info - сведения run_open_loop"""
+        scheduled = info['scheduled'] or 1
+        # Отброшенные запросы run_open_loop уже считает ошибками endpoint'а
+        errors = row['errors'] if row else info['dropped']
+        if row is None or row['requests'] == 0:
+            return False, "нет ответов"
+        if errors / scheduled > self.error_rate:
+            return False, f"ошибки {errors / scheduled:.1%} > {self.error_rate:.1%}"
+        if row['p99_ms'] > self.p99_ms:
+            return False, f"p99 {row['p99_ms']:.0f} мс > {self.p99_ms:g} мс"
+        return True, None
+
+    def to_dict(self):
+        return {'p99_ms': self.p99_ms, 'error_rate': self.error_rate}
+
+
+async def run_trial(args, endpoint, auth, rate):
+    summary, _, info, _ = await run_open_loop(
+        args.url, args.username, args.password, [endpoint], rate, args.trial_duration,
+        max_in_flight=args.max_in_flight, connections=args.connections, auth=auth, http2=args.http2)
+    row = summary.get(endpoint)
+    ok, reason = args.slo.check(row, info)
+    trial = {
+        'rate': rate,
+        'ok': ok,
+        'reason': reason,
+        'requests': info['scheduled'],
+        'errors': row['errors'] if row else info['dropped'],
+        'p50_ms': row['p50_ms'] if row else None,
+        'p99_ms': row['p99_ms'] if row else None,
+        'max_lag_ms': info['max_lag_ms'],
+        # Генератор опаздывал на половину SLO: проба мерила клиент, а не BMC
+        'client_limited': info['max_lag_ms'] > args.slo.p99_ms / 2,
+    }
+    mark = 'OK ' if ok else 'НЕТ'
+    p99 = '-' if trial['p99_ms'] is None else f"{trial['p99_ms']:.1f}"
+    print(f"  {mark} {rate:9.1f} rps  p99 {p99:>8} мс  ошибок {trial['errors']}" +
+          (f"  ({reason})" if reason else ""))
+    if trial['client_limited']:
+        print(f"  Генератор опаздывал до {info['max_lag_ms']:.0f} мс: проба ограничена клиентом, а не BMC")
+    # Пауза, чтобы очередь bmcweb разошлась и не испортила следующую пробу
+    await asyncio.sleep(args.cooldown)
+    return trial
+
+
+async def find_max_rps(args, endpoint, auth):
+    """Рост интенсивности до нарушения SLO, затем двоичный поиск границы"""
+    trials = []
+    passed = 0.0
+    failed = None
+    rate = args.start_rate
+    while rate <= args.max_rate:
+        trial = await run_trial(args, endpoint, auth, rate)
+        trials.append(trial)
+        if not trial['ok']:
+            failed = rate
+            break
+        passed = rate
+        rate *= args.growth
+
+    if failed is not None:
+        while failed - passed > max(args.resolution * passed, 1.0):
+            rate = (passed + failed) / 2
+            trial = await run_trial(args, endpoint, auth, rate)
+            trials.append(trial)
+            if trial['ok']:
+                passed = rate
+            else:
+                failed = rate
+
+    last_failure = next((t for t in reversed(trials) if not t['ok']), None)
+    if last_failure is None:
+        # Потолок --max-rate выдержан: настоящий предел выше
+        limited_by = 'max_rate'
+    elif last_failure['client_limited']:
+        # Нарушение SLO вызвал сам генератор нагрузки: предел BMC не найден
+        limited_by = 'client'
+    else:
+        limited_by = last_failure['reason']
+    return {
+        'endpoint': endpoint,
+        'auth': auth,
+        'max_rps': passed,
+        'limited_by': limited_by,
+        'trials': trials,
+    }
+
+
+async def firmware_version(args):
+    try:
+        async with AsyncRedfishClient(args.url, args.username, args.password, auth=args.auth[0]) as client:
+            return (await client.get_manager()).get('FirmwareVersion')
+    except Exception as e:
+        print(f"Версия прошивки недоступна: {e}")
+        return None
+
+
+async def run_search(args):
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'url': args.url,
+        'firmware': await firmware_version(args),
+        'slo': args.slo.to_dict(),
+        'trial_duration_s': args.trial_duration,
+        'results': [],
+    }
+    for auth in args.auth:
+        for endpoint in args.endpoints:
+            print(f"{endpoint} ({auth}):")
+            report['results'].append(await find_max_rps(args, endpoint, auth))
+    return report
+
+
+def print_report(report):
+    print(f"Прошивка: {report['firmware'] or '-'}, SLO: p99 <= {report['slo']['p99_ms']:g} мс, "
+          f"ошибок <= {report['slo']['error_rate']:.1%}")
+    print(f"{'Endpoint':50} {'auth':>8} {'max rps':>9}  ограничение")
+    for result in report['results']:
+        print(f"{result['endpoint']:50} {result['auth']:>8} {result['max_rps']:9.1f}  {result['limited_by']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Максимальная устойчивая нагрузка Redfish по SLO')
+    parser.add_argument('--url', default=os.getenv('OPENBMC_URL', 'https://localhost:2443'))
+    parser.add_argument('--username', default=os.getenv('OPENBMC_USERNAME', 'root'))
+    parser.add_argument('--password', default=os.getenv('OPENBMC_PASSWORD', '0penBmc'))
+    parser.add_argument('--endpoint', action='append', dest='endpoints',
+                        help='Путь Redfish (можно несколько раз)')
+    parser.add_argument('--auth', action='append', choices=AUTH_MODES,
+                        help='Режим аутентификации (можно несколько раз); по умолчанию оба')
+    parser.add_argument('--slo-p99', type=float, default=float(os.getenv('OPENBMC_SLO_P99_MS', '500')),
+                        help='Допустимый p99 задержки, мс')
+    parser.add_argument('--slo-errors', type=float, default=float(os.getenv('OPENBMC_SLO_ERROR_RATE', '0.01')),
+                        help='Допустимая доля ошибок')
+    parser.add_argument('--start-rate', type=float, default=10, help='Начальная интенсивность, rps')
+    parser.add_argument('--max-rate', type=float, default=2000, help='Предел поиска, rps')
+    parser.add_argument('--growth', type=float, default=2.0, help='Рост интенсивности между пробами')
+    parser.add_argument('--resolution', type=float, default=0.1, help='Точность двоичного поиска, доля')
+    parser.add_argument('--trial-duration', type=float, default=20, help='Длительность пробы, с')
+    parser.add_argument('--cooldown', type=float, default=2, help='Пауза между пробами, с')
+    parser.add_argument('--connections', type=int, default=100)
+    parser.add_argument('--max-in-flight', type=int, default=1000)
+    parser.add_argument('--http2', action='store_true')
+    parser.add_argument('--json', help='Сохранить отчет в JSON')
+    args = parser.parse_args()
+    args.endpoints = args.endpoints or DEFAULT_ENDPOINTS
+    args.auth = args.auth or list(AUTH_MODES)
+    args.slo = Slo(args.slo_p99, args.slo_errors)
+    if args.growth <= 1:
+        parser.error("--growth должен быть больше 1")
+
+    report = asyncio.run(run_search(args))
+    print_report(report)
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0 if report['results'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,283 @@
+"""
+Запись трафика Redfish и его воспроизведение.
+
+Клиенты RedfishClient и AsyncRedfishClient с capture=CaptureWriter(...) дописывают
+каждый запрос строкой JSONL:
+
+    {"ts": 1700000000.123, "method": "GET", "path": "/redfish/v1/Systems/system",
+     "body": null, "status": 200, "elapsed_ms": 4.2, "size": 1534}
+
+Пароли в теле запроса заменяются на "***", потоковые ответы (SSE) помечаются
+"stream": true и при воспроизведении пропускаются. По умолчанию запись идет в
+reports/capture/, тестам ее включает OPENBMC_CAPTURE (путь к файлу или 1);
+расширение .gz или .zst включает сжатие (см. jsonl_stream.py).
+
+replay() читает запись потоком и повторяет запросы на BMC или эмуляторе:
+с исходными интервалами, в N раз быстрее (--speed N) или без пауз
+(--speed 0), не более --concurrency запросов одновременно. Изменяющие запросы
+(POST/PATCH/DELETE) повторяются только с --include-writes; скрытые "***" пароли
+(и UserName рядом с ними, например при входе через SessionService) заменяются
+учетными данными воспроизводящего клиента.
+
+    python redfish_capture.py replay reports/capture/prod.jsonl --url http://127.0.0.1:12443 --speed 4
+    python redfish_capture.py compare reports/capture/fw-2.14.jsonl reports/capture/fw-2.15.jsonl
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from jsonl_stream import JsonlWriter, iter_records, stream_stats
+
+CAPTURE_DIR = os.path.join('reports', 'capture')
+READ_METHODS = ('GET', 'HEAD')
+SECRET_KEYS = ('Password', 'password')
+
+
+def default_capture_path(prefix='capture'):
+    return os.path.join(CAPTURE_DIR, f"{prefix}-{datetime.now():%Y%m%d-%H%M%S}.jsonl")
+
+
+def redact(body):
+    if isinstance(body, dict):
+        return {key: '***' if key in SECRET_KEYS else redact(value) for key, value in body.items()}
+    if isinstance(body, list):
+        return [redact(value) for value in body]
+    return body
+
+
+def restore_credentials(body, username, password):
+    """Обратное к redact(): "***" -> password, UserName рядом со скрытым паролем -> username"""
+    if isinstance(body, dict):
+        result = {key: password if key in SECRET_KEYS and value == '***'
+                  else restore_credentials(value, username, password) for key, value in body.items()}
+        if 'UserName' in result and any(body.get(key) == '***' for key in SECRET_KEYS):
+            result['UserName'] = username
+        return result
+    if isinstance(body, list):
+        return [restore_credentials(value, username, password) for value in body]
+    return body
+
+
+def request_path(url):
+    """Путь с query без схемы и хоста - запись не привязана к конкретному BMC"""
+    parts = urlsplit(url)
+    return f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+
+class CaptureWriter:
+    """
+    Потокобезопасная запись трафика через jsonl_stream.JsonlWriter: буфер,
+    сжатие по расширению (.gz, .zst) и индекс блоков по времени. Записи
+    попадают на диск блоками и при close().
+    """
+
+    def __init__(self, path=None, **writer_kwargs):
+        self.path = path or default_capture_path()
+        self._writer = JsonlWriter(self.path, **writer_kwargs)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """CaptureWriter по OPENBMC_CAPTURE или None, если запись не включена"""
+        value = os.getenv('OPENBMC_CAPTURE')
+        if not value or value == '0':
+            return None
+        worker = os.getenv('PYTEST_XDIST_WORKER')
+        if value == '1':
+            # Имя по умолчанию с точностью до секунды - воркеры, стартовавшие вместе, его бы делили
+            return cls(default_capture_path(f'capture-{worker}' if worker else 'capture'))
+        path = value
+        if worker:
+            # Свой файл на воркер pytest-xdist: у каждого файла свой буфер и индекс
+            base, sep, rest = path.partition('.jsonl')
+            path = f"{base}-{worker}{sep}{rest}"
+        return cls(path)
+
+    @property
+    def records(self):
+        return self._writer.records
+
+    def record(self, method, url, body, started, elapsed, status=None, size=None, error=None, stream=False):
+        record = {
+            'ts': round(started, 6),
+            'method': method,
+            'path': request_path(url),
+            'body': redact(body),
+            'status': status,
+            'elapsed_ms': round(elapsed * 1000, 3),
+            'size': size,
+        }
+        if error is not None:
+            record['error'] = error
+        if stream:
+            record['stream'] = True
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._writer.write_line(line, record['ts'])
+
+    def close(self):
+        with self._lock:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_capture(path, start=None, end=None):
+    """Записи по одной, без загрузки файла в память; start/end - диапазон времени"""
+    return iter_records(path, start, end)
+
+
+async def replay(records, client, speed=1.0, concurrency=32, include_writes=False, capture=None):
+    """
+    Повторяет записи через AsyncRedfishClient. speed=1 - исходный темп,
+    N - в N раз быстрее, 0 - без пауз. Возвращает (LoadStats, длительность, сведения).
+    """
+    from redfish_load import LoadStats
+    stats = LoadStats()
+    semaphore = asyncio.Semaphore(concurrency)
+    pending = set()
+    info = {'sent': 0, 'skipped': 0, 'streams': 0, 'max_lag_ms': 0.0}
+    loop = asyncio.get_running_loop()
+    origin = None
+    started = loop.time()
+
+    async def send(record):
+        try:
+            body = restore_credentials(record.get('body'), client.username, client.password)
+            kwargs = {'json': body} if body is not None else {}
+            sent_at = time.time()
+            response, seconds = await client.timed_request(record['method'], record['path'], **kwargs)
+            key = f"{record['method']} {record['path']}"
+            if isinstance(response, Exception):
+                stats.record(key, seconds, False)
+                if capture is not None:
+                    capture.record(record['method'], record['path'], body, sent_at, seconds, error=str(response))
+                return
+            stats.record(key, seconds, response.status_code < 400)
+            if capture is not None:
+                capture.record(record['method'], record['path'], body, sent_at, seconds,
+                               response.status_code, len(response.content))
+        finally:
+            semaphore.release()
+
+    for record in records:
+        if record.get('stream'):
+            # Подписка SSE держит соединение до закрытия - ее длительность не задержка запроса
+            info['streams'] += 1
+            continue
+        if record['method'] not in READ_METHODS and not include_writes:
+            info['skipped'] += 1
+            continue
+        if speed:
+            origin = record['ts'] if origin is None else origin
+            due = started + (record['ts'] - origin) / speed
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await semaphore.acquire()
+        if speed:
+            # Насколько запрос опоздал против записи: BMC не успевает или мала --concurrency
+            info['max_lag_ms'] = max(info['max_lag_ms'], (loop.time() - due) * 1000)
+        task = asyncio.create_task(send(record))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+        info['sent'] += 1
+    if pending:
+        await asyncio.gather(*pending)
+    return stats, loop.time() - started, info
+
+
+def compare(baseline, current):
+    """Разница перцентилей двух сводок (stream_stats, LoadStats.summary) по общим endpoint'ам"""
+    result = {}
+    for endpoint in sorted(set(baseline) & set(current)):
+        result[endpoint] = {
+            field: {'baseline': baseline[endpoint][field], 'current': current[endpoint][field],
+                    'change': (current[endpoint][field] / baseline[endpoint][field] - 1)
+                    if baseline[endpoint][field] else None}
+            for field in ('p50_ms', 'p95_ms', 'p99_ms')
+        }
+    return result
+
+
+def print_compare(result):
+    print(f"{'Endpoint':<60} {'p50':>16} {'p95':>16} {'p99':>16}")
+    for endpoint, fields in result.items():
+        cells = []
+        for field in ('p50_ms', 'p95_ms', 'p99_ms'):
+            value = fields[field]
+            change = '' if value['change'] is None else f" ({value['change']:+.0%})"
+            cells.append(f"{value['current']:.1f}{change}")
+        print(f"{endpoint:<60} {cells[0]:>16} {cells[1]:>16} {cells[2]:>16}")
+
+
+async def run_replay(args):
+    from redfish_async import AsyncRedfishClient
+    from redfish_load import print_summary
+    capture = CaptureWriter(args.output) if args.output else None
+    try:
+        async with AsyncRedfishClient(args.url, args.username, args.password, auth=args.auth,
+                                      max_connections=args.concurrency,
+                                      per_host_concurrency=args.concurrency) as client:
+            stats, elapsed, info = await replay(read_capture(args.capture), client, args.speed,
+                                                args.concurrency, args.include_writes, capture)
+    finally:
+        if capture is not None:
+            capture.close()
+    summary = stats.summary(elapsed)
+    print_summary(summary, elapsed)
+    print(f"Отправлено: {info['sent']}, пропущено изменяющих: {info['skipped']}, потоков: {info['streams']}, "
+          f"макс. опоздание: {info['max_lag_ms']:.1f} мс")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'summary': summary, 'elapsed': elapsed, **info}, f, indent=2)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Запись и воспроизведение трафика Redfish')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    replay_parser = commands.add_parser('replay', help='Повторить запись на BMC')
+    replay_parser.add_argument('capture')
+    replay_parser.add_argument('--url', default=os.getenv('OPENBMC_URL', 'https://localhost:2443'))
+    replay_parser.add_argument('--username', default=os.getenv('OPENBMC_USERNAME', 'root'))
+    replay_parser.add_argument('--password', default=os.getenv('OPENBMC_PASSWORD', '0penBmc'))
+    replay_parser.add_argument('--auth', choices=['session', 'basic'], default='session')
+    replay_parser.add_argument('--speed', type=float, default=1.0, help='Множитель темпа; 0 - без пауз')
+    replay_parser.add_argument('--concurrency', type=int, default=32)
+    replay_parser.add_argument('--include-writes', action='store_true', help='Повторять POST/PATCH/DELETE')
+    replay_parser.add_argument('--output', help='Записать ответы воспроизведения в JSONL')
+    replay_parser.add_argument('--json', help='Сохранить сводку в JSON')
+
+    compare_parser = commands.add_parser('compare', help='Сравнить задержки двух записей')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--json', help='Сохранить сравнение в JSON')
+
+    args = parser.parse_args()
+    if args.command == 'replay':
+        return asyncio.run(run_replay(args))
+
+    baseline, _ = stream_stats(read_capture(args.baseline))
+    current, _ = stream_stats(read_capture(args.current))
+    result = compare(baseline, current)
+    print_compare(result)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Клиент Redfish для тестов OpenBMC.
+
+RedfishClient - это requests.Session, который один раз входит через
+SessionService, дальше ходит с X-Auth-Token по ограниченному пулу keep-alive
+соединений, перелогинивается на 401 и удаляет свою сессию при закрытии.
+Вместо Basic auth на каждый запрос BMC проверяет пароль (PAM) только при входе.
+
+С cache_ttl клиент кэширует GET-ответы по @odata.id: свежие отдаются без
+запроса, устаревшие перепроверяются через If-None-Match (304 - без тела),
+а действия и изменяющие запросы сбрасывают кэш.
+
+С capture=redfish_capture.CaptureWriter(...) каждый запрос к BMC (без ответов из
+кэша, включая создание сессии) дописывается в JSONL для воспроизведения, с latency=LatencyRecorder() -
+его задержка (total и ttfb) пишется в гистограмму endpoint'а.
+"""
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SESSIONS_PATH = '/redfish/v1/SessionService/Sessions'
+
+
+class RedfishAuthError(Exception):
+    """Не удалось создать сессию через SessionService"""
+
+
+class CacheEntry:
+    __slots__ = ('response', 'etag', 'stored_at')
+
+    def __init__(self, response, etag):
+        self.response = response
+        self.etag = etag
+        self.stored_at = time.monotonic()
+
+    @property
+    def age(self):
+        return time.monotonic() - self.stored_at
+
+
+class ResourceCache:
+    """Кэш GET-ответов Redfish на время прогона, ключ - @odata.id (путь ресурса с query)"""
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url):
+        parts = urlsplit(url)
+        path = parts.path.rstrip('/') or '/'
+        return f'{path}?{parts.query}' if parts.query else path
+
+    def lookup(self, url):
+        with self._lock:
+            return self._entries.get(self.key(url))
+
+    def store(self, url, response):
+        entry = CacheEntry(response, response.headers.get('ETag'))
+        with self._lock:
+            self._entries[self.key(url)] = entry
+        return entry
+
+    def refresh(self, entry):
+        """Ресурс не изменился (304) - продлеваем жизнь записи"""
+        entry.stored_at = time.monotonic()
+
+    def discard(self, url):
+        with self._lock:
+            self._entries.pop(self.key(url), None)
+
+    def invalidate(self, url=None):
+        """Сбрасывает запись ресурса вместе с его подресурсами и коллекцией; без url - весь кэш"""
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+                return
+            key = self.key(url)
+            parent = key.rsplit('/', 1)[0]
+            for cached in list(self._entries):
+                path = cached.split('?', 1)[0]
+                if path == key or path.startswith(key + '/') or path == parent:
+                    del self._entries[cached]
+
+    def invalidate_after(self, method, url):
+        """Инвалидация после изменяющего запроса"""
+        if '/Actions/' in urlsplit(url).path:
+            # Действие (Reset и т.п.) меняет состояние сразу нескольких ресурсов
+            self.invalidate()
+        else:
+            self.invalidate(url)
+
+
+class RedfishClient(requests.Session):
+    """Аутентифицированная по токену сессия Redfish с пулом соединений"""
+
+    def __init__(self, base_url, username, password, pool_size=10, verify=False, timeout=30,
+                 cache_ttl=None, capture=None, latency=None):
+        super().__init__()
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.verify = verify
+        self.timeout = timeout
+        self.session_uri = None
+        self.cache = ResourceCache(cache_ttl) if cache_ttl is not None else None
+        self.capture = capture
+        self.latency = latency
+        self._auth_lock = threading.Lock()
+
+        # pool_block=True: не больше pool_size соединений к BMC одновременно
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def url(self, path):
+        """Полный URL для пути Redfish; абсолютные URL возвращаются как есть"""
+        if path.startswith(('http://', 'https://')):
+            return path
+        return self.base_url + path
+
+    @property
+    def token(self):
+        return self.headers.get('X-Auth-Token')
+
+    def login(self):
+        """Создает сессию через SessionService и запоминает X-Auth-Token"""
+        # Через _wire: вход попадает в запись трафика и гистограммы задержек, но без перелогина на 401
+        response = self._wire(
+            'POST', self.url(SESSIONS_PATH),
+            json={'UserName': self.username, 'Password': self.password},
+            headers={'X-Auth-Token': None},
+            timeout=self.timeout)
+        token = response.headers.get('X-Auth-Token')
+        if response.status_code not in (200, 201) or not token:
+            raise RedfishAuthError(
+                f"Не удалось создать сессию: {response.status_code}. Ответ: {response.text[:200]}")
+
+        session_uri = response.headers.get('Location')
+        if not session_uri:
+            try:
+                session_uri = response.json().get('@odata.id')
+            except ValueError:
+                session_uri = None
+        self.session_uri = session_uri
+        self.headers['X-Auth-Token'] = token
+        return response
+
+    def logout(self):
+        """Удаляет сессию на BMC, чтобы не упираться в лимит сессий"""
+        session_uri, self.session_uri = self.session_uri, None
+        if session_uri and self.token:
+            try:
+                super().request('DELETE', self.url(session_uri), timeout=self.timeout)
+            except requests.RequestException:
+                pass
+        self.headers.pop('X-Auth-Token', None)
+
+    def request(self, method, url, *args, max_age=None, **kwargs):
+        """
+        max_age - допустимый возраст кэшированного ответа для GET, секунды.
+        None - TTL кэша, 0 - всегда перепроверять ресурс на BMC.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        url = self.url(url)
+        method = method.upper()
+        if self.cache is None or kwargs.get('stream') or kwargs.get('params'):
+            return self._send(method, url, *args, **kwargs)
+        if method == 'GET':
+            return self._cached_get(url, max_age, *args, **kwargs)
+
+        response = self._send(method, url, *args, **kwargs)
+        if method not in ('HEAD', 'OPTIONS'):
+            self.cache.invalidate_after(method, url)
+        return response
+
+    def _cached_get(self, url, max_age, *args, **kwargs):
+        cache = self.cache
+        max_age = cache.ttl if max_age is None else max_age
+        entry = cache.lookup(url)
+        if entry is not None:
+            if entry.age < max_age:
+                cache.hits += 1
+                return entry.response
+            if entry.etag:
+                headers = dict(kwargs.pop('headers', None) or {})
+                headers['If-None-Match'] = entry.etag
+                kwargs['headers'] = headers
+
+        response = self._send('GET', url, *args, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            cache.revalidated += 1
+            cache.refresh(entry)
+            return entry.response
+        cache.misses += 1
+        if response.status_code == 200:
+            cache.store(url, response)
+        else:
+            cache.discard(url)
+        return response
+
+    def invalidate(self, path=None):
+        """Явно сбрасывает кэш ресурса (или весь кэш)"""
+        if self.cache is not None:
+            self.cache.invalidate(None if path is None else self.url(path))
+
+    def _wire(self, method, url, *args, **kwargs):
+        if self.capture is None and self.latency is None:
+            return super().request(method, url, *args, **kwargs)
+        started, began = time.time(), time.perf_counter()
+        body = kwargs.get('json', kwargs.get('data'))
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.RequestException as e:
+            if self.capture is not None:
+                self.capture.record(method, url, body, started, time.perf_counter() - began, error=str(e))
+            raise
+        elapsed = time.perf_counter() - began
+        if self.latency is not None:
+            # response.elapsed - от отправки запроса до разбора заголовков ответа
+            self.latency.record(method, url, {'total': elapsed, 'ttfb': response.elapsed.total_seconds()})
+        if self.capture is not None:
+            # Тело потокового ответа не читаем - размер из Content-Length
+            size = response.headers.get('Content-Length') if kwargs.get('stream') else len(response.content)
+            self.capture.record(method, url, body, started, elapsed,
+                                response.status_code, int(size) if size is not None else None,
+                                stream=bool(kwargs.get('stream')))
+        return response
+
+    def _send(self, method, url, *args, **kwargs):
+        token = self.token
+        response = self._wire(method, url, *args, **kwargs)
+
+        # Токен истек или сессию удалили на BMC - входим заново и повторяем запрос один раз
+        if response.status_code == 401 and token is not None:
+            with self._auth_lock:
+                if self.token == token:
+                    self.session_uri = None
+                    self.login()
+            response = self._wire(method, url, *args, **kwargs)
+        return response
+
+    def close(self):
+        self.logout()
+        super().close()
@@ -0,0 +1,262 @@
+"""
+Обход всего дерева Redfish начиная с /redfish/v1/.
+
+Ресурсы запрашиваются параллельно через AsyncRedfishClient, каждый @odata.id
+загружается один раз. Если ProtocolFeaturesSupported в Service Root объявляет
+$expand, подчиненные ресурсы приходят вложенными в ответ родителя, и BMC
+инвентаризируется за несколько запросов. С --select (и SelectQuery на BMC)
+элементы коллекций запрашиваются только с нужными свойствами, а их поддерево
+не обходится - режим быстрой инвентаризации.
+
+Результат - JSON-снимок (ресурсы, задержка каждого запроса, гистограмма
+задержек, ошибки):
+
+    python redfish_crawler.py --url https://bmc:2443 --output reports/redfish_snapshot.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from bisect import bisect_left
+
+from redfish_async import AsyncRedfishClient, SERVICE_ROOT
+
+# Верхние границы корзин гистограммы задержек, мс
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def resource_id(odata_id):
+    """Ключ дедупликации: путь без фрагмента (#/Temperatures/0) и завершающего '/'"""
+    path = odata_id.split('#', 1)[0]
+    if len(path) > 1:
+        path = path.rstrip('/')
+    return path
+
+
+def latency_histogram(latencies_ms):
+    """Число запросов по корзинам LATENCY_BUCKETS_MS; последняя корзина - все, что дольше"""
+    labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+    counts = [0] * len(labels)
+    for value in latencies_ms:
+        counts[bisect_left(LATENCY_BUCKETS_MS, value)] += 1
+    return dict(zip(labels, counts))
+
+
+def expand_query(features, max_levels=None):
+    """Значение $expand, которое поддерживает сервис, или None"""
+    expand = (features or {}).get('ExpandQuery') or {}
+    if expand.get('NoLinks'):
+        mode = '.'
+    elif expand.get('ExpandAll'):
+        mode = '*'
+    else:
+        return None
+    if not expand.get('Levels'):
+        return mode
+    levels = expand.get('MaxLevels', 1)
+    if max_levels is not None:
+        levels = min(levels, max_levels)
+    return f"{mode}($levels={levels})"
+
+
+class CrawlResult:
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.resources = {}
+        self.latencies = {}
+        self.errors = {}
+        self.expand = None
+        self.select = None
+        self.requests = 0
+        self.elapsed = 0.0
+
+    def slowest(self, count=10):
+        return sorted(self.latencies.items(), key=lambda item: item[1], reverse=True)[:count]
+
+    def to_dict(self):
+        return {
+            'base_url': self.base_url,
+            'crawled_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'expand': self.expand,
+            'select': self.select,
+            'requests': self.requests,
+            'elapsed_s': round(self.elapsed, 3),
+            'resource_count': len(self.resources),
+            'latency_histogram': latency_histogram(
+                [seconds * 1000 for seconds in self.latencies.values()]),
+            'slowest_ms': {path: round(seconds * 1000, 2) for path, seconds in self.slowest()},
+            'latency_ms': {path: round(seconds * 1000, 2) for path, seconds in sorted(self.latencies.items())},
+            'errors': self.errors,
+            'resources': dict(sorted(self.resources.items())),
+        }
+
+
+class RedfishCrawler:
+    """
+    use_expand=False - не использовать $expand даже если он поддерживается;
+    select - список свойств для элементов коллекций ($select);
+    max_resources - ограничение на размер обхода (журналы бывают огромными).
+    """
+
+    def __init__(self, client, concurrency=16, use_expand=True, max_levels=None,
+                 select=None, max_resources=5000):
+        self.client = client
+        self.concurrency = concurrency
+        self.use_expand = use_expand
+        self.max_levels = max_levels
+        self.select = list(select) if select else None
+        self.max_resources = max_resources
+
+    async def crawl(self, root=SERVICE_ROOT):
+        result = CrawlResult(self.client.base_url)
+        queue = asyncio.Queue()
+        seen = set()
+        started = time.monotonic()
+
+        root_body = await self._fetch(resource_id(root), None, result)
+        if root_body is None:
+            result.elapsed = time.monotonic() - started
+            return result
+        seen.add(resource_id(root))
+        features = root_body.get('ProtocolFeaturesSupported')
+        if self.select and (features or {}).get('SelectQuery'):
+            # Коллекции с $expand вернули бы элементы целиком, поэтому $select исключает $expand
+            result.select = ','.join(self.select)
+        elif self.use_expand:
+            result.expand = expand_query(features, self.max_levels)
+
+        def schedule(body):
+            for path, is_member in self._links(body):
+                if path in seen or len(seen) >= self.max_resources:
+                    continue
+                seen.add(path)
+                queue.put_nowait((path, is_member))
+
+        def register(body):
+            # Вложенные через $expand ресурсы сразу считаются загруженными
+            for path, embedded in self._embedded(body):
+                seen.add(path)
+                result.resources.setdefault(path, embedded)
+
+        register(root_body)
+        schedule(root_body)
+
+        async def worker():
+            while True:
+                path, is_member = await queue.get()
+                try:
+                    if is_member and result.select:
+                        # Поддерево элемента в режиме $select не обходится
+                        await self._fetch(path, {'$select': result.select}, result)
+                        continue
+                    params = {'$expand': result.expand} if result.expand else None
+                    body = await self._fetch(path, params, result)
+                    if body is None:
+                        continue
+                    register(body)
+                    schedule(body)
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        result.elapsed = time.monotonic() - started
+        return result
+
+    async def _fetch(self, path, params, result):
+        response, seconds = await self.client.timed_request('GET', path, params=params)
+        result.requests += 1
+        result.latencies[path] = seconds
+        if isinstance(response, Exception):
+            result.errors[path] = f"{type(response).__name__}: {response}"
+            return None
+        if response.status_code != 200:
+            result.errors[path] = f"HTTP {response.status_code}"
+            return None
+        try:
+            body = response.json()
+        except ValueError:
+            result.errors[path] = "ответ не JSON"
+            return None
+        result.resources[path] = body
+        return body
+
+    @staticmethod
+    def _links(body, in_members=False):
+        """Ссылки {"@odata.id": ...} в теле: (путь, элемент коллекции ли)"""
+        if isinstance(body, list):
+            for item in body:
+                yield from RedfishCrawler._links(item, in_members)
+        elif isinstance(body, dict):
+            odata_id = body.get('@odata.id')
+            if isinstance(odata_id, str) and len(body) == 1:
+                yield resource_id(odata_id), in_members
+                return
+            for key, value in body.items():
+                if isinstance(value, (dict, list)):
+                    yield from RedfishCrawler._links(value, key == 'Members')
+
+    @staticmethod
+    def _embedded(body, top=True):
+        """Вложенные ресурсы (пришедшие через $expand): (путь, тело)"""
+        if isinstance(body, list):
+            for item in body:
+                yield from RedfishCrawler._embedded(item, False)
+        elif isinstance(body, dict):
+            odata_id = body.get('@odata.id')
+            if not top and isinstance(odata_id, str) and '#' not in odata_id and '@odata.type' in body:
+                yield resource_id(odata_id), body
+            for value in body.values():
+                if isinstance(value, (dict, list)):
+                    yield from RedfishCrawler._embedded(value, False)
+
+
+async def crawl(base_url, username, password, concurrency=16, use_expand=True, max_levels=None,
+                select=None, max_resources=5000, auth='session', latency=None):
+    async with AsyncRedfishClient(base_url, username, password, auth=auth,
+                                  per_host_concurrency=concurrency, latency=latency) as client:
+        crawler = RedfishCrawler(client, concurrency, use_expand, max_levels, select, max_resources)
+        return await crawler.crawl()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Обход дерева Redfish и снимок ресурсов')
+    parser.add_argument('--url', default=os.getenv('OPENBMC_URL', 'https://localhost:2443'))
+    parser.add_argument('--username', default=os.getenv('OPENBMC_USERNAME', 'root'))
+    parser.add_argument('--password', default=os.getenv('OPENBMC_PASSWORD', '0penBmc'))
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--no-expand', action='store_true', help='Не использовать $expand')
+    parser.add_argument('--max-levels', type=int, help='Ограничить $levels')
+    parser.add_argument('--select', help='Свойства элементов коллекций через запятую ($select)')
+    parser.add_argument('--max-resources', type=int, default=5000)
+    parser.add_argument('--output', default='reports/redfish_snapshot.json')
+    args = parser.parse_args()
+
+    result = asyncio.run(crawl(
+        args.url, args.username, args.password, args.concurrency, not args.no_expand,
+        args.max_levels, args.select.split(',') if args.select else None, args.max_resources))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(result.to_dict(), f, indent=2, ensure_ascii=False)
+
+    print(f"Ресурсов: {len(result.resources)}, запросов: {result.requests}, "
+          f"ошибок: {len(result.errors)}, время: {result.elapsed:.2f} с, $expand: {result.expand or 'нет'}")
+    print("Самые медленные запросы:")
+    for path, seconds in result.slowest(5):
+        print(f"  {seconds * 1000:8.1f} мс  {path}")
+    for path, error in sorted(result.errors.items()):
+        print(f"  ✗ {path}: {error}")
+    print(f"Снимок: {args.output}")
+    return 1 if result.errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+Прогон Redfish-тестов по парку BMC.
+
+Для каждого BMC из inventory запускается отдельный pytest с test-redfish.py
+(OPENBMC_URL/учетные данные передаются через окружение). Хосты обрабатываются
+параллельно пулом из --parallel воркеров; на каждом BMC одновременно работает не
+больше max_concurrency pytest-воркеров (-n), чтобы не перегружать bmcweb.
+Результаты сводятся в один JUnit-отчет: suite на хост, тест-кейсы с префиксом хоста.
+Отчет задержек OPENBMC_LATENCY_REPORT и запись трафика OPENBMC_CAPTURE пишутся в
+отдельный файл на хост (redfish_latency.json -> redfish_latency-<name>.json).
+База задержек OPENBMC_LATENCY_BASELINE относится к одному BMC, поэтому в прогоне по
+парку не проверяется и не обновляется.
+
+Inventory - JSON-список или CSV с колонками name,url,username,password,max_concurrency:
+
+    [
+        {"name": "rack1-node01", "url": "https://10.0.1.1", "username": "root", "password": "0penBmc"},
+        {"name": "rack1-node02", "url": "https://10.0.1.2", "max_concurrency": 2}
+    ]
+
+    python redfish_fleet.py inventory.json --parallel 32 --junitxml reports/junit/fleet.xml
+
+По умолчанию запускаются только тесты с маркером readonly и без маркера load:
+изменяющие питание и нагрузочные тесты на всем парке включаются явно через
+--markers "".
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from junitparser import Error, JUnitXml, TestCase, TestSuite
+
+from redfish_capture import default_capture_path
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TEST_TARGET = os.path.join(HERE, 'test-redfish.py') + '::TestOpenBMCComplete'
+
+
+class BMCHost:
+    def __init__(self, name, url, username='root', password='0penBmc', max_concurrency=1):
+        self.name = name
+        self.url = url
+        self.username = username
+        self.password = password
+        self.max_concurrency = max(1, int(max_concurrency))
+
+
+class HostResult:
+    def __init__(self, host, returncode, duration, junit_path=None, error=None):
+        self.host = host
+        self.returncode = returncode
+        self.duration = duration
+        self.junit_path = junit_path
+        self.error = error
+
+    @property
+    def ok(self):
+        # 0 - все прошло, 5 - нечего запускать (все отфильтровано маркерами)
+        return self.error is None and self.returncode in (0, 5)
+
+
+def load_inventory(path, default_username='root', default_password='0penBmc'):
+    """Читает inventory из JSON или CSV"""
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.csv'):
+            records = list(csv.DictReader(f))
+        else:
+            records = json.load(f)
+            if isinstance(records, dict):
+                records = records.get('hosts', [])
+
+    hosts = []
+    for index, record in enumerate(records):
+        url = record.get('url')
+        if not url:
+            raise ValueError(f"Запись {index} в {path} без url")
+        hosts.append(BMCHost(
+            name=record.get('name') or url,
+            url=url,
+            username=record.get('username') or default_username,
+            password=record.get('password') or default_password,
+            max_concurrency=record.get('max_concurrency') or 1,
+        ))
+    return hosts
+
+
+def host_path(path, host):
+    """path с именем хоста перед расширением: redfish_latency.json -> redfish_latency-<name>.json"""
+    # Имя по умолчанию - URL; в имени файла от него остаются только безопасные символы
+    name = re.sub(r'[^\w.-]', '_', host.name)
+    base, ext = os.path.splitext(path)
+    if ext in ('.gz', '.zst'):
+        # Сжатая запись: суффикс ставится перед .jsonl.zst, а не между .jsonl и .zst
+        base, inner = os.path.splitext(base)
+        ext = inner + ext
+    return f"{base}-{name}{ext}"
+
+
+def run_host(host, junit_path, markers, timeout, extra_args=()):
+    """Запускает test-redfish.py против одного BMC"""
+    cmd = [sys.executable, '-m', 'pytest', TEST_TARGET, '-q', '-p', 'no:cacheprovider',
+           f'--junitxml={junit_path}']
+    if markers:
+        cmd += ['-m', markers]
+    if host.max_concurrency > 1:
+        cmd += ['-n', str(host.max_concurrency), '--dist', 'loadgroup']
+    cmd += list(extra_args)
+
+    env = dict(os.environ,
+               OPENBMC_URL=host.url,
+               OPENBMC_USERNAME=host.username,
+               OPENBMC_PASSWORD=host.password)
+    env.pop('OPENBMC_MOCK', None)
+    # Общие файлы отчета задержек и записи трафика хосты перезаписывали бы друг другу - у каждого свой
+    if env.get('OPENBMC_LATENCY_REPORT'):
+        env['OPENBMC_LATENCY_REPORT'] = host_path(env['OPENBMC_LATENCY_REPORT'], host)
+    capture = env.get('OPENBMC_CAPTURE')
+    if capture and capture != '0':
+        env['OPENBMC_CAPTURE'] = host_path(default_capture_path() if capture == '1' else capture, host)
+    # База задержек снята на одном BMC и к парку не применяется; обновлять ее параллельно нельзя
+    env.pop('OPENBMC_LATENCY_BASELINE', None)
+    env.pop('OPENBMC_LATENCY_UPDATE_BASELINE', None)
+
+    started = time.monotonic()
+    try:
+        completed = subprocess.run(cmd, env=env, cwd=HERE, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return HostResult(host, None, time.monotonic() - started, error=f"таймаут {timeout} с")
+    duration = time.monotonic() - started
+
+    if not os.path.exists(junit_path):
+        tail = (completed.stdout + completed.stderr).strip().splitlines()[-5:]
+        return HostResult(host, completed.returncode, duration, error='\n'.join(tail) or 'нет JUnit-отчета')
+    return HostResult(host, completed.returncode, duration, junit_path)
+
+
+def host_suite(result):
+    """Переносит тест-кейсы хоста в отдельный suite с префиксом имени хоста"""
+    suite = TestSuite(result.host.name)
+    suite.add_property('url', result.host.url)
+    suite.add_property('duration_s', f"{result.duration:.3f}")
+
+    if result.junit_path is None:
+        case = TestCase('run', classname=result.host.name, time=result.duration)
+        case.result = [Error(result.error or 'pytest не запустился')]
+        suite.add_testcase(case)
+        return suite
+
+    for source_suite in JUnitXml.fromfile(result.junit_path):
+        for case in source_suite:
+            case.classname = f"{result.host.name}.{case.classname}"
+            suite.add_testcase(case)
+    return suite
+
+
+def run_fleet(hosts, parallel, markers, timeout, extra_args=()):
+    results = []
+    with tempfile.TemporaryDirectory(prefix='redfish-fleet-') as workdir:
+        with ThreadPoolExecutor(max_workers=parallel) as pool:
+            futures = [pool.submit(run_host, host, os.path.join(workdir, f"{i:05d}.xml"),
+                                   markers, timeout, extra_args)
+                       for i, host in enumerate(hosts)]
+            for future in as_completed(futures):
+                result = future.result()
+                status = "OK" if result.ok else "FAIL"
+                print(f"[{status}] {result.host.name} ({result.duration:.1f} с)"
+                      + (f": {result.error}" if result.error else ""))
+                results.append(result)
+
+        report = JUnitXml('redfish-fleet')
+        for result in sorted(results, key=lambda r: r.host.name):
+            report.add_testsuite(host_suite(result))
+    return results, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Параллельный прогон Redfish-тестов по парку BMC')
+    parser.add_argument('inventory', help='JSON или CSV со списком BMC')
+    parser.add_argument('--parallel', type=int, default=16, help='Сколько BMC проверять одновременно')
+    parser.add_argument('--markers', default='readonly and not load',
+                        help='Выражение pytest -m (по умолчанию readonly без нагрузочных; "" - все тесты)')
+    parser.add_argument('--timeout', type=float, default=600, help='Таймаут прогона на один BMC, с')
+    parser.add_argument('--junitxml', default='reports/junit/fleet_results.xml')
+    parser.add_argument('pytest_args', nargs='*', help='Дополнительные аргументы pytest (после --)')
+    args = parser.parse_args()
+
+    hosts = load_inventory(args.inventory,
+                           os.getenv('OPENBMC_USERNAME', 'root'),
+                           os.getenv('OPENBMC_PASSWORD', '0penBmc'))
+    print(f"BMC в inventory: {len(hosts)}, параллельно: {args.parallel}")
+
+    started = time.monotonic()
+    results, report = run_fleet(hosts, args.parallel, args.markers, args.timeout, args.pytest_args)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.junitxml)), exist_ok=True)
+    report.write(args.junitxml)
+
+    failed = [r for r in results if not r.ok]
+    print(f"Готово за {time.monotonic() - started:.1f} с: {len(results) - len(failed)}/{len(results)} BMC без ошибок")
+    print(f"JUnit: {args.junitxml}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
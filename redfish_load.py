@@ -0,0 +1,232 @@
+"""
+Нагрузочный режим на асинхронном клиенте Redfish.
+
+Замкнутый цикл (по умолчанию): --concurrency корутин в одном процессе без
+пауз шлют запросы к списку endpoint'ов по кругу в течение --duration секунд.
+Когда BMC замедляется, вместе с ним падает и поданная нагрузка, поэтому
+задержки под насыщением выглядят лучше, чем их видят клиенты.
+
+Открытый цикл (--rate): запросы отправляются по расписанию с интенсивностью
+--rate запросов/с (с --ramp-to - линейный рост до этой интенсивности к концу
+прогона) независимо от того, ответил ли BMC на предыдущие. Задержка считается
+от планового времени отправки, поэтому в нее входит и ожидание в очереди
+клиента; время обслуживания от фактической отправки печатается отдельно.
+
+В конце печатается пропускная способность и перцентили задержки по каждому endpoint.
+
+    python redfish_load.py --url https://localhost:2443 --concurrency 200 --duration 30
+    python redfish_load.py --url https://localhost:2443 --rate 50 --ramp-to 400 --duration 60
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+from redfish_async import AsyncRedfishClient
+
+DEFAULT_ENDPOINTS = ['/redfish/v1/Systems/system']
+
+
+def percentile(sorted_values, q):
+    """Перцентиль q (0..100) по отсортированному списку, метод nearest-rank"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class LoadStats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint, seconds, ok):
+        self.latencies[endpoint].append(seconds)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def summary(self, duration):
+        result = {}
+        # Endpoint без единого ответа (все запросы отброшены) тоже попадает в сводку
+        for endpoint in sorted(self.latencies.keys() | self.errors.keys()):
+            values = sorted(self.latencies.get(endpoint, ()))
+            result[endpoint] = {
+                'requests': len(values),
+                'errors': self.errors[endpoint],
+                'rps': len(values) / duration if duration else 0.0,
+                'p50_ms': percentile(values, 50) * 1000,
+                'p95_ms': percentile(values, 95) * 1000,
+                'p99_ms': percentile(values, 99) * 1000,
+                'max_ms': values[-1] * 1000 if values else 0.0,
+            }
+        return result
+
+
+async def worker(client, endpoints, deadline, stats):
+    for endpoint in endpoints:
+        if time.monotonic() >= deadline:
+            return
+        response, seconds = await client.timed_request('GET', endpoint)
+        ok = not isinstance(response, Exception) and response.status_code == 200
+        stats.record(endpoint, seconds, ok)
+
+
+async def run_load(url, username, password, endpoints, concurrency, duration, auth='session', http2=False):
+    stats = LoadStats()
+    async with AsyncRedfishClient(url, username, password, auth=auth, http2=http2,
+                                  max_connections=concurrency, per_host_concurrency=concurrency) as client:
+        started = time.monotonic()
+        deadline = started + duration
+        # Каждый воркер начинает со своего endpoint, чтобы нагрузка сразу распределялась по списку
+        workers = [worker(client, itertools.islice(itertools.cycle(endpoints), i % len(endpoints), None),
+                          deadline, stats)
+                   for i in range(concurrency)]
+        await asyncio.gather(*workers)
+        elapsed = time.monotonic() - started
+    return stats.summary(elapsed), elapsed
+
+
+def arrival_times(rate, duration, ramp_to=None, poisson=False, seed=None):
+    """
+    Плановые моменты отправки (секунды от старта) на [0, duration): интенсивность
+    rate запросов/с или линейный рост от rate до ramp_to. poisson=True - случайные
+    интервалы (пуассоновский поток), иначе равномерные.
+    """
+    end_rate = rate if ramp_to is None else ramp_to
+    if rate <= 0 and end_rate <= 0:
+        return
+    # Накопленное число запросов N(t) = rate*t + slope*t^2; k-й запрос - в момент N(t) = k
+    slope = (end_rate - rate) / (2 * duration)
+    rng = random.Random(seed)
+    arrivals = 0.0
+    while True:
+        # Корень slope*t^2 + rate*t - arrivals = 0 в форме, устойчивой при slope -> 0;
+        # первый запрос - в момент 0 (при rate == 0 формула дала бы 0/0)
+        discriminant = rate * rate + 4 * slope * arrivals
+        if discriminant < 0:
+            # Спад интенсивности: столько запросов кривая не набирает до конца прогона
+            return
+        t = 2 * arrivals / (rate + math.sqrt(discriminant)) if arrivals else 0.0
+        if t >= duration:
+            return
+        yield t
+        arrivals += rng.expovariate(1.0) if poisson else 1.0
+
+
+async def run_open_loop(url, username, password, endpoints, rate, duration, ramp_to=None, poisson=False,
+                        max_in_flight=1000, connections=100, auth='session', http2=False):
+    """
+    Открытый цикл: (сводка от планового времени, сводка времени обслуживания, сведения, длительность).
+    Запросы сверх max_in_flight одновременно не отправляются и считаются отброшенными:
+    ошибками endpoint'а в сводке и info['dropped_by_endpoint'].
+    """
+    stats = LoadStats()
+    service = LoadStats()
+    info = {'scheduled': 0, 'dropped': 0, 'dropped_by_endpoint': defaultdict(int), 'max_lag_ms': 0.0}
+    pending = set()
+    loop = asyncio.get_running_loop()
+    # Без повторов: каждый плановый запрос - ровно один запрос к BMC
+    async with AsyncRedfishClient(url, username, password, auth=auth, http2=http2, retries=0,
+                                  max_connections=connections, per_host_concurrency=connections) as client:
+
+        async def send(endpoint, due):
+            response, seconds = await client.timed_request('GET', endpoint)
+            ok = not isinstance(response, Exception) and response.status_code == 200
+            stats.record(endpoint, loop.time() - due, ok)
+            service.record(endpoint, seconds, ok)
+
+        started = loop.time()
+        endpoint_cycle = itertools.cycle(endpoints)
+        for offset in arrival_times(rate, duration, ramp_to, poisson):
+            due = started + offset
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # Опоздание самого генератора: если оно велико, упирается клиент, а не BMC
+            info['max_lag_ms'] = max(info['max_lag_ms'], (loop.time() - due) * 1000)
+            info['scheduled'] += 1
+            endpoint = next(endpoint_cycle)
+            if len(pending) >= max_in_flight:
+                info['dropped'] += 1
+                info['dropped_by_endpoint'][endpoint] += 1
+                stats.errors[endpoint] += 1
+                continue
+            task = asyncio.create_task(send(endpoint, due))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+        elapsed = loop.time() - started
+    info['dropped_by_endpoint'] = dict(info['dropped_by_endpoint'])
+    return stats.summary(elapsed), service.summary(elapsed), info, elapsed
+
+
+def print_summary(summary, elapsed):
+    print(f"{'Endpoint':50} {'req':>8} {'err':>6} {'rps':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for endpoint, row in summary.items():
+        print(f"{endpoint:50} {row['requests']:8d} {row['errors']:6d} {row['rps']:9.1f} "
+              f"{row['p50_ms']:8.1f} {row['p95_ms']:8.1f} {row['p99_ms']:8.1f} {row['max_ms']:8.1f}")
+    total = sum(row['requests'] for row in summary.values())
+    print(f"Всего: {total} запросов за {elapsed:.1f} с ({total / elapsed:.1f} rps), задержки в мс")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Нагрузка на Redfish через асинхронный клиент')
+    parser.add_argument('--url', default=os.getenv('OPENBMC_URL', 'https://localhost:2443'))
+    parser.add_argument('--username', default=os.getenv('OPENBMC_USERNAME', 'root'))
+    parser.add_argument('--password', default=os.getenv('OPENBMC_PASSWORD', '0penBmc'))
+    parser.add_argument('--endpoint', action='append', dest='endpoints',
+                        help='Путь Redfish (можно несколько раз)')
+    parser.add_argument('--concurrency', type=int, default=50,
+                        help='Число корутин; в открытом цикле - число соединений с BMC')
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--auth', choices=['session', 'basic'], default='session')
+    parser.add_argument('--http2', action='store_true')
+    parser.add_argument('--rate', type=float, help='Открытый цикл: запросов в секунду')
+    parser.add_argument('--ramp-to', type=float, help='Открытый цикл: интенсивность к концу прогона')
+    parser.add_argument('--poisson', action='store_true', help='Открытый цикл: пуассоновские интервалы')
+    parser.add_argument('--max-in-flight', type=int, default=1000,
+                        help='Открытый цикл: больше одновременных запросов не отправлять')
+    parser.add_argument('--json', help='Сохранить сводку в JSON')
+    args = parser.parse_args()
+    endpoints = args.endpoints or DEFAULT_ENDPOINTS
+    if args.duration <= 0:
+        parser.error("--duration должен быть больше 0")
+    if args.rate is not None and args.rate < 0:
+        parser.error("--rate не может быть отрицательным")
+    if args.ramp_to is not None and args.ramp_to < 0:
+        parser.error("--ramp-to не может быть отрицательным")
+
+    if args.rate is None:
+        summary, elapsed = asyncio.run(run_load(
+            args.url, args.username, args.password, endpoints,
+            args.concurrency, args.duration, args.auth, args.http2))
+        print_summary(summary, elapsed)
+        result = {'elapsed_s': elapsed, 'endpoints': summary}
+    else:
+        summary, service, info, elapsed = asyncio.run(run_open_loop(
+            args.url, args.username, args.password, endpoints, args.rate, args.duration,
+            args.ramp_to, args.poisson, args.max_in_flight, args.concurrency, args.auth, args.http2))
+        print("Задержка от планового времени отправки:")
+        print_summary(summary, elapsed)
+        print("Время обслуживания (от фактической отправки):")
+        print_summary(service, elapsed)
+        print(f"Запланировано: {info['scheduled']} ({info['scheduled'] / args.duration:.1f} rps), "
+              f"отброшено: {info['dropped']}, макс. опоздание генератора: {info['max_lag_ms']:.1f} мс")
+        for endpoint, dropped in info['dropped_by_endpoint'].items():
+            print(f"  отброшено {endpoint}: {dropped}")
+        result = {'elapsed_s': elapsed, 'endpoints': summary, 'service': service, **info}
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0 if summary else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,663 @@
+"""
+Эмулятор Redfish API OpenBMC для запуска тестов и нагрузки без реального BMC.
+
+Ресурсы берутся из JSON-дерева (redfish_mock_tree.json): ключ - путь ресурса,
+значение - тело ответа. Поверх дерева эмулируются SessionService (токены
+X-Auth-Token), ComputerSystem.Reset с задержкой перехода состояния питания
+и поток событий EventService через Server-Sent Events.
+
+Запуск:
+    python redfish_mock.py --port 2443
+    python redfish_mock.py --port 2443 --tls   # самоподписанный сертификат
+"""
+import argparse
+import asyncio
+import base64
+import copy
+import json
+import os
+import re
+import secrets
+import ssl
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime, timezone
+from http import HTTPStatus
+from urllib.parse import parse_qs
+
+DEFAULT_TREE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'redfish_mock_tree.json')
+
+SERVICE_ROOT = '/redfish/v1'
+SYSTEM_PATH = '/redfish/v1/Systems/system'
+CHASSIS_PATH = '/redfish/v1/Chassis/chassis'
+SESSIONS_PATH = '/redfish/v1/SessionService/Sessions'
+RESET_PATH = '/redfish/v1/Systems/system/Actions/ComputerSystem.Reset'
+SSE_PATH = '/redfish/v1/EventService/SSE'
+
+# Ресурсы, доступные без аутентификации (как в bmcweb)
+PUBLIC_PATHS = {'/redfish', SERVICE_ROOT, '/redfish/v1/odata', '/redfish/v1/$metadata'}
+
+# Итоговое состояние питания для каждого ResetType
+RESET_TARGETS = {
+    'On': 'On',
+    'ForceOn': 'On',
+    'ForceOff': 'Off',
+    'GracefulShutdown': 'Off',
+    'GracefulRestart': 'On',
+    'ForceRestart': 'On',
+    'PowerCycle': 'On',
+    'Nmi': None,
+}
+
+MAX_HEADER_SIZE = 64 * 1024
+
+# Показания, которые эмулятор публикует в MetricReport: массив ресурса -> свойство показания
+REPORT_READINGS = {
+    'Temperatures': 'ReadingCelsius',
+    'Fans': 'Reading',
+    'PowerControl': 'PowerConsumedWatts',
+    'Voltages': 'ReadingVolts',
+}
+
+# $expand=.|*|~ с необязательным ($levels=N)
+EXPAND_RE = re.compile(r'^([.*~])(?:\(\$levels=(\d+)\))?$')
+# Свойства, которые $select оставляет всегда
+SELECT_ALWAYS = ('@odata.id', '@odata.type', '@odata.context', '@odata.etag')
+
+
+def normalize_path(path):
+    """Приводит путь к ключу дерева: без query, без завершающего '/'"""
+    path = path.split('?', 1)[0].split('#', 1)[0]
+    if len(path) > 1:
+        path = path.rstrip('/')
+    return path or '/'
+
+
+def redfish_error(code, message):
+    """Тело ошибки в формате Redfish (Base Message Registry)"""
+    return {
+        'error': {
+            'code': f'Base.1.13.0.{code}',
+            'message': message,
+            '@Message.ExtendedInfo': [{
+                '@odata.type': '#Message.v1_1_1.Message',
+                'MessageId': f'Base.1.13.0.{code}',
+                'Message': message,
+                'Severity': 'Critical',
+            }],
+        }
+    }
+
+
+class MockResponse:
+    """Ответ эмулятора: статус, заголовки и уже сериализованное тело"""
+
+    __slots__ = ('status', 'headers', 'body', 'stream')
+
+    def __init__(self, status, body=b'', headers=None, stream=False):
+        self.status = status
+        self.headers = headers or {}
+        self.stream = stream
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+        self.body = body
+
+
+class RedfishMockState:
+    """
+    Состояние эмулируемого BMC: дерево ресурсов, сессии и питание.
+    Тела GET-ответов сериализуются один раз и пересобираются только при изменении ресурса.
+    """
+
+    def __init__(self, tree, username='root', password='0penBmc',
+                 power_delay=0.5, boot_delay=1.0, session_limit=64):
+        self.resources = copy.deepcopy(tree)
+        self.username = username
+        self.password = password
+        self.power_delay = power_delay
+        self.boot_delay = boot_delay
+        self.session_limit = session_limit
+        self.sessions = {}
+        self.stats = Counter()
+        self.started_at = time.time()
+        self._basic = 'Basic ' + base64.b64encode(f'{username}:{password}'.encode()).decode()
+        self._rendered = {}
+        # Ресурсы, которые собираются заново на каждый запрос
+        builders = {'#MetricReport.': self.metric_report, '#ManagerDiagnosticData.': self.diagnostic_data}
+        self._dynamic = {path: builder for path, resource in self.resources.items()
+                         for prefix, builder in builders.items()
+                         if resource.get('@odata.type', '').startswith(prefix)}
+        self._cpu_times = (time.monotonic(), os.times())
+        self._pending = []
+        self._subscribers = set()
+        self._event_id = 0
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_TREE, **kwargs):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f), **kwargs)
+
+    # --- ресурсы -------------------------------------------------------
+
+    def render(self, path):
+        """Возвращает (сериализованное тело, ETag) ресурса или None"""
+        if path in self._dynamic:
+            body = json.dumps(self._dynamic[path](path)).encode()
+            return body, f'"{zlib.crc32(body):08X}"'
+        rendered = self._rendered.get(path)
+        if rendered is None:
+            resource = self.resources.get(path)
+            if resource is None:
+                return None
+            body = json.dumps(resource).encode()
+            rendered = (body, f'"{zlib.crc32(body):08X}"')
+            self._rendered[path] = rendered
+        return rendered
+
+    def metric_report(self, path):
+        """MetricReport с текущими показаниями Thermal/Power; собирается заново на каждый запрос"""
+        timestamp = datetime.now(timezone.utc).isoformat(timespec='milliseconds')
+        values = []
+        for resource in self.resources.values():
+            for collection, prop in REPORT_READINGS.items():
+                for member in resource.get(collection, ()):
+                    if member.get(prop) is None or '@odata.id' not in member:
+                        continue
+                    values.append({'MetricId': member.get('Name', member.get('MemberId')),
+                                   'MetricProperty': f"{member['@odata.id']}/{prop}",
+                                   'MetricValue': str(member[prop]),
+                                   'Timestamp': timestamp})
+        return dict(self.resources[path], MetricValues=values, Timestamp=timestamp)
+
+    def diagnostic_data(self, path):
+        """ManagerDiagnosticData с загрузкой CPU и памятью процесса эмулятора (аналог bmcweb на BMC)"""
+        now, times = time.monotonic(), os.times()
+        last_at, last_times = self._cpu_times
+        elapsed = now - last_at
+        # Загрузка за интервал с предыдущего запроса; слишком короткий интервал не обновляет базу
+        if elapsed >= 0.2:
+            self._cpu_times = (now, times)
+        elapsed = max(elapsed, 1e-6)
+        user = (times.user - last_times.user) / elapsed * 100
+        kernel = (times.system - last_times.system) / elapsed * 100
+        page = os.sysconf('SC_PAGE_SIZE')
+        total = os.sysconf('SC_PHYS_PAGES') * page
+        try:
+            with open('/proc/self/statm') as f:
+                rss = int(f.read().split()[1]) * page
+        except OSError:
+            rss = 0
+        return dict(self.resources[path],
+                    ProcessorStatistics={'UserPercent': round(user, 2), 'KernelPercent': round(kernel, 2)},
+                    MemoryStatistics={'TotalBytes': total, 'UsedBytes': rss},
+                    TopProcesses=[{'CommandLine': 'redfish_mock', 'ResidentSetSizeBytes': rss,
+                                   'UserTimeSeconds': times.user, 'KernelTimeSeconds': times.system}],
+                    ServiceRootUptimeSeconds=round(time.time() - self.started_at, 3))
+
+    def render_query(self, path, params):
+        """
+        Тело ресурса с $expand/$select; возвращает (тело, ETag), None если ресурса нет,
+        или MockResponse 400 для неподдерживаемого запроса
+        """
+        resource = self.resources.get(path)
+        if resource is None:
+            return None
+        features = self.resources[SERVICE_ROOT].get('ProtocolFeaturesSupported', {})
+        expand = params.get('$expand')
+        if expand:
+            match = EXPAND_RE.match(expand[0])
+            expand_features = features.get('ExpandQuery', {})
+            if match is None:
+                return MockResponse(400, redfish_error('QueryParameterValueFormatError',
+                                                       f'The value {expand[0]} for the parameter $expand is invalid.'))
+            mode, levels = match.group(1), int(match.group(2) or 1)
+            supported = {'*': 'ExpandAll', '.': 'NoLinks', '~': 'Links'}[mode]
+            if not expand_features.get(supported) or (match.group(2) and not expand_features.get('Levels')):
+                return MockResponse(400, redfish_error('QueryNotSupported', 'Querying is not supported by the service.'))
+            if levels > expand_features.get('MaxLevels', 1):
+                return MockResponse(400, redfish_error('QueryParameterOutOfRange',
+                                                       f'The value {levels} for the query parameter $levels is out of range.'))
+            resource = self._expand(resource, levels, mode)
+        select = params.get('$select')
+        if select:
+            if not features.get('SelectQuery'):
+                return MockResponse(400, redfish_error('QueryNotSupported', 'Querying is not supported by the service.'))
+            fields = set(select[0].split(',')) | set(SELECT_ALWAYS)
+            resource = {key: value for key, value in resource.items() if key in fields}
+        body = json.dumps(resource).encode()
+        return body, f'"{zlib.crc32(body):08X}"'
+
+    def _expand(self, value, levels, mode, in_links=False):
+        """Подставляет ссылки {"@odata.id": ...} телами ресурсов на levels уровней"""
+        if isinstance(value, list):
+            return [self._expand(item, levels, mode, in_links) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if levels > 0 and len(value) == 1 and '@odata.id' in value:
+            # '.' - подчиненные ресурсы без Links, '~' - только Links, '*' - все ссылки
+            if mode == '*' or (mode == '.' and not in_links) or (mode == '~' and in_links):
+                target = self.resources.get(normalize_path(value['@odata.id']))
+                if target is not None:
+                    return self._expand(target, levels - 1, mode)
+            return value
+        return {key: self._expand(item, levels, mode, in_links or key == 'Links')
+                for key, item in value.items()}
+
+    def touch(self, path):
+        """Сбрасывает сериализованное тело после изменения ресурса"""
+        self._rendered.pop(path, None)
+
+    def _refresh_sessions_collection(self):
+        members = [{'@odata.id': f'{SESSIONS_PATH}/{sid}'} for sid in self.sessions]
+        self.resources[SESSIONS_PATH] = {
+            '@odata.id': SESSIONS_PATH,
+            '@odata.type': '#SessionCollection.SessionCollection',
+            'Name': 'Session Collection',
+            'Members': members,
+            'Members@odata.count': len(members),
+        }
+        self.touch(SESSIONS_PATH)
+
+    # --- аутентификация ------------------------------------------------
+
+    def is_authorized(self, headers):
+        token = headers.get('x-auth-token')
+        if token is not None:
+            return any(s['token'] == token for s in self.sessions.values())
+        return headers.get('authorization') == self._basic
+
+    def create_session(self, body):
+        try:
+            data = json.loads(body or b'{}')
+        except ValueError:
+            return MockResponse(400, redfish_error('MalformedJSON', 'The request body was malformed JSON.'))
+        if data.get('UserName') != self.username or data.get('Password') != self.password:
+            return MockResponse(401, redfish_error('ResourceAtUriUnauthorized', 'Invalid username or password.'))
+        if len(self.sessions) >= self.session_limit:
+            return MockResponse(503, redfish_error('SessionLimitExceeded',
+                                                   'The session establishment failed due to the number of '
+                                                   'simultaneous sessions exceeding the limit of the implementation.'))
+        session_id = secrets.token_hex(5)
+        token = secrets.token_urlsafe(15)
+        location = f'{SESSIONS_PATH}/{session_id}'
+        self.sessions[session_id] = {'token': token, 'created': time.time()}
+        resource = {
+            '@odata.id': location,
+            '@odata.type': '#Session.v1_5_0.Session',
+            'Id': session_id,
+            'Name': 'User Session',
+            'Description': 'Manager User Session',
+            'UserName': self.username,
+        }
+        self.resources[location] = resource
+        self._refresh_sessions_collection()
+        return MockResponse(201, resource, {'X-Auth-Token': token, 'Location': location})
+
+    def delete_session(self, path):
+        session_id = path.rsplit('/', 1)[-1]
+        if self.sessions.pop(session_id, None) is None:
+            return MockResponse(404, redfish_error('ResourceNotFound', f'The requested resource {path} was not found.'))
+        self.resources.pop(path, None)
+        self.touch(path)
+        self._refresh_sessions_collection()
+        return MockResponse(204)
+
+    # --- события (SSE) -------------------------------------------------
+
+    def subscribe(self):
+        queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, origin, message_id, message, args=()):
+        """Рассылает событие Redfish всем подписчикам SSE"""
+        if not self._subscribers:
+            return
+        self._event_id += 1
+        event = {
+            '@odata.type': '#Event.v1_7_0.Event',
+            'Id': str(self._event_id),
+            'Name': 'Event Log',
+            'Events': [{
+                'EventId': str(self._event_id),
+                'EventTimestamp': time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime()),
+                'MessageId': message_id,
+                'Message': message,
+                'MessageArgs': list(args),
+                'OriginOfCondition': {'@odata.id': origin},
+            }],
+        }
+        chunk = f'id: {self._event_id}\ndata: {json.dumps(event)}\n\n'.encode()
+        for queue in self._subscribers:
+            queue.put_nowait(chunk)
+
+    # --- питание -------------------------------------------------------
+
+    def _set_power(self, power_state, system_state):
+        system = self.resources[SYSTEM_PATH]
+        system['PowerState'] = power_state
+        system['Status']['State'] = system_state
+        self.touch(SYSTEM_PATH)
+        chassis = self.resources.get(CHASSIS_PATH)
+        if chassis is not None and power_state in ('On', 'Off'):
+            chassis['PowerState'] = power_state
+            self.touch(CHASSIS_PATH)
+        self.publish(SYSTEM_PATH, 'ResourceEvent.1.0.ResourceChanged',
+                     f'PowerState changed to {power_state}', (power_state, system_state))
+
+    def _schedule(self, loop, delay, callback, *args):
+        self._pending.append(loop.call_later(delay, callback, *args))
+
+    def reset(self, body, loop):
+        try:
+            reset_type = json.loads(body or b'{}').get('ResetType')
+        except (ValueError, AttributeError):
+            return MockResponse(400, redfish_error('MalformedJSON', 'The request body was malformed JSON.'))
+        allowed = (self.resources[SYSTEM_PATH]['Actions']['#ComputerSystem.Reset']
+                   .get('ResetType@Redfish.AllowableValues', list(RESET_TARGETS)))
+        if reset_type not in allowed:
+            return MockResponse(400, redfish_error('ActionParameterValueNotInList',
+                                                   f'The value {reset_type} for the parameter ResetType '
+                                                   f'is not in the list of acceptable values.'))
+        # Отменяем незавершенный переход - последняя команда выигрывает
+        for handle in self._pending:
+            handle.cancel()
+        self._pending.clear()
+
+        target = RESET_TARGETS[reset_type]
+        current = self.resources[SYSTEM_PATH]['PowerState']
+        if target == 'On':
+            if reset_type in ('GracefulRestart', 'ForceRestart', 'PowerCycle') and current != 'Off':
+                self._set_power('PoweringOff', 'Disabled')
+                self._schedule(loop, self.power_delay, self._power_on_sequence, loop)
+            elif current != 'On':
+                self._power_on_sequence(loop)
+        elif target == 'Off' and current != 'Off':
+            self._set_power('PoweringOff', 'Disabled')
+            self._schedule(loop, self.power_delay, self._set_power, 'Off', 'Disabled')
+        self.stats[f'reset:{reset_type}'] += 1
+        return MockResponse(204)
+
+    def _power_on_sequence(self, loop):
+        self._set_power('PoweringOn', 'Starting')
+        self._schedule(loop, self.power_delay, self._set_power, 'On', 'Starting')
+        self._schedule(loop, self.power_delay + self.boot_delay, self._set_power, 'On', 'Enabled')
+
+    # --- диспетчеризация -----------------------------------------------
+
+    def handle(self, method, target, headers, body, loop):
+        path = normalize_path(target)
+        self.stats['requests'] += 1
+
+        if method == 'POST' and path == SESSIONS_PATH:
+            return self.create_session(body)
+
+        if path not in PUBLIC_PATHS and not self.is_authorized(headers):
+            return MockResponse(401, redfish_error('ResourceAtUriUnauthorized',
+                                                   f'While accessing the resource at {path}, '
+                                                   f'the service received an authorization error.'),
+                                {'WWW-Authenticate': 'Basic realm="openbmc"'})
+
+        if method in ('GET', 'HEAD') and path != SSE_PATH:
+            query = parse_qs(target.partition('?')[2])
+            if '$expand' in query or '$select' in query:
+                rendered = self.render_query(path, query)
+                if isinstance(rendered, MockResponse):
+                    return rendered
+            else:
+                rendered = self.render(path)
+            if rendered is None:
+                return MockResponse(404, redfish_error('ResourceNotFound',
+                                                       f'The requested resource {path} was not found.'))
+            body, etag = rendered
+            if headers.get('if-none-match') == etag:
+                self.stats['not_modified'] += 1
+                return MockResponse(304, headers={'ETag': etag})
+            return MockResponse(200, body, {'ETag': etag})
+        if method == 'GET' and path == SSE_PATH:
+            return MockResponse(200, headers={'Content-Type': 'text/event-stream',
+                                              'Cache-Control': 'no-cache'}, stream=True)
+        if method == 'POST' and path == RESET_PATH:
+            return self.reset(body, loop)
+        if method == 'DELETE' and path.startswith(SESSIONS_PATH + '/'):
+            return self.delete_session(path)
+        if path in self.resources:
+            return MockResponse(405, redfish_error('OperationNotAllowed',
+                                                   f'The {method} operation is not allowed on {path}.'),
+                                {'Allow': 'GET, HEAD'})
+        return MockResponse(404, redfish_error('ResourceNotFound', f'The requested resource {path} was not found.'))
+
+
+class RedfishMockServer:
+    """HTTP/1.1 сервер на asyncio с keep-alive поверх RedfishMockState"""
+
+    def __init__(self, state, host='127.0.0.1', port=2443, ssl_context=None):
+        self.state = state
+        self.host = host
+        self.port = port
+        self.ssl_context = ssl_context
+        self._server = None
+        self._loop = None
+        self._thread = None
+
+    @property
+    def url(self):
+        scheme = 'https' if self.ssl_context else 'http'
+        return f'{scheme}://{self.host}:{self.port}'
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(
+            self._serve_connection, self.host, self.port,
+            ssl=self.ssl_context, limit=MAX_HEADER_SIZE, backlog=1024)
+        # При port=0 ОС выбирает свободный порт
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _serve_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ', 2)
+                except ValueError:
+                    writer.write(self._encode(MockResponse(400), keep_alive=False))
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if line:
+                        name, _, value = line.partition(':')
+                        headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length') or 0)
+                body = await reader.readexactly(length) if length else b''
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' and (version == 'HTTP/1.1' or connection == 'keep-alive')
+
+                response = self.state.handle(method.upper(), target, headers, body, self._loop)
+                if response.stream:
+                    await self._stream_events(response, writer)
+                    break
+                writer.write(self._encode(response, keep_alive, head_only=(method.upper() == 'HEAD')))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # CancelledError - остановка сервера с открытыми keep-alive соединениями
+            pass
+        finally:
+            writer.close()
+
+    async def _stream_events(self, response, writer):
+        """Держит соединение открытым и отправляет события, пока клиент не отключится"""
+        writer.write(self._encode(response, keep_alive=False))
+        await writer.drain()
+        queue = self.state.subscribe()
+        try:
+            while True:
+                writer.write(await queue.get())
+                await writer.drain()
+        finally:
+            self.state.unsubscribe(queue)
+
+    @staticmethod
+    def _encode(response, keep_alive, head_only=False):
+        reason = HTTPStatus(response.status).phrase
+        lines = [f'HTTP/1.1 {response.status} {reason}',
+                 'OData-Version: 4.0',
+                 f'Connection: {"keep-alive" if keep_alive else "close"}']
+        # У потока событий нет Content-Length: тело заканчивается закрытием соединения
+        if not response.stream and (response.body or response.status not in (204, 304)):
+            lines.append('Content-Type: application/json')
+            lines.append(f'Content-Length: {len(response.body)}')
+        for name, value in response.headers.items():
+            lines.append(f'{name}: {value}')
+        head = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+        return head if head_only else head + response.body
+
+    # --- запуск в фоновом потоке (для pytest-фикстур) ------------------
+
+    def start_in_thread(self):
+        """Запускает сервер в отдельном потоке со своим event loop"""
+        started = threading.Event()
+        errors = []
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.start())
+            except Exception as e:
+                errors.append(e)
+                started.set()
+                return
+            started.set()
+            loop.run_forever()
+            loop.run_until_complete(self._shutdown())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name='redfish-mock', daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    async def _shutdown(self):
+        """Закрывает слушающий сокет и обрывает keep-alive соединения"""
+        self._server.close()
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._server.wait_closed()
+
+    def stop(self):
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+
+def self_signed_context():
+    """SSL-контекст с самоподписанным сертификатом (нужен пакет cryptography)"""
+    try:
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.x509.oid import NameOID
+    except ImportError:
+        raise RuntimeError("Для --tls без --certfile нужен пакет cryptography (pip install cryptography)")
+    import datetime
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'localhost')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (x509.CertificateBuilder()
+            .subject_name(name).issuer_name(name)
+            .public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(days=1))
+            .not_valid_after(now + datetime.timedelta(days=365))
+            .add_extension(x509.SubjectAlternativeName([x509.DNSName('localhost')]), critical=False)
+            .sign(key, hashes.SHA256()))
+    tmpdir = tempfile.mkdtemp(prefix='redfish-mock-')
+    certfile = os.path.join(tmpdir, 'cert.pem')
+    keyfile = os.path.join(tmpdir, 'key.pem')
+    with open(certfile, 'wb') as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(keyfile, 'wb') as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM,
+                                  serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    return tls_context(certfile, keyfile)
+
+
+def tls_context(certfile, keyfile):
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(certfile, keyfile)
+    return context
+
+
+def start_mock(host='127.0.0.1', port=0, tree=DEFAULT_TREE, tls=False, **state_kwargs):
+    """Поднимает эмулятор в фоновом потоке и возвращает запущенный сервер"""
+    state = RedfishMockState.from_file(tree, **state_kwargs)
+    server = RedfishMockServer(state, host, port, self_signed_context() if tls else None)
+    return server.start_in_thread()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Эмулятор Redfish API OpenBMC')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=2443)
+    parser.add_argument('--tree', default=DEFAULT_TREE, help='JSON-дерево ресурсов')
+    parser.add_argument('--username', default=os.getenv('OPENBMC_USERNAME', 'root'))
+    parser.add_argument('--password', default=os.getenv('OPENBMC_PASSWORD', '0penBmc'))
+    parser.add_argument('--power-delay', type=float, default=0.5,
+                        help='Задержка перехода PowerState, с')
+    parser.add_argument('--boot-delay', type=float, default=1.0,
+                        help='Задержка перехода Status.State в Enabled после включения, с')
+    parser.add_argument('--tls', action='store_true', help='HTTPS с самоподписанным сертификатом')
+    parser.add_argument('--certfile')
+    parser.add_argument('--keyfile')
+    args = parser.parse_args()
+
+    ssl_context = None
+    if args.certfile:
+        ssl_context = tls_context(args.certfile, args.keyfile or args.certfile)
+    elif args.tls:
+        ssl_context = self_signed_context()
+
+    state = RedfishMockState.from_file(args.tree, username=args.username, password=args.password,
+                                       power_delay=args.power_delay, boot_delay=args.boot_delay)
+    server = RedfishMockServer(state, args.host, args.port, ssl_context)
+
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+    print(f"Redfish mock слушает {server.url}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
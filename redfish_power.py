@@ -0,0 +1,177 @@
+"""
+Ожидание смены состояния питания через Redfish.
+
+wait_for_power_state проверяет PowerState сразу, а дальше опрашивает
+Systems/system с экспоненциально растущим интервалом до дедлайна. Если BMC
+поддерживает EventService SSE, события ResourceChanged будят ожидание сразу,
+не дожидаясь очередного интервала опроса - состояние подтверждается GET-запросом.
+"""
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+SYSTEM_PATH = '/redfish/v1/Systems/system'
+EVENT_SERVICE_PATH = '/redfish/v1/EventService'
+
+
+class PowerTransition:
+    """Результат ожидания: достигнуто ли состояние и за какое время"""
+
+    def __init__(self, target, state, reached, latency, polls, source):
+        self.target = target
+        self.state = state
+        self.reached = reached
+        self.latency = latency
+        self.polls = polls
+        self.source = source
+
+    def __repr__(self):
+        return (f"PowerTransition(target={self.target!r}, state={self.state!r}, reached={self.reached}, "
+                f"latency={self.latency:.3f}s, polls={self.polls}, source={self.source!r})")
+
+
+class RedfishEventListener:
+    """
+    Фоновая подписка на EventService SSE.
+    Выставляет wakeup при любом событии, OriginOfCondition которого начинается с origin.
+
+    Поток чтения сам закрывает свое соединение: без событий дольше idle_timeout
+    чтение прерывается, и поток либо переподключается, либо завершается после stop().
+    """
+
+    def __init__(self, client, origin=SYSTEM_PATH, connect_timeout=5, idle_timeout=5):
+        self.client = client
+        # OriginOfCondition в событиях - путь ресурса, а не полный URL
+        self.origin = urlsplit(origin).path
+        self.connect_timeout = connect_timeout
+        self.idle_timeout = idle_timeout
+        self.wakeup = threading.Event()
+        self.events = 0
+        self._sse_uri = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Подписывается на SSE; возвращает False, если BMC его не поддерживает"""
+        try:
+            service = self.client.get(EVENT_SERVICE_PATH, timeout=self.connect_timeout)
+            data = service.json() if service.status_code == 200 else {}
+        except (requests.RequestException, ValueError):
+            return False
+        self._sse_uri = data.get('ServerSentEventUri')
+        if not self._sse_uri or not data.get('ServiceEnabled', True):
+            return False
+        response = self._connect()
+        if response is None:
+            return False
+        threading.Thread(target=self._run, args=(response,), name='redfish-sse', daemon=True).start()
+        return True
+
+    def _connect(self):
+        try:
+            response = self.client.get(self._sse_uri, stream=True,
+                                       timeout=(self.connect_timeout, self.idle_timeout),
+                                       headers={'Accept': 'text/event-stream'})
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            response.close()
+            return None
+        return response
+
+    def _run(self, response):
+        while response is not None:
+            try:
+                self._read(response)
+            except (requests.RequestException, ValueError, OSError):
+                # Таймаут простоя или обрыв соединения BMC
+                pass
+            finally:
+                response.close()
+            if self._stopped.is_set():
+                break
+            response = self._connect()
+
+    def _read(self, response):
+        data = []
+        # chunk_size=1: события небольшие, а крупный буфер задержал бы их до следующих данных
+        for line in response.iter_lines(chunk_size=1, decode_unicode=True):
+            if self._stopped.is_set():
+                return
+            if line.startswith('data:'):
+                data.append(line[5:].strip())
+            elif not line and data:
+                self._dispatch('\n'.join(data))
+                data = []
+
+    def _dispatch(self, payload):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            return
+        for record in event.get('Events', []):
+            origin = (record.get('OriginOfCondition') or {}).get('@odata.id', '')
+            if origin.startswith(self.origin):
+                self.events += 1
+                self.wakeup.set()
+
+    def stop(self):
+        self._stopped.set()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def get_power_state(client, system_path=SYSTEM_PATH):
+    # max_age=0: состояние меняется асинхронно, кэшу клиента доверять нельзя
+    response = client.get(system_path, max_age=0)
+    if response.status_code != 200:
+        return None
+    return response.json().get('PowerState')
+
+
+def wait_for_power_state(client, target, system_path=SYSTEM_PATH, timeout=60, started_at=None,
+                         initial_interval=0.25, max_interval=5.0, backoff=2.0, use_events=True):
+    """
+    Ждет, пока PowerState системы станет равным target, но не дольше timeout секунд.
+
+    started_at - момент отправки команды (time.monotonic()), от него считается latency.
+    Возвращает PowerTransition; при истечении дедлайна reached=False.
+    """
+    started_at = time.monotonic() if started_at is None else started_at
+    deadline = time.monotonic() + timeout
+    listener = RedfishEventListener(client, system_path) if use_events else None
+    subscribed = listener is not None and listener.start()
+    source = 'sse' if subscribed else 'poll'
+
+    interval = initial_interval
+    polls = 0
+    state = None
+    try:
+        while True:
+            if subscribed:
+                listener.wakeup.clear()
+            state = get_power_state(client, system_path)
+            polls += 1
+            now = time.monotonic()
+            if state == target:
+                return PowerTransition(target, state, True, now - started_at, polls, source)
+            remaining = deadline - now
+            if remaining <= 0:
+                return PowerTransition(target, state, False, now - started_at, polls, source)
+
+            wait = min(interval, remaining)
+            if subscribed:
+                listener.wakeup.wait(wait)
+            else:
+                time.sleep(wait)
+            interval = min(interval * backoff, max_interval)
+    finally:
+        if listener is not None:
+            listener.stop()
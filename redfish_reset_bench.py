@@ -0,0 +1,295 @@
+"""
+Замер задержек ComputerSystem.Reset по каждому ResetType.
+
+Для каждого ResetType, который BMC перечисляет в AllowableValues (или
+заданного --reset-type), выполняется --cycles циклов. Перед циклом система
+приводится в нужное исходное состояние (выключена для On/ForceOn, включена и
+загружена для остальных) - это время не замеряется. В цикле от отправки POST
+считаются:
+
+    accepted_s     - ответ 200/202/204 на POST;
+    off_s          - для PowerCycle/ForceRestart/GracefulRestart: система ушла из On/Enabled
+                     (PowerState не On или Status.State не Enabled, например Starting);
+    power_state_s  - PowerState стал целевым (On или Off);
+    enabled_s      - для включения: Status.State стал Enabled.
+
+Состояние опрашивается с постоянным интервалом --poll-interval (шаг задает
+точность замера), события EventService SSE будят опрос раньше. Если перезапуск
+прошел быстрее шага опроса или BMC весь теплый перезапуск показывает On/Enabled,
+через --restart-grace секунд без видимого перехода цикл (кроме GracefulRestart)
+считается выполненным с off_s и power_state_s = None, а не ждет таймаута. Итог -
+распределения (min, p50, p90, p95, p99, max) по каждому ResetType и фазе, а не
+pass/fail; каждый цикл сохраняется в --csv.
+
+    python redfish_reset_bench.py --url https://bmc:2443 --cycles 10 --reset-type ForceOn --reset-type ForceOff
+"""
+import argparse
+import csv
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import requests
+
+from redfish_client import RedfishClient
+from redfish_load import percentile
+from redfish_power import RedfishEventListener, SYSTEM_PATH
+
+# Целевое PowerState для ResetType; Nmi питание не меняет и не замеряется
+TARGET_STATES = {
+    'On': 'On',
+    'ForceOn': 'On',
+    'ForceOff': 'Off',
+    'GracefulShutdown': 'Off',
+    'GracefulRestart': 'On',
+    'ForceRestart': 'On',
+    'PowerCycle': 'On',
+}
+# Перезапуски: система сначала уходит из On, потом возвращается
+CYCLE_TYPES = ('GracefulRestart', 'ForceRestart', 'PowerCycle')
+# Ответы на POST Reset, означающие, что команда принята
+ACCEPTED_STATUSES = (200, 202, 204)
+PHASES = ('accepted_s', 'off_s', 'power_state_s', 'enabled_s')
+PERCENTILES = (50, 90, 95, 99)
+
+
+def required_state(reset_type):
+    """Исходное состояние для замера: включение - из Off, остальное - из загруженной системы"""
+    return 'Off' if TARGET_STATES[reset_type] == 'On' and reset_type not in CYCLE_TYPES else 'On'
+
+
+class ResetBenchmark:
+    def __init__(self, client, system_path=SYSTEM_PATH, timeout=300, poll_interval=0.2, use_events=True,
+                 restart_grace=30):
+        self.client = client
+        self.system_path = system_path
+        self.timeout = timeout
+        self.restart_grace = restart_grace
+        self.poll_interval = poll_interval
+        self.use_events = use_events
+        self.listener = None
+        self.subscribed = False
+        self._reset_path = None
+
+    def system(self):
+        # max_age=0: состояние меняется асинхронно, кэшу клиента доверять нельзя
+        response = self.client.get(self.system_path, max_age=0)
+        response.raise_for_status()
+        return response.json()
+
+    def observe(self):
+        system = self.system()
+        return system.get('PowerState'), (system.get('Status') or {}).get('State')
+
+    def supported(self):
+        action = self.system().get('Actions', {}).get('#ComputerSystem.Reset', {})
+        allowed = action.get('ResetType@Redfish.AllowableValues', list(TARGET_STATES))
+        return [reset_type for reset_type in allowed if reset_type in TARGET_STATES]
+
+    def reset_path(self):
+        if self._reset_path is None:
+            action = self.system().get('Actions', {}).get('#ComputerSystem.Reset', {})
+            self._reset_path = action.get('target', f"{self.system_path}/Actions/ComputerSystem.Reset")
+        return self._reset_path
+
+    def _wait(self):
+        if self.subscribed:
+            self.listener.wakeup.wait(self.poll_interval)
+        else:
+            time.sleep(self.poll_interval)
+
+    def cycle(self, reset_type):
+        """Один замеряемый сброс; словарь с фазами в секундах от отправки POST"""
+        target = TARGET_STATES[reset_type]
+        row = {'reset_type': reset_type, 'status': None, 'ok': False, 'error': None}
+        row.update(dict.fromkeys(PHASES))
+        path = self.reset_path()
+
+        started = time.monotonic()
+        try:
+            response = self.client.post(path, json={'ResetType': reset_type})
+        except requests.RequestException as e:
+            row['error'] = str(e)
+            return row
+        row['accepted_s'] = time.monotonic() - started
+        row['status'] = response.status_code
+        if response.status_code not in ACCEPTED_STATUSES:
+            row['error'] = f"{response.status_code} {response.text[:200]}"
+            return row
+
+        left = reset_type not in CYCLE_TYPES
+        deadline = started + self.timeout
+        while True:
+            if self.subscribed:
+                self.listener.wakeup.clear()
+            try:
+                power, state = self.observe()
+            except requests.RequestException:
+                # Кратковременная ошибка BMC во время перехода - просто следующий опрос
+                power = state = None
+            now = time.monotonic()
+            if power is None:
+                pass
+            elif not left:
+                if power != 'On' or state not in ('Enabled', None):
+                    left = True
+                    row['off_s'] = now - started
+                elif reset_type != 'GracefulRestart' and now - started >= self.restart_grace:
+                    # Переход не виден: короче шага опроса или BMC не меняет состояние при теплом
+                    # перезапуске. Задержку фаз измерить нельзя, но и ошибкой это не считается.
+                    # GracefulRestart ждет завершения ОС хоста - его длительность заранее неизвестна
+                    row['ok'] = True
+                    row['error'] = f"переход не наблюдался за {self.restart_grace:g} с"
+                    return row
+            elif power == target:
+                if row['power_state_s'] is None:
+                    row['power_state_s'] = now - started
+                if target == 'Off':
+                    row['ok'] = True
+                    return row
+                if state == 'Enabled':
+                    row['enabled_s'] = now - started
+                    row['ok'] = True
+                    return row
+            if now >= deadline:
+                row['error'] = f"таймаут {self.timeout:g} с: PowerState={power}, State={state}"
+                return row
+            self._wait()
+
+    def prepare(self, reset_type):
+        """Приводит систему в исходное состояние для reset_type; False - не удалось"""
+        power, state = self.observe()
+        if required_state(reset_type) == 'Off':
+            return power == 'Off' or self.cycle('ForceOff')['ok']
+        if power == 'On' and state == 'Enabled':
+            return True
+        return self.cycle('ForceOn')['ok']
+
+    def run(self, reset_types, cycles, progress=print):
+        rows = []
+        if self.use_events:
+            self.listener = RedfishEventListener(self.client, self.system_path)
+            self.subscribed = self.listener.start()
+        try:
+            for reset_type in reset_types:
+                for number in range(1, cycles + 1):
+                    if not self.prepare(reset_type):
+                        row = {'reset_type': reset_type, 'status': None, 'ok': False,
+                               'error': "не удалось подготовить исходное состояние"}
+                        row.update(dict.fromkeys(PHASES))
+                    else:
+                        row = self.cycle(reset_type)
+                    row['cycle'] = number
+                    rows.append(row)
+                    progress(format_row(row))
+        finally:
+            if self.listener is not None:
+                self.listener.stop()
+        return rows
+
+
+def format_row(row):
+    phases = '  '.join(f"{phase[:-2]} {row[phase]:.2f}" for phase in PHASES if row[phase] is not None)
+    if row['ok']:
+        result = f"OK ({row['error']})" if row['error'] else 'OK'
+    else:
+        result = f"ОШИБКА: {row['error']}"
+    return f"{row['reset_type']:>16} #{row['cycle']:<3} {phases}  {result}"
+
+
+def summarize(rows):
+    """{ResetType: {cycles, failures, фаза: {count, min_s, mean_s, stdev_s, p50_s.., max_s}}}"""
+    summary = {}
+    for reset_type in dict.fromkeys(row['reset_type'] for row in rows):
+        selected = [row for row in rows if row['reset_type'] == reset_type]
+        result = {'cycles': len(selected), 'failures': sum(1 for row in selected if not row['ok'])}
+        for phase in PHASES:
+            values = sorted(row[phase] for row in selected if row['ok'] and row[phase] is not None)
+            if not values:
+                continue
+            result[phase] = {
+                'count': len(values),
+                'min_s': values[0],
+                'mean_s': statistics.fmean(values),
+                'stdev_s': statistics.stdev(values) if len(values) > 1 else 0.0,
+                **{f"p{q}_s": percentile(values, q) for q in PERCENTILES},
+                'max_s': values[-1],
+            }
+        summary[reset_type] = result
+    return summary
+
+
+def print_summary(summary):
+    print(f"{'ResetType':>16} {'фаза':>14} {'n':>4} {'min':>7} {'p50':>7} {'p90':>7} {'p95':>7} "
+          f"{'p99':>7} {'max':>7}")
+    for reset_type, result in summary.items():
+        for phase in PHASES:
+            row = result.get(phase)
+            if row:
+                print(f"{reset_type:>16} {phase:>14} {row['count']:4d} {row['min_s']:7.2f} {row['p50_s']:7.2f} "
+                      f"{row['p90_s']:7.2f} {row['p95_s']:7.2f} {row['p99_s']:7.2f} {row['max_s']:7.2f}")
+        if result['failures']:
+            print(f"{reset_type:>16} неудачных циклов: {result['failures']} из {result['cycles']}")
+    print("Время в секундах от отправки POST")
+
+
+def write_csv(rows, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['reset_type', 'cycle', 'status', 'ok', *PHASES, 'error'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Задержки ComputerSystem.Reset по ResetType')
+    parser.add_argument('--url', default=os.getenv('OPENBMC_URL', 'https://localhost:2443'))
+    parser.add_argument('--username', default=os.getenv('OPENBMC_USERNAME', 'root'))
+    parser.add_argument('--password', default=os.getenv('OPENBMC_PASSWORD', '0penBmc'))
+    parser.add_argument('--reset-type', action='append', dest='reset_types', choices=list(TARGET_STATES),
+                        help='ResetType (можно несколько раз); по умолчанию все поддерживаемые BMC')
+    parser.add_argument('--cycles', type=int, default=5, help='Циклов на ResetType')
+    parser.add_argument('--timeout', type=float, default=300, help='Предел ожидания цикла, с')
+    parser.add_argument('--poll-interval', type=float, default=0.2, help='Интервал опроса состояния, с')
+    parser.add_argument('--restart-grace', type=float, default=30,
+                        help='Перезапуск без видимого перехода из On/Enabled за это время считается выполненным, с')
+    parser.add_argument('--no-events', action='store_true', help='Только опрос, без EventService SSE')
+    parser.add_argument('--no-restore', action='store_true', help='Не возвращать исходное состояние питания')
+    parser.add_argument('--csv', help='Сохранить циклы в CSV')
+    parser.add_argument('--json', help='Сохранить циклы и распределения в JSON')
+    args = parser.parse_args()
+
+    client = RedfishClient(args.url, args.username, args.password, pool_size=2)
+    client.login()
+    try:
+        bench = ResetBenchmark(client, timeout=args.timeout, poll_interval=args.poll_interval,
+                               use_events=not args.no_events, restart_grace=args.restart_grace)
+        initial, _ = bench.observe()
+        firmware = client.get('/redfish/v1/Managers/bmc').json().get('FirmwareVersion')
+        reset_types = args.reset_types or bench.supported()
+        print(f"Прошивка: {firmware or '-'}, исходное состояние: {initial}, ResetType: {', '.join(reset_types)}")
+        rows = bench.run(reset_types, args.cycles)
+        if not args.no_restore and initial in ('On', 'Off') and bench.observe()[0] != initial:
+            bench.cycle('ForceOn' if initial == 'On' else 'ForceOff')
+    finally:
+        client.logout()
+        client.close()
+
+    summary = summarize(rows)
+    print_summary(summary)
+    if args.csv:
+        write_csv(rows, args.csv)
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': datetime.now().isoformat(timespec='seconds'), 'firmware': firmware,
+                       'poll_interval_s': args.poll_interval, 'summary': summary, 'cycles': rows},
+                      f, indent=2, ensure_ascii=False)
+    return 0 if rows and all(row['ok'] for row in rows) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Модель нагрузки Redfish: какие запросы, в каких пропорциях и с какими паузами.
+
+Описание лежит в JSON (по умолчанию redfish_workload.json):
+
+    {
+        "think_time": {"distribution": "lognormal", "median": 1.5, "sigma": 0.6, "cap": 10},
+        "requests": [
+            {"name": "Chassis", "method": "GET", "path": "/redfish/v1/Chassis/chassis", "weight": 12},
+            {"name": "Login", "method": "POST", "path": "/redfish/v1/SessionService/Sessions",
+             "body": {"UserName": "{username}", "Password": "{password}"},
+             "expect": [201], "cleanup": "DELETE", "weight": 1}
+        ]
+    }
+
+weight - относительная частота запроса, think_time - пауза после запроса
+(общая или своя у запроса): constant (value), uniform (min, max),
+exponential (mean) или lognormal (median, sigma); cap ограничивает хвост.
+В body подставляются {username} и {password}. cleanup: "DELETE" удаляет
+созданный ресурс по заголовку Location (например, сессию после входа).
+"""
+import bisect
+import json
+import math
+import os
+import random
+
+DEFAULT_WORKLOAD = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'redfish_workload.json')
+
+
+class WorkloadError(Exception):
+    """Некорректное описание нагрузки"""
+
+
+class ThinkTime:
+    DISTRIBUTIONS = {
+        'constant': ('value',),
+        'uniform': ('min', 'max'),
+        'exponential': ('mean',),
+        'lognormal': ('median', 'sigma'),
+    }
+
+    def __init__(self, distribution='constant', cap=None, **params):
+        required = self.DISTRIBUTIONS.get(distribution)
+        if required is None:
+            raise WorkloadError(f"Неизвестное распределение паузы: {distribution}")
+        missing = [name for name in required if name not in params]
+        if missing:
+            raise WorkloadError(f"{distribution}: не заданы {', '.join(missing)}")
+        self.distribution = distribution
+        self.params = params
+        self.cap = cap
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data) if data else cls(value=0)
+
+    def sample(self, rng=random):
+        p = self.params
+        if self.distribution == 'constant':
+            value = p['value']
+        elif self.distribution == 'uniform':
+            value = rng.uniform(p['min'], p['max'])
+        elif self.distribution == 'exponential':
+            value = rng.expovariate(1 / p['mean']) if p['mean'] > 0 else 0.0
+        else:
+            value = rng.lognormvariate(math.log(p['median']), p['sigma'])
+        return min(value, self.cap) if self.cap is not None else value
+
+    def mean(self):
+        """Средняя пауза без учета cap - для оценки rps на пользователя"""
+        p = self.params
+        if self.distribution == 'constant':
+            return p['value']
+        if self.distribution == 'uniform':
+            return (p['min'] + p['max']) / 2
+        if self.distribution == 'exponential':
+            return p['mean']
+        return p['median'] * math.exp(p['sigma'] ** 2 / 2)
+
+
+class WorkloadRequest:
+    def __init__(self, name, method, path, weight, body=None, expect=None, think_time=None, cleanup=None):
+        self.name = name
+        self.method = method.upper()
+        self.path = path
+        self.weight = weight
+        self.body = body
+        self.expect = tuple(expect or ((201,) if self.method == 'POST' else (200,)))
+        self.think_time = think_time
+        self.cleanup = cleanup.upper() if cleanup else None
+
+    def render_body(self, username, password):
+        if self.body is None:
+            return None
+        text = json.dumps(self.body)
+        # Подстановка в сериализованном теле, чтобы не обходить вложенные структуры
+        return json.loads(text.replace('{username}', username).replace('{password}', password))
+
+
+class Workload:
+    def __init__(self, requests, think_time=None):
+        if not requests:
+            raise WorkloadError("В описании нагрузки нет запросов")
+        self.requests = requests
+        self.think_time = think_time or ThinkTime(value=0)
+        self._cumulative = []
+        total = 0
+        for request in requests:
+            if request.weight <= 0:
+                raise WorkloadError(f"{request.name}: вес должен быть положительным")
+            total += request.weight
+            self._cumulative.append(total)
+        self.total_weight = total
+
+    @classmethod
+    def from_file(cls, path=None):
+        path = path or os.getenv('OPENBMC_WORKLOAD', DEFAULT_WORKLOAD)
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        requests = []
+        for item in data.get('requests', ()):
+            item = dict(item)
+            think_time = item.pop('think_time', None)
+            requests.append(WorkloadRequest(
+                think_time=ThinkTime.from_dict(think_time) if think_time else None, **item))
+        return cls(requests, ThinkTime.from_dict(data.get('think_time')))
+
+    def choose(self, rng=random):
+        return self.requests[bisect.bisect_right(self._cumulative, rng.random() * self.total_weight)]
+
+    def think(self, request, rng=random):
+        return (request.think_time or self.think_time).sample(rng)
+
+    def shares(self):
+        """Доля каждого запроса в общем потоке, {name: доля}"""
+        return {request.name: request.weight / self.total_weight for request in self.requests}
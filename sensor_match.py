@@ -0,0 +1,280 @@
+"""
+Сопоставление датчиков Redfish и IPMI.
+
+Имена нормализуются и разбиваются на токены один раз (CPU0_Temp -> cpu 0 temp).
+Числа сравниваются с учетом порядка: признаком служит номер вместе со словом
+перед ним (cpu:0) и с позицией среди чисел имени (#0:0), так что CPU1 Core2 и
+CPU2 Core1 - разные датчики. Кандидаты подбираются через инвертированный
+индекс признаков, а не перебором всех пар. Схожесть - взвешенная по редкости
+токенов (IDF) мера Дайса. Пары распределяются один-к-одному оптимально
+(венгерский алгоритм) по компонентам связности графа кандидатов, поэтому
+результат детерминирован и один датчик IPMI не достается двум датчикам Redfish.
+
+Совпадение номера датчика (Redfish SensorNumber / IPMI sensor number) сильнее
+любого совпадения имен, а несовместимые entity ID / PhysicalContext исключают пару.
+"""
+import math
+import re
+from collections import defaultdict
+
+DEFAULT_THRESHOLD = 0.3
+# Бонус за совпадение номера датчика - больше максимальной схожести имен (1.0)
+NUMBER_MATCH_BONUS = 1.0
+
+SYNONYMS = {
+    'temperature': 'temp',
+    'tmp': 'temp',
+    'processor': 'cpu',
+    'proc': 'cpu',
+    'socket': 'cpu',
+    'memory': 'dimm',
+    'mem': 'dimm',
+    'ambient': 'inlet',
+    'intake': 'inlet',
+    'exhaust': 'outlet',
+    'mainboard': 'board',
+    'motherboard': 'board',
+    'mb': 'board',
+    'sys': 'system',
+}
+
+# IPMI entity ID -> Redfish PhysicalContext (IPMI 2.0, таблица 43-13)
+ENTITY_CONTEXT = {
+    3: 'CPU',
+    7: 'SystemBoard',
+    8: 'Memory',
+    10: 'PowerSupply',
+    20: 'PowerSupply',
+    29: 'Fan',
+    32: 'Memory',
+    55: 'Intake',
+    64: 'Exhaust',
+    65: 'CPU',
+}
+
+_TOKEN_RE = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+')
+
+
+def tokenize(name):
+    """Нормализованные токены имени по порядку: регистр, camelCase, цифры отдельно, синонимы"""
+    tokens = []
+    for token in _TOKEN_RE.findall(name or ''):
+        token = token.lower()
+        if token.isdigit():
+            token = str(int(token))
+        tokens.append(SYNONYMS.get(token, token))
+    return tuple(tokens)
+
+
+def name_features(tokens):
+    """
+    Признаки для сравнения имен: слова и номера в порядке следования - номер
+    со словом перед ним (cpu:1) и с позицией среди чисел имени (#0:1)
+    """
+    features = []
+    word = ''
+    position = 0
+    for token in tokens:
+        if token.isdigit():
+            features.append(f"{word}:{token}")
+            features.append(f"#{position}:{token}")
+            position += 1
+        else:
+            features.append(token)
+            word = token
+    return tuple(dict.fromkeys(features))
+
+
+class Sensor:
+    """
+    Датчик одного из интерфейсов. number - номер датчика (SensorNumber / номер в SDR),
+    entity_id - IPMI entity ID, context - Redfish PhysicalContext.
+    """
+
+    __slots__ = ('name', 'reading', 'number', 'entity_id', 'context', 'tokens', 'features')
+
+    def __init__(self, name, reading=None, number=None, entity_id=None, context=None):
+        self.name = name
+        self.reading = reading
+        self.number = number
+        self.entity_id = entity_id
+        self.context = context or ENTITY_CONTEXT.get(entity_id)
+        self.tokens = tokenize(name)
+        self.features = name_features(self.tokens)
+
+    def __repr__(self):
+        return f"Sensor({self.name!r}, {self.reading!r}, number={self.number!r})"
+
+
+class SensorMatch:
+    __slots__ = ('left', 'right', 'score', 'method')
+
+    def __init__(self, left, right, score, method):
+        self.left = left
+        self.right = right
+        self.score = score
+        self.method = method
+
+
+def sensors_from_thermal(thermal):
+    """Датчики температуры из ресурса Redfish Thermal"""
+    sensors = []
+    for item in thermal.get('Temperatures', []):
+        reading = item.get('ReadingCelsius')
+        if reading is None:
+            continue
+        sensors.append(Sensor(item.get('Name', ''), reading,
+                              number=item.get('SensorNumber'),
+                              context=item.get('PhysicalContext')))
+    return sensors
+
+
+class TokenIndex:
+    """Инвертированный индекс: признак имени -> номера датчиков, плюс IDF-веса признаков"""
+
+    def __init__(self, sensors, document_count=None):
+        self.sensors = sensors
+        self.postings = defaultdict(list)
+        self.by_number = defaultdict(list)
+        for i, sensor in enumerate(sensors):
+            for token in sensor.features:
+                self.postings[token].append(i)
+            if sensor.number is not None:
+                self.by_number[sensor.number].append(i)
+        total = document_count or len(sensors) or 1
+        self.weights = {token: math.log(1 + total / len(ids)) for token, ids in self.postings.items()}
+        # Токены, которые есть почти у всех датчиков ("temp"), кандидатов не отбирают
+        self.common_limit = max(50, len(sensors) // 10)
+
+    def weight(self, token):
+        return self.weights.get(token, math.log(1 + len(self.sensors) or 1))
+
+    def candidates(self, sensor):
+        found = set(self.by_number.get(sensor.number, ())) if sensor.number is not None else set()
+        common = []
+        rare = False
+        for token in sensor.features:
+            ids = self.postings.get(token, ())
+            if len(ids) <= self.common_limit:
+                found.update(ids)
+                rare = rare or bool(ids)
+            else:
+                common.append(ids)
+        # Имя только из частых признаков - иначе у датчика не будет ни одного кандидата
+        if not rare:
+            for ids in common:
+                found.update(ids)
+        return found
+
+
+def name_similarity(left, right, weight):
+    """Взвешенная мера Дайса по признакам имен"""
+    if not left.features or not right.features:
+        return 0.0
+    common = sum(weight(t) for t in set(left.features) & set(right.features))
+    total = sum(weight(t) for t in left.features) + sum(weight(t) for t in right.features)
+    return 2 * common / total if total else 0.0
+
+
+def _compatible(left, right):
+    return left.context is None or right.context is None or left.context == right.context
+
+
+def _hungarian(cost):
+    """Минимальное назначение строк столбцам (строк не больше, чем столбцов): {строка: столбец}"""
+    n, m = len(cost), len(cost[0])
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    p = [0] * (m + 1)
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [math.inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            delta = math.inf
+            j1 = 0
+            row = cost[i0 - 1]
+            for j in range(1, m + 1):
+                if not used[j]:
+                    current = row[j - 1] - u[i0] - v[j]
+                    if current < minv[j]:
+                        minv[j] = current
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    return {p[j] - 1: j - 1 for j in range(1, m + 1) if p[j]}
+
+
+def _components(edges):
+    """Компоненты связности двудольного графа кандидатов: список (левые, правые)"""
+    parent = {}
+
+    def find(node):
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for i, j in edges:
+        parent[find(('l', i))] = find(('r', j))
+
+    groups = defaultdict(lambda: (set(), set()))
+    for node in list(parent):
+        side, index = node
+        groups[find(node)][0 if side == 'l' else 1].add(index)
+    return [(sorted(left), sorted(right)) for left, right in groups.values()]
+
+
+def match_sensors(left, right, threshold=DEFAULT_THRESHOLD):
+    """
+    Оптимальное сопоставление один-к-одному датчиков left (Redfish) и right (IPMI).
+    Возвращает SensorMatch, отсортированные по имени левого датчика.
+    """
+    index = TokenIndex(right, document_count=len(left) + len(right))
+    scores = {}
+    for i, sensor in enumerate(left):
+        for j in index.candidates(sensor):
+            other = right[j]
+            if not _compatible(sensor, other):
+                continue
+            score = name_similarity(sensor, other, index.weight)
+            method = 'name'
+            if sensor.number is not None and sensor.number == other.number:
+                score += NUMBER_MATCH_BONUS
+                method = 'number'
+            if score >= threshold:
+                scores[i, j] = (score, method)
+
+    matches = []
+    for rows, cols in _components(scores):
+        transpose = len(rows) > len(cols)
+        if transpose:
+            rows, cols = cols, rows
+        # Стоимость - минус схожесть; пары без кандидата стоят 0 (то же, что "не сопоставлен")
+        cost = [[-scores.get((c, r) if transpose else (r, c), (0.0,))[0] for c in cols] for r in rows]
+        for r, c in _hungarian(cost).items():
+            i, j = (cols[c], rows[r]) if transpose else (rows[r], cols[c])
+            pair = scores.get((i, j))
+            if pair is not None:
+                matches.append(SensorMatch(left[i], right[j], pair[0], pair[1]))
+    matches.sort(key=lambda match: match.left.name)
+    return matches
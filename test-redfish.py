@@ -2,14 +2,38 @@ import pytest
 import requests
 import os
 import time
-import subprocess
-import re
+import sys
 import json
+import asyncio
+
+from redfish_client import RedfishClient, RedfishAuthError
+from redfish_power import wait_for_power_state
+from redfish_reset_bench import ACCEPTED_STATUSES, ResetBenchmark, summarize
+from redfish_async import AsyncRedfishClient
+import redfish_crawler
+from sensor_match import match_sensors, sensors_from_thermal
+from ipmi_sensors import IpmiSensorReader, IpmiError
+from thermal_sampler import ThermalSampler, print_summary, sensor_readings
+from thresholds import LimitsTable, evaluate
+from redfish_load import run_load, run_open_loop
+from redfish_capture import CaptureWriter, read_capture, replay
+from latency_histogram import LatencyRecorder, compare_baseline, junit_properties
+
+thermal_limits = LimitsTable.from_file()
 
 # Базовые фикстуры
 @pytest.fixture(scope="session")
 def base_url():
-    return os.getenv('OPENBMC_URL', 'https://localhost:2443')
+    # OPENBMC_MOCK=1 - поднимаем локальный эмулятор Redfish вместо реального BMC
+    if os.getenv('OPENBMC_MOCK'):
+        import redfish_mock
+        server = redfish_mock.start_mock(
+            username=os.getenv('OPENBMC_USERNAME', 'root'),
+            password=os.getenv('OPENBMC_PASSWORD', '0penBmc'))
+        yield server.url
+        server.stop()
+    else:
+        yield os.getenv('OPENBMC_URL', 'https://localhost:2443')
 
 @pytest.fixture(scope="session")
 def credentials():
@@ -19,40 +43,90 @@ def credentials():
     }
 
 @pytest.fixture(scope="session")
-def session(base_url, credentials):
-    """Создает аутентифицированную сессию для всех тестов"""
-    s = requests.Session()
-    s.verify = False  # Отключаем проверку SSL для самоподписанных сертификатов
-    s.auth = (credentials['username'], credentials['password'])
-    return s
+def latency(record_testsuite_property):
+    """
+    Гистограммы задержек всех запросов клиентов Redfish за прогон и счетчики кэша
+    клиента. Гистограммы пишутся в JSON (OPENBMC_LATENCY_REPORT), перцентили total -
+    в свойства JUnit. Под pytest-xdist свойства testsuite воркеров теряются, поэтому
+    там их пишет шаг объединения отчетов: latency_histogram.py --junitxml. С
+    OPENBMC_LATENCY_BASELINE прогон сравнивается с базовой сводкой: рост p95 больше
+    чем вдвое (и больше 5 мс) - ошибка; OPENBMC_LATENCY_UPDATE_BASELINE=1 обновляет базу.
+    """
+    recorder = LatencyRecorder()
+    yield recorder
+    summary = recorder.summary()
+    worker = os.getenv('PYTEST_XDIST_WORKER')
+    report = os.getenv('OPENBMC_LATENCY_REPORT')
+    if report:
+        if worker:
+            report = report.replace('.json', f'-{worker}.json')
+        recorder.save(report)
+
+    regressions = None
+    baseline = os.getenv('OPENBMC_LATENCY_BASELINE')
+    if baseline and os.getenv('OPENBMC_LATENCY_UPDATE_BASELINE') == '1':
+        # Под xdist у каждого воркера часть запросов - базу обновляет только один
+        if worker in (None, 'gw0'):
+            recorder.save(baseline)
+    elif baseline and os.path.exists(baseline):
+        regressions = compare_baseline(summary, LatencyRecorder.load(baseline).summary(), tolerance=1.0,
+                                       slack_ms=5.0, min_count=int(os.getenv('OPENBMC_LATENCY_MIN_COUNT', '10')))
+    if worker is None:
+        for name, value in junit_properties(recorder, regressions).items():
+            record_testsuite_property(name, value)
+    if regressions:
+        pytest.fail("Регрессия задержки относительно базы: " + "; ".join(
+            f"{r['endpoint']} p95 {r['baseline_ms']:.1f} -> {r['current_ms']:.1f} мс" for r in regressions))
+
+@pytest.fixture(scope="session")
+def session(base_url, credentials, latency):
+    """
+    Одна аутентифицированная сессия на все тесты: вход через Redfish Session Service,
+    дальше X-Auth-Token поверх пула keep-alive соединений, удаление сессии в конце.
+    GET-ответы кэшируются на прогон (OPENBMC_CACHE_TTL, с) с ревалидацией по ETag,
+    OPENBMC_CAPTURE включает запись запросов в JSONL
+    """
+    client = RedfishClient(base_url, credentials['username'], credentials['password'],
+                           cache_ttl=float(os.getenv('OPENBMC_CACHE_TTL', '60')),
+                           capture=CaptureWriter.from_env(), latency=latency)
+    try:
+        client.login()
+    except RedfishAuthError as e:
+        pytest.fail(str(e))
+    yield client
+    # Счетчики кэша попадают в JUnit вместе со сводкой задержек (фикстура latency)
+    latency.count("redfish_cache_hits", client.cache.hits)
+    latency.count("redfish_cache_revalidated", client.cache.revalidated)
+    latency.count("redfish_cache_misses", client.cache.misses)
+    client.close()
+    if client.capture is not None:
+        client.capture.close()
 
 @pytest.fixture(scope="function")
-def auth_session(base_url, credentials):
-    """Создает новую аутентифицированную сессию через Redfish Session Service"""
-    s = requests.Session()
-    s.verify = False
-    
-    # Создаем сессию через Redfish Session Service
-    auth_url = f"{base_url}/redfish/v1/SessionService/Sessions"
-    auth_data = {
-        "UserName": credentials['username'],
-        "Password": credentials['password']
-    }
-    
-    response = s.post(auth_url, json=auth_data)
-    if response.status_code == 200:
-        # Устанавливаем токен аутентификации для последующих запросов
-        auth_token = response.headers.get('X-Auth-Token')
-        if auth_token:
-            s.headers.update({'X-Auth-Token': auth_token})
-    else:
-        pytest.fail(f"Не удалось создать сессию: {response.status_code}")
-    
-    return s
+def auth_session(base_url, credentials, latency):
+    """Создает отдельную сессию через Redfish Session Service и удаляет ее после теста"""
+    client = RedfishClient(base_url, credentials['username'], credentials['password'], pool_size=2,
+                           latency=latency)
+    try:
+        client.login()
+    except RedfishAuthError as e:
+        pytest.fail(str(e))
+    yield client
+    client.close()
+
+@pytest.fixture(scope="session")
+def ipmi_reader(tmp_path_factory):
+    """Чтение датчиков по IPMI с кэшем SDR; с эмулятором - через fake_ipmitool.py"""
+    if os.getenv('OPENBMC_MOCK') and not os.getenv('OPENBMC_IPMITOOL'):
+        fake = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_ipmitool.py')
+        return IpmiSensorReader(ipmitool=[sys.executable, fake],
+                                cache_dir=str(tmp_path_factory.mktemp('sdr')))
+    return IpmiSensorReader.from_env()
 
 class TestOpenBMCComplete:
     """Полный набор тестов для OpenBMC Redfish API"""
     
+    @pytest.mark.readonly
     def test_01_redfish_authentication(self, base_url, credentials):
         """
         Тест аутентификации в OpenBMC через Redfish API
@@ -93,6 +167,7 @@ class TestOpenBMCComplete:
         # Очистка: удаляем сессию
         session.delete(f"{auth_url}/{session_id}")
     
+    @pytest.mark.readonly
     def test_02_system_info(self, session, base_url):
         """
         Тест получения информации о системе
@@ -135,7 +210,8 @@ class TestOpenBMCComplete:
         # Сохраняем данные для использования в других тестах
         self.system_data = system_data
     
-    def test_03_power_management_on(self, session, base_url):
+    @pytest.mark.mutates_power
+    def test_03_power_management_on(self, session, base_url, record_property):
         """ Тест управления питанием (включение сервера)
         ○ Отправить POST-запрос на /redfish/v1/Systems/system/Actions/ComputerSystem.Reset 
         с параметром "ResetType": "On".
@@ -162,6 +238,7 @@ class TestOpenBMCComplete:
             "ResetType": "ForceOn"
         }
         
+        started_at = time.monotonic()
         response = session.post(reset_url, json=reset_data)
         
         # ИСПРАВЛЕНИЕ: принимаем как 202, так и 204 как валидные ответы
@@ -174,28 +251,20 @@ class TestOpenBMCComplete:
         else:
             print("✓ Команда включения выполнена (204 No Content)")
         
-        # Ждем некоторое время для применения изменений
-        time.sleep(10)
+        # Ждем смены состояния: события SSE или опрос с экспоненциальной задержкой
+        transition = wait_for_power_state(session, "On", system_path=system_url,
+                                          timeout=60, started_at=started_at)
+        record_property("power_on_latency_s", round(transition.latency, 3))
         
         # Проверяем, что статус системы изменился на "PowerState": "On"
-        max_retries = 10
-        power_on_confirmed = False
-        
-        for attempt in range(max_retries):
-            system_response = session.get(system_url)
-            current_state = system_response.json().get('PowerState')
-            
-            if current_state == "On":
-                power_on_confirmed = True
-                print(f"✓ Система успешно включена (попытка {attempt + 1})")
-                break
-            else:
-                print(f"  Попытка {attempt + 1}: система еще не включена. Текущее состояние: {current_state}")
-                time.sleep(5)
-        
-        assert power_on_confirmed, f"Система не включилась в течение {max_retries * 5} секунд"
+        assert transition.reached, (
+            f"Система не включилась в течение 60 секунд. Текущее состояние: {transition.state}"
+        )
+        print(f"✓ Система успешно включена за {transition.latency:.2f} с "
+              f"({transition.polls} запросов, {transition.source})")
     
-    def test_04_power_management_off(self, session, base_url):
+    @pytest.mark.mutates_power
+    def test_04_power_management_off(self, session, base_url, record_property):
         """
         Тест управления питанием (выключение сервера)
         """
@@ -219,6 +288,7 @@ class TestOpenBMCComplete:
             "ResetType": "ForceOff"
         }
         
+        started_at = time.monotonic()
         response = session.post(reset_url, json=reset_data)
         
         # ИСПРАВЛЕНИЕ: принимаем как 202, так и 204 как валидные ответы
@@ -231,27 +301,19 @@ class TestOpenBMCComplete:
         else:
             print("✓ Команда выключения выполнена (204 No Content)")
         
-        # Ждем некоторое время для применения изменений
-        time.sleep(10)
+        # Ждем смены состояния: события SSE или опрос с экспоненциальной задержкой
+        transition = wait_for_power_state(session, "Off", system_path=system_url,
+                                          timeout=50, started_at=started_at)
+        record_property("power_off_latency_s", round(transition.latency, 3))
         
         # Проверяем, что статус системы изменился на "PowerState": "Off"
-        max_retries = 8
-        power_off_confirmed = False
-        
-        for attempt in range(max_retries):
-            system_response = session.get(system_url)
-            current_state = system_response.json().get('PowerState')
-            
-            if current_state == "Off":
-                power_off_confirmed = True
-                print(f"✓ Система успешно выключена (попытка {attempt + 1})")
-                break
-            else:
-                print(f"  Попытка {attempt + 1}: система еще не выключена. Текущее состояние: {current_state}")
-                time.sleep(5)
-        
-        assert power_off_confirmed, f"Система не выключилась в течение {max_retries * 5} секунд"
+        assert transition.reached, (
+            f"Система не выключилась в течение 50 секунд. Текущее состояние: {transition.state}"
+        )
+        print(f"✓ Система успешно выключена за {transition.latency:.2f} с "
+              f"({transition.polls} запросов, {transition.source})")
     
+    @pytest.mark.readonly
     def test_05_cpu_temperature_normal_range(self, session, base_url):
         """
         Тест на соответствие температуры CPU норме в Redfish
@@ -275,64 +337,49 @@ class TestOpenBMCComplete:
         
         print(f"Найдено датчиков температуры: {len(thermal_data['Temperatures'])}")
         
-        # Ищем CPU temperature sensors
-        cpu_temperatures = []
-        for sensor in thermal_data['Temperatures']:
-            sensor_name = sensor.get('Name', '').lower()
-            sensor_physical_context = sensor.get('PhysicalContext', '').lower()
-            
-            # Ищем датчики, связанные с CPU/процессором
-            if any(cpu_keyword in sensor_name or cpu_keyword in sensor_physical_context 
-                   for cpu_keyword in ['cpu', 'processor', 'core', 'dimm']):
-                cpu_temperatures.append(sensor)
+        # Ищем CPU temperature sensors (классы cpu/memory таблицы thermal_limits.json)
+        readings = [(info, value) for info, value in sensor_readings(thermal_data)
+                    if info.kind == 'temperature']
+        limits = thermal_limits.limits([info for info, _ in readings])
+        cpu_indexes = [i for i, sensor_class in enumerate(limits.classes) if sensor_class in ('cpu', 'memory')]
         
-        assert len(cpu_temperatures) > 0, "Датчики температуры CPU не найдены"
+        assert len(cpu_indexes) > 0, "Датчики температуры CPU не найдены"
         
+        print(f"Найдено датчиков CPU: {len(cpu_indexes)}")
         
-        print(f"Найдено датчиков CPU: {len(cpu_temperatures)}")
+        for i in cpu_indexes:
+            info, temperature = readings[i]
+            assert temperature is not None, f"Температура не указана для датчика {info.name}"
+        
+        # Все показания оцениваются разом: нормальный диапазон класса и собственные пороги датчика
+        verdicts = evaluate([value for _, value in readings], limits)
         
-        # Проверяем температуру CPU
         all_temps_normal = True
-        for cpu_sensor in cpu_temperatures:
-            temperature = cpu_sensor.get('ReadingCelsius')
-            sensor_name = cpu_sensor.get('Name', 'Unknown')
-            physical_context = cpu_sensor.get('PhysicalContext', 'Unknown')
-            
-            assert temperature is not None, f"Температура не указана для датчика {sensor_name}"
-            
-            # Определяем нормальный диапазон в зависимости от типа датчика
-            if 'cpu' in sensor_name.lower() or 'processor' in sensor_name.lower():
-                min_temp, max_temp = 10, 95
-            elif 'dimm' in sensor_name.lower() or 'memory' in sensor_name.lower():
-                min_temp, max_temp = 15, 85
-            else:
-                min_temp, max_temp = 10, 80
-            
-            # Проверяем, что температура в нормальном диапазоне
-            is_normal = min_temp <= temperature <= max_temp
-            status_icon = "✓" if is_normal else "✗"
-            
-            if not is_normal:
+        for i in cpu_indexes:
+            info, temperature = readings[i]
+            verdict = verdicts[i]
+            status_icon = "✓" if verdict.ok else "✗"
+            if not verdict.ok:
                 all_temps_normal = False
             
-            # Проверяем наличие пороговых значений
-            upper_critical = cpu_sensor.get('UpperThresholdCritical', 'N/A')
-            upper_fatal = cpu_sensor.get('UpperThresholdFatal', 'N/A')
-            
-            print(f"  {status_icon} {sensor_name} ({physical_context}): {temperature}°C "
-                  f"[норма: {min_temp}-{max_temp}°C] "
-                  f"(критично: {upper_critical}°C, фатально: {upper_fatal}°C)")
+            sensor_limits = verdict.limits
+            upper_critical = info.thresholds.get('UpperThresholdCritical', 'N/A')
+            upper_fatal = info.thresholds.get('UpperThresholdFatal', 'N/A')
             
+            print(f"  {status_icon} {info.name} ({info.context or 'Unknown'}): {temperature}°C "
+                  f"[норма {verdict.sensor_class}: {sensor_limits['normal_min']}-{sensor_limits['normal_max']}°C] "
+                  f"(критично: {upper_critical}°C, фатально: {upper_fatal}°C) - {verdict.status}")
+        
+        for sensor in thermal_data['Temperatures']:
             # Проверяем статус датчика
-            status = cpu_sensor.get('Status', {})
-            if 'Health' in status:
-                health = status['Health']
-                if health != 'OK':
-                    print(f"    ВНИМАНИЕ: статус здоровья датчика: {health}")
+            status = sensor.get('Status', {})
+            if status.get('Health', 'OK') != 'OK':
+                print(f"    ВНИМАНИЕ: статус здоровья датчика {sensor.get('Name', 'Unknown')}: {status['Health']}")
         
         assert all_temps_normal, "Один или несколько датчиков CPU имеют температуру вне нормального диапазона"
         print("✓ Все датчики CPU в нормальном диапазоне температур")
     
+    @pytest.mark.readonly
     def test_06_temperature_sensor_structure(self, session, base_url):
         """
         Проверка структуры температурных датчиков согласно Redfish стандарту
@@ -400,55 +447,14 @@ class TestOpenBMCComplete:
         
         print(f"✓ Датчиков в состоянии 'OK': {healthy_sensors} из {sensors_checked}")
     
-    def test_07_cpu_sensors_redfish_vs_ipmi(self, session, base_url):
+    @pytest.mark.readonly
+    def test_07_cpu_sensors_redfish_vs_ipmi(self, session, base_url, ipmi_reader):
         """
         Тест на соответствие датчиков CPU в Redfish и IPMI
         ○ Необходимо разработать тест в соответствии документации Redfish и IPMI
         """
         print("\n=== Тест сравнения Redfish и IPMI ===")
         
-        def parse_ipmi_sensors():
-            """
-            Парсит вывод IPMI sensors и извлекает температуру CPU
-            """
-            try:
-                # Запускаем ipmitool для получения информации о датчиках
-                result = subprocess.run(
-                    ['ipmitool', 'sensor', 'list'],
-                    capture_output=True, 
-                    text=True, 
-                    check=True,
-                    timeout=30
-                )
-                
-                cpu_temperatures = {}
-                lines = result.stdout.split('\n')
-                
-                for line in lines:
-                    line_lower = line.lower()
-                    if any(keyword in line_lower for keyword in ['temp', 'cpu', 'core', 'dimm']):
-                        # Парсим строку вида "CPU Temp      | 45.000     | degrees C"
-                        parts = re.split(r'\s*\|\s*', line)
-                        if len(parts) >= 3:
-                            sensor_name = parts[0].strip()
-                            temperature_str = parts[1].strip()
-                            units = parts[2].strip()
-                            
-                            # Извлекаем числовое значение температуры
-                            temp_match = re.search(r'(\d+\.?\d*)', temperature_str)
-                            if temp_match and ('c' in units.lower() or 'degrees c' in units.lower()):
-                                temp_value = float(temp_match.group(1))
-                                cpu_temperatures[sensor_name] = temp_value
-                
-                return cpu_temperatures
-                
-            except subprocess.CalledProcessError as e:
-                pytest.skip(f"IPMI tool не доступен: {e}")
-            except FileNotFoundError:
-                pytest.skip("IPMI tool не установлен")
-            except subprocess.TimeoutExpired:
-                pytest.skip("IPMI tool timeout")
-        
         # Получаем температуру из Redfish
         thermal_url = f"{base_url}/redfish/v1/Chassis/chassis/Thermal"
         response = session.get(thermal_url)
@@ -463,25 +469,26 @@ class TestOpenBMCComplete:
         
         thermal_data = response.json()
         
-        redfish_temps = {}
-        for sensor in thermal_data.get('Temperatures', []):
-            sensor_name = sensor.get('Name', '')
-            temp = sensor.get('ReadingCelsius')
-            if temp is not None:
-                redfish_temps[sensor_name] = temp
+        redfish_sensors = sensors_from_thermal(thermal_data)
         
-        if not redfish_temps:
+        if not redfish_sensors:
             pytest.skip("Не найдено датчиков температуры в Redfish")
         
-        print(f"Датчики Redfish: {list(redfish_temps.keys())}")
+        print(f"Датчики Redfish: {[sensor.name for sensor in redfish_sensors]}")
         
-        # Получаем температуру из IPMI
-        ipmi_temps = parse_ipmi_sensors()
+        # Получаем температуру из IPMI (SDR из кэша, все датчики одной сессией)
+        try:
+            ipmi_readings = ipmi_reader.temperatures()
+        except FileNotFoundError:
+            pytest.skip("IPMI tool не установлен")
+        except IpmiError as e:
+            pytest.skip(f"IPMI tool не доступен: {e}")
         
-        if not ipmi_temps:
+        if not ipmi_readings:
             pytest.skip("Не найдено датчиков температуры в IPMI")
         
-        print(f"Датчики IPMI: {list(ipmi_temps.keys())}")
+        print(f"Датчики IPMI: {[reading.name for reading in ipmi_readings]}")
+        ipmi_sensors = [reading.to_sensor() for reading in ipmi_readings]
         
         # Сравниваем показания (допускаем разницу в 5°C из-за задержек измерений)
         tolerance = 5.0
@@ -491,32 +498,21 @@ class TestOpenBMCComplete:
         print("\nСравнение показаний:")
         print("-" * 60)
         
-        for redfish_sensor, redfish_temp in redfish_temps.items():
-            # Ищем соответствующий датчик в IPMI
-            best_match = None
-            best_match_name = None
-            best_similarity = 0
+        # Каждому датчику Redfish - не больше одного датчика IPMI (оптимальное сопоставление)
+        for match in match_sensors(redfish_sensors, ipmi_sensors):
+            compared_sensors += 1
+            redfish_temp = match.left.reading
+            ipmi_temp = match.right.reading
+            difference = abs(redfish_temp - ipmi_temp)
             
-            for ipmi_sensor, ipmi_temp in ipmi_temps.items():
-                # Вычисляем схожесть имен датчиков
-                similarity = self._calculate_similarity(redfish_sensor.lower(), ipmi_sensor.lower())
-                if similarity > best_similarity and similarity > 0.3:  # Порог схожести
-                    best_similarity = similarity
-                    best_match = ipmi_temp
-                    best_match_name = ipmi_sensor
+            if difference <= tolerance:
+                matching_sensors += 1
+                status = "✓ СОВПАДАЕТ"
+            else:
+                status = "✗ РАСХОЖДЕНИЕ"
             
-            if best_match is not None:
-                compared_sensors += 1
-                difference = abs(redfish_temp - best_match)
-                
-                if difference <= tolerance:
-                    matching_sensors += 1
-                    status = "✓ СОВПАДАЕТ"
-                else:
-                    status = "✗ РАСХОЖДЕНИЕ"
-                
-                print(f"  {redfish_sensor:30} | Redfish: {redfish_temp:6.1f}°C | "
-                      f"IPMI: {best_match:6.1f}°C | Разница: {difference:5.1f}°C | {status}")
+            print(f"  {match.left.name:30} | Redfish: {redfish_temp:6.1f}°C | "
+                  f"IPMI ({match.right.name}): {ipmi_temp:6.1f}°C | Разница: {difference:5.1f}°C | {status}")
         
         print("-" * 60)
         
@@ -531,19 +527,7 @@ class TestOpenBMCComplete:
         
         print("✓ Показания Redfish и IPMI в основном совпадают")
     
-    def _calculate_similarity(self, str1, str2):
-        """Вычисляет схожесть между двумя строками"""
-        # Простой алгоритм схожести - можно улучшить
-        words1 = set(str1.split())
-        words2 = set(str2.split())
-        
-        if not words1 or not words2:
-            return 0
-        
-        common_words = words1.intersection(words2)
-        similarity = len(common_words) / max(len(words1), len(words2))
-        return similarity
-    
+    @pytest.mark.readonly
     def test_08_redfish_service_root(self, session, base_url):
         """
         Дополнительный тест: проверка корневого endpoint Redfish
@@ -576,3 +560,228 @@ class TestOpenBMCComplete:
         assert available_endpoints >= 2, f"Слишком мало endpoints доступно: {available_endpoints}"
         
         print(f"✓ Корневой endpoint Redfish корректен, доступно {available_endpoints}/4 основных endpoints")
+
+    @pytest.mark.readonly
+    @pytest.mark.load
+    def test_09_concurrent_async_reads(self, base_url, credentials, latency, record_property):
+        """
+        Дополнительный тест: одновременные чтения через асинхронный клиент
+        ○ Открыть одну сессию и отправить пачку параллельных GET по основным ресурсам.
+        ○ Убедиться, что все ответы успешны и данные согласованы между собой.
+        """
+        print("\n=== Тест параллельных запросов (async) ===")
+
+        concurrency = int(os.getenv('OPENBMC_ASYNC_CONCURRENCY', '20'))
+
+        async def run():
+            async with AsyncRedfishClient(base_url, credentials['username'], credentials['password'],
+                                          per_host_concurrency=concurrency, latency=latency) as client:
+                started = time.perf_counter()
+                results = await asyncio.gather(*(
+                    coro for _ in range(concurrency // 4 or 1)
+                    for coro in (client.get_service_root(), client.get_system(),
+                                 client.get_thermal(), client.get_manager())
+                ), return_exceptions=True)
+                return results, time.perf_counter() - started
+
+        results, elapsed = asyncio.run(run())
+
+        errors = [r for r in results if isinstance(r, Exception)]
+        assert not errors, f"Ошибки при параллельных запросах: {errors[:3]}"
+
+        systems = [r for r in results if r.get('@odata.type', '').startswith('#ComputerSystem.')]
+        assert systems, "Нет ответов ComputerSystem"
+        assert len({s.get('Id') for s in systems}) == 1, "Разные ответы ComputerSystem на одинаковые запросы"
+
+        record_property("async_requests", len(results))
+        record_property("async_elapsed_s", round(elapsed, 3))
+        print(f"✓ {len(results)} параллельных запросов за {elapsed:.3f} с")
+
+    @pytest.mark.readonly
+    @pytest.mark.load
+    def test_10_redfish_tree_crawl(self, base_url, credentials, latency, record_property):
+        """
+        Дополнительный тест: обход всего дерева Redfish от Service Root
+        ○ Пройти по всем ссылкам @odata.id (с $expand, если BMC его поддерживает).
+        ○ Убедиться, что все ресурсы отвечают и основные коллекции найдены.
+        """
+        print("\n=== Тест обхода дерева Redfish ===")
+
+        result = asyncio.run(redfish_crawler.crawl(base_url, credentials['username'], credentials['password'],
+                                                   latency=latency))
+
+        print(f"Ресурсов: {len(result.resources)}, запросов: {result.requests}, "
+              f"$expand: {result.expand or 'нет'}, время: {result.elapsed:.3f} с")
+        for path, seconds in result.slowest(3):
+            print(f"  {seconds * 1000:.1f} мс  {path}")
+
+        assert not result.errors, f"Ресурсы с ошибками: {result.errors}"
+        for collection in ('/redfish/v1/Systems', '/redfish/v1/Chassis', '/redfish/v1/Managers'):
+            assert collection in result.resources, f"Коллекция {collection} не найдена при обходе"
+        for path, body in result.resources.items():
+            odata_id = redfish_crawler.resource_id(body.get('@odata.id', path))
+            assert odata_id == path, f"@odata.id {odata_id} не совпадает с адресом {path}"
+
+        record_property("crawl_resources", len(result.resources))
+        record_property("crawl_requests", result.requests)
+        record_property("crawl_elapsed_s", round(result.elapsed, 3))
+        print("✓ Дерево Redfish обойдено без ошибок")
+
+    @pytest.mark.readonly
+    @pytest.mark.load
+    def test_11_thermal_under_load(self, session, base_url, credentials, record_property):
+        """
+        Дополнительный тест: температура и питание под нагрузкой на Redfish
+        ○ Снимать показания датчиков с заданным интервалом, пока идет параллельная нагрузка.
+        ○ Проверить, что ни один датчик не выходил за верхний критический порог.
+        """
+        print("\n=== Тест температуры под нагрузкой ===")
+
+        duration = float(os.getenv('OPENBMC_SAMPLE_DURATION', '2'))
+        interval = float(os.getenv('OPENBMC_SAMPLE_INTERVAL', '0.25'))
+
+        sampler = ThermalSampler(session, interval=interval)
+        with sampler:
+            load, elapsed = asyncio.run(run_load(
+                base_url, credentials['username'], credentials['password'],
+                ['/redfish/v1/Systems/system', '/redfish/v1/Chassis/chassis/Thermal'],
+                concurrency=10, duration=duration))
+        summary = sampler.summary()
+
+        requests_sent = sum(row['requests'] for row in load.values())
+        print(f"Источник телеметрии: {sampler.source}, отсчетов: {sampler.store.rows}, "
+              f"запросов нагрузки: {requests_sent} за {elapsed:.1f} с")
+        print_summary(summary)
+
+        assert sampler.store.rows > 0, "Не получено ни одного отсчета телеметрии"
+        temperatures = [name for name, row in summary.items() if row['kind'] == 'temperature']
+        assert temperatures, "В телеметрии нет датчиков температуры"
+        # Тот же движок порогов, что и в test_05, но по всему ряду отсчетов
+        verdicts = sampler.verdicts(thermal_limits)
+        crossed = [v.name for v in verdicts if v.status in ('critical', 'fatal')]
+        assert not crossed, f"Датчики выходили за критический порог под нагрузкой: {crossed}"
+
+        record_property("telemetry_samples", sampler.store.rows)
+        record_property("telemetry_source", sampler.source)
+        print("✓ Под нагрузкой датчики в пределах критических порогов")
+
+    @pytest.mark.readonly
+    @pytest.mark.load
+    def test_12_capture_and_replay(self, base_url, credentials, tmp_path, record_property):
+        """
+        Дополнительный тест: запись трафика и его воспроизведение
+        ○ Записать вход и серию GET через клиент с capture и проверить поля записей.
+        ○ Воспроизвести запись без пауз и убедиться, что все запросы успешны.
+        """
+        print("\n=== Тест записи и воспроизведения трафика ===")
+
+        paths = ['/redfish/v1/', '/redfish/v1/Systems/system', '/redfish/v1/Chassis/chassis/Thermal',
+                 '/redfish/v1/Managers/bmc']
+        capture_path = tmp_path / "capture.jsonl"
+        with CaptureWriter(str(capture_path)) as capture:
+            client = RedfishClient(base_url, credentials['username'], credentials['password'],
+                                   pool_size=2, capture=capture)
+            client.login()
+            try:
+                for path in paths * 3:
+                    assert client.get(path).status_code == 200, f"{path} недоступен"
+            finally:
+                client.close()
+
+        records = list(read_capture(capture_path))
+        login, records = records[0], records[1:]
+        assert login['method'] == 'POST' and login['status'] in (200, 201), f"Вход не записан: {login}"
+        assert login['body']['Password'] == '***', "Пароль попал в запись трафика"
+        assert len(records) == len(paths) * 3, f"Записано {len(records)} запросов вместо {len(paths) * 3}"
+        for record in records:
+            assert record['status'] == 200 and record['size'] > 0, f"Некорректная запись: {record}"
+            assert record['elapsed_ms'] >= 0 and record['path'].startswith('/redfish/v1')
+
+        async def run():
+            async with AsyncRedfishClient(base_url, credentials['username'], credentials['password']) as client:
+                return await replay(read_capture(capture_path), client, speed=0, concurrency=4)
+
+        stats, elapsed, info = asyncio.run(run())
+        summary = stats.summary(elapsed)
+        # Вход (POST) без include_writes не повторяется
+        assert info['sent'] == len(records) and info['skipped'] == 1, \
+            f"Воспроизведено {info['sent']} из {len(records)}"
+        errors = {endpoint: row['errors'] for endpoint, row in summary.items() if row['errors']}
+        assert not errors, f"Ошибки при воспроизведении: {errors}"
+
+        record_property("replay_requests", info['sent'])
+        record_property("replay_elapsed_s", round(elapsed, 3))
+        print(f"✓ {info['sent']} запросов записано и воспроизведено за {elapsed:.3f} с")
+
+    @pytest.mark.readonly
+    @pytest.mark.load
+    def test_13_open_loop_arrival_rate(self, base_url, credentials, record_property):
+        """
+        Дополнительный тест: нагрузка с постоянной интенсивностью (открытый цикл)
+        ○ Отправлять запросы по расписанию с заданной интенсивностью, не дожидаясь ответов.
+        ○ Убедиться, что расписание выдержано, ответы успешны, а задержка от планового
+          времени отправки не меньше времени обслуживания.
+        """
+        print("\n=== Тест нагрузки с постоянной интенсивностью ===")
+
+        rate = float(os.getenv('OPENBMC_OPEN_LOOP_RATE', '40'))
+        duration = float(os.getenv('OPENBMC_OPEN_LOOP_DURATION', '1.5'))
+
+        summary, service, info, elapsed = asyncio.run(run_open_loop(
+            base_url, credentials['username'], credentials['password'],
+            ['/redfish/v1/Systems/system', '/redfish/v1/Chassis/chassis/Thermal'],
+            rate=rate, duration=duration, connections=10))
+
+        assert info['scheduled'] == round(rate * duration), \
+            f"Запланировано {info['scheduled']} запросов вместо {round(rate * duration)}"
+        assert not info['dropped'], f"Отброшено запросов: {info['dropped']}"
+        errors = {endpoint: row['errors'] for endpoint, row in summary.items() if row['errors']}
+        assert not errors, f"Ошибки при нагрузке: {errors}"
+        for endpoint, row in summary.items():
+            assert row['p50_ms'] >= service[endpoint]['p50_ms'], \
+                f"{endpoint}: задержка от плана меньше времени обслуживания"
+
+        record_property("open_loop_requests", info['scheduled'])
+        record_property("open_loop_max_lag_ms", round(info['max_lag_ms'], 1))
+        print(f"✓ {info['scheduled']} запросов с интенсивностью {rate:g}/с за {elapsed:.2f} с, "
+              f"макс. опоздание генератора {info['max_lag_ms']:.1f} мс")
+
+    @pytest.mark.mutates_power
+    def test_14_reset_latency_distribution(self, session, base_url, record_property):
+        """
+        Дополнительный тест: задержки ComputerSystem.Reset
+        ○ Выполнить несколько циклов ForceOff и ForceOn с замером фаз от отправки POST.
+        ○ Убедиться, что все циклы завершились и фазы идут по порядку:
+          ответ на POST, смена PowerState, Status.State Enabled.
+        """
+        print("\n=== Тест задержек ComputerSystem.Reset ===")
+
+        # Хост перезагружается несколько раз - только по явному запросу
+        cycles = int(os.getenv('OPENBMC_RESET_CYCLES', '0'))
+        if cycles <= 0:
+            pytest.skip("OPENBMC_RESET_CYCLES не задан, замер задержек сброса пропущен")
+        bench = ResetBenchmark(session, system_path=f"{base_url}/redfish/v1/Systems/system", timeout=120)
+        initial, _ = bench.observe()
+        try:
+            rows = bench.run(['ForceOff', 'ForceOn'], cycles)
+        finally:
+            if initial in ('On', 'Off') and bench.observe()[0] != initial:
+                bench.cycle('ForceOn' if initial == 'On' else 'ForceOff')
+
+        failed = [f"{row['reset_type']} #{row['cycle']}: {row['error']}" for row in rows if not row['ok']]
+        assert not failed, f"Циклы сброса не завершились: {failed}"
+        for row in rows:
+            assert row['status'] in ACCEPTED_STATUSES, \
+                f"{row['reset_type']}: ответ {row['status']} вместо {'/'.join(map(str, ACCEPTED_STATUSES))}"
+            assert row['accepted_s'] <= row['power_state_s'], f"{row['reset_type']}: фазы не по порядку"
+        for row in rows:
+            if row['reset_type'] == 'ForceOn':
+                assert row['power_state_s'] <= row['enabled_s'], "Status.State Enabled раньше смены PowerState"
+
+        summary = summarize(rows)
+        for reset_type, result in summary.items():
+            for phase in ('accepted_s', 'power_state_s', 'enabled_s'):
+                if phase in result:
+                    record_property(f"reset_{reset_type}_{phase[:-2]}_p50_s", round(result[phase]['p50_s'], 3))
+        print(f"✓ {len(rows)} циклов сброса, PowerState: " + ", ".join(
+            f"{reset_type} p50 {result['power_state_s']['p50_s']:.2f} с" for reset_type, result in summary.items()))
@@ -3,14 +3,16 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-import time
 
-def find_openbmc_web_interface():
-    test_urls = ["https://localhost:2443"]
+import pytest
+
+from webui_waits import UIWaits
+
+WEBUI_USERNAME = "root"
+WEBUI_PASSWORD = "0penBmc"
 
+def create_driver():
     options = Options()
     options.binary_location = '/usr/bin/chromium-browser'
     options.add_argument('--no-sandbox')
@@ -21,12 +23,15 @@ def find_openbmc_web_interface():
     options.add_argument('--disable-web-security')
 
     service = Service('/usr/bin/chromedriver')
-    driver = webdriver.Chrome(service=service, options=options)
+    return webdriver.Chrome(service=service, options=options)
+
+def find_openbmc_web_interface(driver, waits):
+    test_urls = ["https://localhost:2443"]
 
     for url in test_urls:
         try:
             driver.get(url)
-            time.sleep(3)
+            waits.network_idle()
 
             page_title = driver.title.lower()
             page_source = driver.page_source.lower()
@@ -40,13 +45,12 @@ def find_openbmc_web_interface():
                                 if indicator in page_source or indicator in page_title]
 
             if found_indicators:
-                return url, driver
+                return url
 
         except Exception as e:
             print(f"Ошибка: {str(e)[:100]}")
 
-    driver.quit()
-    return None, None
+    return None
 
 def find_login_button(driver):
     login_selectors = [
@@ -73,41 +77,122 @@ def find_login_button(driver):
 
     raise NoSuchElementException("Не найдена кнопка логина")
 
-def test_correct_login():
-    print("Тест успешной авторизации")
-
-    url, driver = find_openbmc_web_interface()
-    assert url is not None, "Веб-интерфейс OpenBMC не найден"
+def submit_login(driver, username, password):
+    username_field = driver.find_element(By.CSS_SELECTOR, "#username")
+    password_field = driver.find_element(By.CSS_SELECTOR, "#password")
+    login_button = find_login_button(driver)
+
+    username_field.clear()
+    username_field.send_keys(username)
+    password_field.clear()
+    password_field.send_keys(password)
+    login_button.click()
+
+class WebUISession:
+    """
+    Один браузер на все тесты WebUI.
+    После входа сохраняет cookies и localStorage/sessionStorage, чтобы вернуть
+    авторизованное состояние после тестов, которым нужна чистая страница логина.
+    """
+
+    STORAGES = ("localStorage", "sessionStorage")
+
+    def __init__(self, url, driver):
+        self.url = url
+        self.driver = driver
+        self.authenticated = False
+        self.login_url = None
+        self.login_title = None
+        self.login_seconds = None
+        self.waits = UIWaits(driver)
+        self._state = None
+
+    def login(self):
+        submit_login(self.driver, WEBUI_USERNAME, WEBUI_PASSWORD)
+        self.waits.url_left_login(timeout=15)
+        self.login_seconds = self.waits.timings[-1][1]
+
+        self.login_url = self.driver.current_url.lower()
+        self.login_title = self.driver.title.lower()
+        self.authenticated = "login" not in self.login_url
+        if self.authenticated:
+            self._state = self.save_state()
+
+    def save_state(self):
+        storage = {name: self.driver.execute_script(
+            f"return Object.assign({{}}, window.{name});") for name in self.STORAGES}
+        return {"cookies": self.driver.get_cookies(), "storage": storage}
+
+    def clear_state(self):
+        """Новый анонимный контекст: без cookies и storage, на странице логина"""
+        self.driver.delete_all_cookies()
+        for name in self.STORAGES:
+            self.driver.execute_script(f"window.{name}.clear();")
+        self.driver.get(self.url)
+        self.waits.element_present((By.CSS_SELECTOR, "#username"))
+
+    def restore_state(self):
+        """Возвращает авторизованное состояние, сохраненное после входа"""
+        if self._state is None:
+            return
+        self.driver.get(self.url)
+        self.driver.delete_all_cookies()
+        for cookie in self._state["cookies"]:
+            cookie.pop("sameSite", None)
+            self.driver.add_cookie(cookie)
+        for name, items in self._state["storage"].items():
+            for key, value in items.items():
+                self.driver.execute_script(f"window.{name}.setItem(arguments[0], arguments[1]);", key, value)
+        self.driver.get(self.url)
+
+@pytest.fixture(scope="session")
+def webui_session():
+    """Запускает Chromium один раз и один раз входит в WebUI"""
+    driver = create_driver()
+    url = find_openbmc_web_interface(driver, UIWaits(driver))
+    if url is None:
+        driver.quit()
+        pytest.fail("Веб-интерфейс OpenBMC не найден")
 
+    session = WebUISession(url, driver)
     try:
-        username_field = driver.find_element(By.CSS_SELECTOR, "#username")
-        password_field = driver.find_element(By.CSS_SELECTOR, "#password")
-        login_button = find_login_button(driver)
-
-        username_field.clear()
-        username_field.send_keys("root")
-        password_field.clear()
-        password_field.send_keys("0penBmc")
-        login_button.click()
+        session.login()
+        yield session
+    finally:
+        driver.quit()
 
-        time.sleep(5)
+@pytest.fixture
+def waits(webui_session, record_property):
+    """Ожидания UI текущего теста; фактическая длительность каждого попадает в JUnit-свойства"""
+    ui_waits = webui_session.waits
+    ui_waits.timings.clear()
+    yield ui_waits
+    for name, seconds, ok in ui_waits.timings:
+        record_property(f"ui_wait_{name}", f"{seconds:.3f}" if ok else f"timeout:{seconds:.3f}")
+    record_property("ui_wait_total_s", round(ui_waits.total(), 3))
+
+@pytest.fixture
+def login_page(webui_session, waits):
+    """Чистый контекст для негативных тестов логина; авторизация восстанавливается после теста"""
+    webui_session.clear_state()
+    yield webui_session.url, webui_session.driver
+    webui_session.restore_state()
+
+def test_correct_login(webui_session, record_property):
+    print("Тест успешной авторизации")
 
-        current_url = driver.current_url.lower()
-        page_title = driver.title.lower()
+    # Вход выполняется один раз в фикстуре webui_session, здесь проверяем его результат
+    current_url = webui_session.login_url
+    page_title = webui_session.login_title
+    record_property("ui_login_s", round(webui_session.login_seconds, 3))
 
-        assert "login" not in current_url, f"Остались на странице логина: {current_url}"
-        assert "login" not in page_title, f"Заголовок содержит login: {page_title}"
+    assert "login" not in current_url, f"Остались на странице логина: {current_url}"
+    assert "login" not in page_title, f"Заголовок содержит login: {page_title}"
 
-    except Exception as e:
-        raise e
-    finally:
-        driver.quit()
-
-def test_wrong_username():
+def test_wrong_username(login_page, waits):
     print("Тест авторизации с неверным именем пользователя")
 
-    url, driver = find_openbmc_web_interface()
-    assert url is not None, "Веб-интерфейс OpenBMC не найден"
+    url, driver = login_page
 
     try:
         username_field = driver.find_element(By.CSS_SELECTOR, "#username")
@@ -120,7 +205,7 @@ def test_wrong_username():
         password_field.send_keys("0penBmc")
         login_button.click()
 
-        time.sleep(3)
+        waits.network_idle()
 
         current_url = driver.current_url.lower()
         
@@ -129,14 +214,11 @@ def test_wrong_username():
 
     except Exception as e:
         raise e
-    finally:
-        driver.quit()
 
-def test_wrong_password():
+def test_wrong_password(login_page, waits):
     print("Тест авторизации с неверным паролем")
 
-    url, driver = find_openbmc_web_interface()
-    assert url is not None, "Веб-интерфейс OpenBMC не найден"
+    url, driver = login_page
 
     try:
         username_field = driver.find_element(By.CSS_SELECTOR, "#username")
@@ -149,7 +231,7 @@ def test_wrong_password():
         password_field.send_keys("wrong_password")
         login_button.click()
 
-        time.sleep(3)
+        waits.network_idle()
 
         current_url = driver.current_url.lower()
 
@@ -157,21 +239,18 @@ def test_wrong_password():
 
     except Exception as e:
         raise e
-    finally:
-        driver.quit()
 
-def test_account_lockout():
+def test_account_lockout(login_page, waits):
     print("Тест проверки поведения при множественных неудачных попытках")
 
-    url, driver = find_openbmc_web_interface()
-    assert url is not None, "Веб-интерфейс OpenBMC не найден"
+    url, driver = login_page
 
     try:
 
         for attempt in range(3):
             try:
                 driver.refresh()
-                time.sleep(1)
+                waits.element_present((By.CSS_SELECTOR, "#username"))
                 username_field = driver.find_element(By.CSS_SELECTOR, "#username")
                 password_field = driver.find_element(By.CSS_SELECTOR, "#password")
                 login_button = find_login_button(driver)
@@ -181,12 +260,12 @@ def test_account_lockout():
                 password_field.clear()
                 password_field.send_keys(f"vou_{attempt}")
                 login_button.click()
-                time.sleep(2)
+                waits.network_idle()
             except:
                 continue
 
         driver.refresh()
-        time.sleep(2)
+        waits.element_present((By.CSS_SELECTOR, "#username"))
         username_field = driver.find_element(By.CSS_SELECTOR, "#username")
         password_field = driver.find_element(By.CSS_SELECTOR, "#password")
         login_button = find_login_button(driver)
@@ -196,32 +275,17 @@ def test_account_lockout():
         password_field.clear()
         password_field.send_keys("0penBmc")
         login_button.click()
-        time.sleep(5)
+        waits.url_left_login(timeout=15)
     except Exception as e:
         print(f"exception {e}")
-    finally:
-        driver.quit()
 
-def test_power_management():
+def test_power_management(webui_session, waits):
     print("Тест управления питанием сервера через WebUI")
 
-    url, driver = find_openbmc_web_interface()
-    assert url is not None, "Веб-интерфейс OpenBMC не найден"
+    url, driver = webui_session.url, webui_session.driver
 
     try:
-        username_field = driver.find_element(By.CSS_SELECTOR, "#username")
-        password_field = driver.find_element(By.CSS_SELECTOR, "#password")
-        login_button = find_login_button(driver)
-
-        username_field.clear()
-        username_field.send_keys("root")
-        password_field.clear()
-        password_field.send_keys("0penBmc")
-        login_button.click()
-        time.sleep(5)
-
-        current_url = driver.current_url.lower()
-        assert "login" not in current_url, "Не удалось войти в систему"
+        assert webui_session.authenticated, "Не удалось войти в систему"
 
         power_management_found = False
         power_urls = [
@@ -234,11 +298,8 @@ def test_power_management():
             try:
                 full_url = url + power_url
                 driver.get(full_url)
-                time.sleep(3)
-
-                page_source = driver.page_source.lower()
 
-                if any(indicator in page_source for indicator in ["power", "reset", "shutdown", "reboot"]):
+                if waits.text_present(["power", "reset", "shutdown", "reboot"], timeout=5):
                     power_management_found = True
                     break
 
@@ -249,30 +310,15 @@ def test_power_management():
 
     except Exception as e:
         raise e
-    finally:
-        driver.quit()
 
-def test_redfish_api_access():
+def test_redfish_api_access(webui_session, waits):
     print("Тест доступа к Redfish API через WebUI")
     
 
-    url, driver = find_openbmc_web_interface()
-    assert url is not None, "Веб-интерфейс OpenBMC не найден"
+    url, driver = webui_session.url, webui_session.driver
 
     try:
-        username_field = driver.find_element(By.CSS_SELECTOR, "#username")
-        password_field = driver.find_element(By.CSS_SELECTOR, "#password")
-        login_button = find_login_button(driver)
-
-        username_field.clear()
-        username_field.send_keys("root")
-        password_field.clear()
-        password_field.send_keys("0penBmc")
-        login_button.click()
-        time.sleep(5)
-
-        current_url = driver.current_url.lower()
-        assert "login" not in current_url, "Не удалось войти в систему"
+        assert webui_session.authenticated, "Не удалось войти в систему"
 
         redfish_found = False
         redfish_urls = [
@@ -285,11 +331,8 @@ def test_redfish_api_access():
             try:
                 full_url = url + redfish_url
                 driver.get(full_url)
-                time.sleep(3)
-
-                page_source = driver.page_source.lower()
 
-                if any(indicator in page_source for indicator in ["redfish", "odata", "json", "api"]):
+                if waits.text_present(["redfish", "odata", "json", "api"], timeout=5):
                     redfish_found = True
                     break
 
@@ -300,29 +343,14 @@ def test_redfish_api_access():
 
     except Exception as e:
         raise e
-    finally:
-        driver.quit()
 
-def test_temperature_monitoring():
+def test_temperature_monitoring(webui_session, waits):
     print("Тест мониторинга температуры")
 
-    url, driver = find_openbmc_web_interface()
-    assert url is not None, "Веб-интерфейс OpenBMC не найден"
+    url, driver = webui_session.url, webui_session.driver
 
     try:
-        username_field = driver.find_element(By.CSS_SELECTOR, "#username")
-        password_field = driver.find_element(By.CSS_SELECTOR, "#password")
-        login_button = find_login_button(driver)
-
-        username_field.clear()
-        username_field.send_keys("root")
-        password_field.clear()
-        password_field.send_keys("0penBmc")
-        login_button.click()
-        time.sleep(5)
-
-        current_url = driver.current_url.lower()
-        assert "login" not in current_url, "Не удалось войти в систему"
+        assert webui_session.authenticated, "Не удалось войти в систему"
 
         temperature_found = False
         temperature_urls = [
@@ -335,11 +363,8 @@ def test_temperature_monitoring():
             try:
                 full_url = url + temp_url
                 driver.get(full_url)
-                time.sleep(3)
 
-                page_source = driver.page_source.lower()
-
-                if any(indicator in page_source for indicator in ["temperature", "thermal", "sensor"]):
+                if waits.text_present(["temperature", "thermal", "sensor"], timeout=5):
                     temperature_found = True
                     break
 
@@ -350,29 +375,14 @@ def test_temperature_monitoring():
 
     except Exception as e:
         raise e
-    finally:
-        driver.quit()
 
-def test_inventory_display():
+def test_inventory_display(webui_session, waits):
     print("Тест отображения инвенторика в Web UI")
 
-    url, driver = find_openbmc_web_interface()
-    assert url is not None, "Веб-интерфейс OpenBMC не найден"
+    url, driver = webui_session.url, webui_session.driver
 
     try:
-        username_field = driver.find_element(By.CSS_SELECTOR, "#username")
-        password_field = driver.find_element(By.CSS_SELECTOR, "#password")
-        login_button = find_login_button(driver)
-
-        username_field.clear()
-        username_field.send_keys("root")
-        password_field.clear()
-        password_field.send_keys("0penBmc")
-        login_button.click()
-        time.sleep(5)
-
-        current_url = driver.current_url.lower()
-        assert "login" not in current_url, "Не удалось войти в систему"
+        assert webui_session.authenticated, "Не удалось войти в систему"
 
         inventory_indicators = [
             "//*[contains(text(), 'Inventory')]",
@@ -388,14 +398,13 @@ def test_inventory_display():
         inventory_found = False
         for indicator in inventory_indicators:
             try:
-                inventory_element = WebDriverWait(driver, 5).until(
-                    EC.presence_of_element_located((By.XPATH, indicator)))
+                inventory_element = waits.element_present((By.XPATH, indicator), timeout=5)
                 print(f"Найден элемент инвентори: {inventory_element.text}")
                 inventory_found = True
 
                 try:
                     inventory_element.click()
-                    time.sleep(2)
+                    waits.network_idle()
                     print("Успешный переход к инвентори")
                     break
                 except:
@@ -416,11 +425,8 @@ def test_inventory_display():
                 try:
                     full_url = url + inventory_url
                     driver.get(full_url)
-                    time.sleep(3)
-
-                    page_source = driver.page_source.lower()
 
-                    if any(indicator in page_source for indicator in ["cpu", "processor", "memory", "ram"]):
+                    if waits.text_present(["cpu", "processor", "memory", "ram"], timeout=5):
                         inventory_found = True
                         break
 
@@ -432,30 +438,7 @@ def test_inventory_display():
     except Exception as e:
         print(f" Отображение инвентори: ОШИБКА - {e}")
         raise e
-    finally:
-        driver.quit()
 
 if __name__ == "__main__":
-    test_functions = [
-        test_correct_login,
-        test_wrong_username,
-        test_wrong_password,
-        test_account_lockout,
-        test_power_management,
-        test_redfish_api_access,
-        test_temperature_monitoring,
-        test_inventory_display
-    ]
-
-    passed_count = 0
-    total_count = len(test_functions)
-
-    for test_func in test_functions:
-        try:
-            test_func()
-            print(f" {test_func.__name__} - PASSED")
-            passed_count += 1
-        except Exception as e:
-            print(f" {test_func.__name__} - FAILED: {e}")
-
-    print(f"Результат: {passed_count}/{total_count} тестов пройдено")
\ No newline at end of file
+    # Фикстуры (общий браузер и сессия WebUI) работают только под pytest
+    raise SystemExit(pytest.main([__file__, "-v"]))
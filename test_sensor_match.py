@@ -0,0 +1,22 @@
+"""
+Модульные тесты сопоставления датчиков (sensor_match.py); BMC не нужен.
+
+    python -m pytest test_sensor_match.py
+"""
+from sensor_match import Sensor, match_sensors
+
+
+def test_numeric_order():
+    """CPU1 Core2 и CPU2 Core1 сопоставляются каждый со своим датчиком, а не накрест"""
+    redfish_sensors = [Sensor('CPU1 Core2 Temp', 40.0), Sensor('CPU2 Core1 Temp', 80.0)]
+    ipmi_sensors = [Sensor('CPU2_Core1_Temp', 80.5), Sensor('CPU1_Core2_Temp', 40.5)]
+    pairs = {match.left.name: match.right.name for match in match_sensors(redfish_sensors, ipmi_sensors)}
+    assert pairs == {'CPU1 Core2 Temp': 'CPU1_Core2_Temp', 'CPU2 Core1 Temp': 'CPU2_Core1_Temp'}, \
+        f"Датчики сопоставлены накрест: {pairs}"
+
+
+def test_common_tokens_only():
+    """Датчик, имя которого состоит только из частых токенов, все равно получает кандидатов"""
+    ipmi_sensors = [Sensor(f'Temp {i}') for i in range(60)] + [Sensor('TEMP')]
+    matches = match_sensors([Sensor('Temp')], ipmi_sensors)
+    assert [match.right.name for match in matches] == ['TEMP'], "Датчик из частых токенов остался без пары"
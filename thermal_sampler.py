@@ -0,0 +1,414 @@
+"""
+Сбор телеметрии датчиков температуры и питания во времени.
+
+Источник - TelemetryService MetricReports, если BMC их публикует, иначе опрос
+ресурсов Chassis Thermal/Power с заданным интервалом. Показания хранятся по
+столбцам: матрица время x датчик (NumPy, float32, NaN - нет показания),
+которая сбрасывается блоками по chunk_rows строк в .npz-файлы каталога.
+Статистика (min/max/mean/p99, выходы за пороги, время выше порога)
+считается векторно по всей матрице сразу.
+
+    python thermal_sampler.py --url https://bmc:2443 --interval 0.5 --duration 300 \\
+        --output reports/telemetry
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import threading
+import time
+import warnings
+from datetime import datetime
+
+import numpy as np
+
+from redfish_client import RedfishClient
+from thresholds import LimitsTable, evaluate
+
+SERVICE_ROOT = '/redfish/v1/'
+THERMAL_PATH = '/redfish/v1/Chassis/{chassis}/Thermal'
+POWER_PATH = '/redfish/v1/Chassis/{chassis}/Power'
+
+# Массив ресурса -> (вид датчика, свойство показания, единицы)
+READING_PROPERTIES = {
+    'Temperatures': ('temperature', 'ReadingCelsius', 'Cel'),
+    'Fans': ('fan', 'Reading', 'RPM'),
+    'PowerControl': ('power', 'PowerConsumedWatts', 'W'),
+    'Voltages': ('voltage', 'ReadingVolts', 'V'),
+}
+THRESHOLD_PROPERTIES = ('UpperThresholdCritical', 'UpperThresholdFatal',
+                        'LowerThresholdCritical', 'LowerThresholdFatal')
+
+
+class SensorInfo:
+    """Описание датчика: вид, единицы, PhysicalContext и пороги из Redfish"""
+
+    def __init__(self, name, kind, unit, context=None, thresholds=None, source_id=None):
+        self.name = name
+        self.kind = kind
+        self.unit = unit
+        self.context = context
+        self.thresholds = thresholds or {}
+        self.source_id = source_id
+
+    def to_dict(self):
+        return {'name': self.name, 'kind': self.kind, 'unit': self.unit, 'context': self.context,
+                'thresholds': self.thresholds, 'source_id': self.source_id}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+def sensor_readings(resource):
+    """(SensorInfo, показание) для всех датчиков ресурса Thermal или Power"""
+    readings = []
+    for collection, (kind, prop, unit) in READING_PROPERTIES.items():
+        for member in resource.get(collection, ()):
+            name = member.get('Name') or member.get('MemberId')
+            if not name:
+                continue
+            thresholds = {key: member[key] for key in THRESHOLD_PROPERTIES if member.get(key) is not None}
+            unit = member.get('ReadingUnits', unit)
+            info = SensorInfo(name, kind, unit, member.get('PhysicalContext'), thresholds,
+                              member.get('@odata.id'))
+            readings.append((info, member.get(prop)))
+    return readings
+
+
+class TelemetryStore:
+    """
+    Столбцовое хранилище показаний. directory=None - блоки остаются в памяти,
+    иначе каждый блок пишется в chunk-NNNNNN.npz, а описание датчиков - в sensors.json.
+    """
+
+    def __init__(self, directory=None, chunk_rows=4096):
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.columns = []
+        self.index = {}
+        self.sensors = {}
+        self.rows = 0
+        self._chunks = []
+        self._timestamps = []
+        self._values = []
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def describe(self, info):
+        if info.name not in self.sensors:
+            self.sensors[info.name] = info
+
+    def append(self, timestamp, readings):
+        """Добавляет строку: timestamp (эпоха, с) и {имя датчика: значение}"""
+        with self._lock:
+            for name in readings:
+                if name not in self.index:
+                    self.index[name] = len(self.columns)
+                    self.columns.append(name)
+            row = np.full(len(self.columns), np.nan, dtype=np.float32)
+            for name, value in readings.items():
+                if value is not None:
+                    row[self.index[name]] = value
+            self._timestamps.append(timestamp)
+            self._values.append(row)
+            self.rows += 1
+            if len(self._timestamps) >= self.chunk_rows:
+                self._flush()
+
+    def _pending_arrays(self):
+        width = len(self.columns)
+        values = np.full((len(self._values), width), np.nan, dtype=np.float32)
+        for i, row in enumerate(self._values):
+            values[i, :len(row)] = row
+        return np.asarray(self._timestamps, dtype=np.float64), values
+
+    def _flush(self):
+        if not self._timestamps:
+            return
+        timestamps, values = self._pending_arrays()
+        columns = np.array(self.columns)
+        if self.directory:
+            path = os.path.join(self.directory, f"chunk-{len(self._chunks):06d}.npz")
+            np.savez(path, timestamps=timestamps, values=values, columns=columns)
+            self._chunks.append(path)
+        else:
+            self._chunks.append((timestamps, values, columns))
+        self._timestamps = []
+        self._values = []
+
+    def close(self):
+        with self._lock:
+            self._flush()
+        if self.directory:
+            with open(os.path.join(self.directory, 'sensors.json'), 'w', encoding='utf-8') as f:
+                json.dump([info.to_dict() for info in self.sensors.values()], f, indent=2, ensure_ascii=False)
+
+    def arrays(self):
+        """(timestamps[n], values[n, датчики], columns) по всем блокам, столбцы выровнены"""
+        with self._lock:
+            chunks = [self._load_chunk(chunk) for chunk in self._chunks]
+            if self._timestamps:
+                chunks.append(self._pending_arrays() + (np.array(self.columns),))
+            return self._concat(chunks, list(self.columns))
+
+    @staticmethod
+    def _load_chunk(chunk):
+        if isinstance(chunk, tuple):
+            return chunk
+        with np.load(chunk) as data:
+            return data['timestamps'], data['values'], data['columns']
+
+    @staticmethod
+    def _concat(chunks, columns):
+        if not chunks:
+            return np.empty(0), np.empty((0, len(columns)), dtype=np.float32), columns
+        # Столбцы добавляются только в конец, поэтому ранние блоки дополняются NaN справа
+        parts = []
+        for _, values, _ in chunks:
+            padded = np.full((values.shape[0], len(columns)), np.nan, dtype=np.float32)
+            padded[:, :values.shape[1]] = values
+            parts.append(padded)
+        return np.concatenate([chunk[0] for chunk in chunks]), np.concatenate(parts), columns
+
+    @classmethod
+    def load(cls, directory):
+        """Читает сохраненный каталог: (timestamps, values, columns, {имя: SensorInfo})"""
+        paths = sorted(glob.glob(os.path.join(directory, 'chunk-*.npz')))
+        chunks = [cls._load_chunk(path) for path in paths]
+        columns = [str(name) for name in chunks[-1][2]] if chunks else []
+        sensors = {}
+        meta_path = os.path.join(directory, 'sensors.json')
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding='utf-8') as f:
+                sensors = {item['name']: SensorInfo.from_dict(item) for item in json.load(f)}
+        return cls._concat(chunks, columns) + (sensors,)
+
+
+def summarize(timestamps, values, columns, sensors):
+    """
+    Векторная статистика по каждому датчику: min/max/mean/p99, число выходов
+    за верхний критический порог и суммарное время выше него.
+    """
+    if len(timestamps) == 0:
+        return {}
+    with warnings.catch_warnings():
+        # Датчик без единого показания дает NaN в статистике, а не предупреждение
+        warnings.simplefilter('ignore', RuntimeWarning)
+        minimum = np.nanmin(values, axis=0)
+        maximum = np.nanmax(values, axis=0)
+        mean = np.nanmean(values, axis=0)
+        p99 = np.nanpercentile(values, 99, axis=0)
+    count = np.sum(~np.isnan(values), axis=0)
+
+    critical = np.array([sensors[name].thresholds.get('UpperThresholdCritical', np.nan)
+                         if name in sensors else np.nan for name in columns], dtype=np.float32)
+    above = values > critical[np.newaxis, :]
+    # Выход за порог - переход из "ниже" в "выше" (первая строка выше порога тоже считается)
+    crossings = above[0].astype(int) + np.sum(above[1:] & ~above[:-1], axis=0)
+    # Время выше порога: длительность интервала до следующего отсчета
+    dt = np.diff(timestamps, append=timestamps[-1])
+    seconds_above = (above * dt[:, np.newaxis]).sum(axis=0)
+
+    result = {}
+    for i, name in enumerate(columns):
+        info = sensors.get(name)
+        result[name] = {
+            'kind': info.kind if info else None,
+            'unit': info.unit if info else None,
+            'samples': int(count[i]),
+            'min': float(minimum[i]),
+            'max': float(maximum[i]),
+            'mean': float(mean[i]),
+            'p99': float(p99[i]),
+            'upper_critical': None if np.isnan(critical[i]) else float(critical[i]),
+            'critical_crossings': int(crossings[i]),
+            'seconds_above_critical': float(seconds_above[i]),
+        }
+    return result
+
+
+def parse_timestamp(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+class ThermalSampler:
+    """
+    Снимает показания в store с интервалом interval (без накопления дрейфа).
+    source: 'auto' - MetricReports, если есть, иначе опрос; 'poll'; 'telemetry'.
+    """
+
+    def __init__(self, client, store=None, chassis='chassis', interval=1.0, source='auto'):
+        self.client = client
+        self.store = store if store is not None else TelemetryStore()
+        self.chassis = chassis
+        self.interval = interval
+        self.source = source
+        self.report_paths = []
+        self.errors = 0
+        self._by_source_id = {}
+        self._last_report_time = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _get(self, path):
+        response = self.client.get(path, max_age=0)
+        if response.status_code != 200:
+            return None
+        return response.json()
+
+    def _describe_sensors(self):
+        """Описания датчиков и порогов из Thermal/Power (нужны и для MetricReports)"""
+        resources = [self._get(path.format(chassis=self.chassis)) for path in (THERMAL_PATH, POWER_PATH)]
+        for resource in filter(None, resources):
+            for info, _ in sensor_readings(resource):
+                self.store.describe(info)
+                if info.source_id:
+                    self._by_source_id[info.source_id] = info
+        return resources
+
+    def _detect_source(self):
+        if self.source != 'poll':
+            root = self._get(SERVICE_ROOT) or {}
+            telemetry = root.get('TelemetryService', {}).get('@odata.id')
+            service = self._get(telemetry) if telemetry else None
+            reports = (service or {}).get('MetricReports', {}).get('@odata.id')
+            collection = self._get(reports) if reports else None
+            self.report_paths = [m['@odata.id'] for m in (collection or {}).get('Members', [])]
+        if self.report_paths:
+            self.source = 'telemetry'
+        elif self.source == 'telemetry':
+            raise RuntimeError("TelemetryService не публикует MetricReports")
+        else:
+            self.source = 'poll'
+
+    def prepare(self):
+        self._detect_source()
+        self._describe_sensors()
+
+    def sample_once(self):
+        if self.source == 'telemetry':
+            self._sample_reports()
+        else:
+            self._sample_resources()
+
+    def _sample_resources(self):
+        timestamp = time.time()
+        readings = {}
+        for resource in self._describe_sensors():
+            if resource is None:
+                self.errors += 1
+                continue
+            for info, value in sensor_readings(resource):
+                readings[info.name] = value
+        if readings:
+            self.store.append(timestamp, readings)
+
+    def _sample_reports(self):
+        for path in self.report_paths:
+            report = self._get(path)
+            if report is None:
+                self.errors += 1
+                continue
+            rows = {}
+            for value in report.get('MetricValues', []):
+                # MetricProperty: <@odata.id показания>/<свойство>
+                source_id = value.get('MetricProperty', '').rsplit('/', 1)[0]
+                info = self._by_source_id.get(source_id)
+                name = info.name if info else value.get('MetricId') or value.get('MetricProperty')
+                try:
+                    timestamp = parse_timestamp(value.get('Timestamp') or report['Timestamp'])
+                    reading = float(value['MetricValue'])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                rows.setdefault(timestamp, {})[name] = reading
+            last = self._last_report_time.get(path, float('-inf'))
+            for timestamp in sorted(t for t in rows if t > last):
+                self.store.append(timestamp, rows[timestamp])
+                self._last_report_time[path] = timestamp
+
+    def run(self, duration):
+        """Снимает показания duration секунд (или до stop())"""
+        self.prepare()
+        started = time.monotonic()
+        tick = 0
+        while not self._stop.is_set():
+            self.sample_once()
+            tick += 1
+            next_at = started + tick * self.interval
+            if next_at - started >= duration:
+                break
+            self._stop.wait(max(0.0, next_at - time.monotonic()))
+        self.store.close()
+
+    def start(self, duration=float('inf')):
+        self._thread = threading.Thread(target=self.run, args=(duration,), name='thermal-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def summary(self):
+        timestamps, values, columns = self.store.arrays()
+        return summarize(timestamps, values, columns, self.store.sensors)
+
+    def verdicts(self, table=None):
+        """Оценка всего ряда движком порогов (thresholds.py)"""
+        table = table or LimitsTable.from_file()
+        _, values, columns = self.store.arrays()
+        sensors = [self.store.sensors.get(name) or SensorInfo(name, None, None) for name in columns]
+        return evaluate(values, table.limits(sensors))
+
+
+def print_summary(summary):
+    print(f"{'Датчик':24} {'N':>6} {'min':>9} {'max':>9} {'p99':>9} {'крит.':>8} {'выходов':>8} {'выше, с':>8}")
+    for name, row in summary.items():
+        critical = '-' if row['upper_critical'] is None else f"{row['upper_critical']:g}"
+        print(f"{name:24} {row['samples']:6d} {row['min']:9.2f} {row['max']:9.2f} {row['p99']:9.2f} "
+              f"{critical:>8} {row['critical_crossings']:8d} {row['seconds_above_critical']:8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Сбор телеметрии температуры и питания')
+    parser.add_argument('--url', default=os.getenv('OPENBMC_URL', 'https://localhost:2443'))
+    parser.add_argument('--username', default=os.getenv('OPENBMC_USERNAME', 'root'))
+    parser.add_argument('--password', default=os.getenv('OPENBMC_PASSWORD', '0penBmc'))
+    parser.add_argument('--chassis', default='chassis')
+    parser.add_argument('--interval', type=float, default=1.0, help='Интервал опроса, с')
+    parser.add_argument('--duration', type=float, default=60, help='Длительность, с')
+    parser.add_argument('--source', choices=['auto', 'poll', 'telemetry'], default='auto')
+    parser.add_argument('--output', default='reports/telemetry', help='Каталог для .npz-блоков')
+    args = parser.parse_args()
+
+    client = RedfishClient(args.url, args.username, args.password)
+    client.login()
+    try:
+        sampler = ThermalSampler(client, TelemetryStore(args.output), args.chassis, args.interval, args.source)
+        sampler.run(args.duration)
+    finally:
+        client.close()
+
+    summary = sampler.summary()
+    with open(os.path.join(args.output, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    print(f"Источник: {sampler.source}, строк: {sampler.store.rows}, ошибок: {sampler.errors}")
+    print_summary(summary)
+    failed = [v for v in sampler.verdicts() if v.status in ('critical', 'fatal')]
+    for verdict in failed:
+        print(f"  ✗ {verdict.name}: {verdict.status}, максимум {verdict.max_value}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
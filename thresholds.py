@@ -0,0 +1,161 @@
+"""
+Проверка показаний датчиков по порогам.
+
+Нормальный диапазон берется из таблицы классов датчиков (thermal_limits.json):
+класс определяется по виду датчика, PhysicalContext и токенам имени. Критический
+и фатальный пороги - собственные UpperThresholdCritical/Fatal и
+LowerThresholdCritical/Fatal датчика из Redfish. Все показания оцениваются
+сразу массивами NumPy: один снимок (вектор по датчикам) или ряд из
+thermal_sampler (матрица время x датчик). Результат - SensorVerdict на датчик.
+"""
+import json
+import os
+
+import numpy as np
+
+from sensor_match import tokenize
+
+DEFAULT_LIMITS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'thermal_limits.json')
+
+MISSING, OK, WARNING, CRITICAL, FATAL = -1, 0, 1, 2, 3
+STATUS_NAMES = {MISSING: 'missing', OK: 'ok', WARNING: 'warning', CRITICAL: 'critical', FATAL: 'fatal'}
+
+
+class SensorClass:
+    """Строка таблицы: совпадение по видам/контекстам/токенам и нормальный диапазон"""
+
+    def __init__(self, name, tokens=(), contexts=(), kinds=(), min=None, max=None):
+        self.name = name
+        self.tokens = set(tokens)
+        self.contexts = set(contexts)
+        self.kinds = set(kinds)
+        self.min = min
+        self.max = max
+
+    def matches(self, sensor):
+        if self.kinds and getattr(sensor, 'kind', None) not in self.kinds:
+            return False
+        if not self.tokens and not self.contexts:
+            return True
+        context = getattr(sensor, 'context', None)
+        return context in self.contexts or bool(self.tokens & set(tokenize(sensor.name)))
+
+
+class Limits:
+    """Пороги набора датчиков в виде массивов (NaN - порог не задан)"""
+
+    FIELDS = ('normal_min', 'normal_max', 'lower_critical', 'upper_critical', 'lower_fatal', 'upper_fatal')
+
+    def __init__(self, names, classes, rows):
+        self.names = names
+        self.classes = classes
+        columns = list(zip(*rows)) if rows else [()] * len(self.FIELDS)
+        for field, column in zip(self.FIELDS, columns):
+            setattr(self, field, np.array(column, dtype=np.float64))
+
+    def for_sensor(self, i):
+        return {field: None if np.isnan(getattr(self, field)[i]) else float(getattr(self, field)[i])
+                for field in self.FIELDS}
+
+
+class LimitsTable:
+    def __init__(self, classes):
+        self.classes = classes
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_LIMITS):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls([SensorClass(item.pop('class'), **item) for item in data['classes']])
+
+    def classify(self, sensor):
+        for sensor_class in self.classes:
+            if sensor_class.matches(sensor):
+                return sensor_class
+        return SensorClass('default')
+
+    def limits(self, sensors):
+        """
+        sensors - объекты с name, kind, context и thresholds
+        ({'UpperThresholdCritical': ...}), например thermal_sampler.SensorInfo
+        """
+        nan = float('nan')
+        classes, rows = [], []
+        for sensor in sensors:
+            sensor_class = self.classify(sensor)
+            thresholds = getattr(sensor, 'thresholds', None) or {}
+            classes.append(sensor_class.name)
+            rows.append((
+                nan if sensor_class.min is None else sensor_class.min,
+                nan if sensor_class.max is None else sensor_class.max,
+                thresholds.get('LowerThresholdCritical', nan),
+                thresholds.get('UpperThresholdCritical', nan),
+                thresholds.get('LowerThresholdFatal', nan),
+                thresholds.get('UpperThresholdFatal', nan),
+            ))
+        return Limits([sensor.name for sensor in sensors], classes, rows)
+
+
+class SensorVerdict:
+    __slots__ = ('name', 'sensor_class', 'status', 'samples', 'min_value', 'max_value',
+                 'warning_samples', 'critical_samples', 'fatal_samples', 'limits')
+
+    def __init__(self, name, sensor_class, status, samples, min_value, max_value,
+                 warning_samples, critical_samples, fatal_samples, limits):
+        self.name = name
+        self.sensor_class = sensor_class
+        self.status = status
+        self.samples = samples
+        self.min_value = min_value
+        self.max_value = max_value
+        self.warning_samples = warning_samples
+        self.critical_samples = critical_samples
+        self.fatal_samples = fatal_samples
+        self.limits = limits
+
+    @property
+    def ok(self):
+        return self.status == 'ok'
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def levels(values, limits):
+    """Уровень каждого показания: MISSING/OK/WARNING/CRITICAL/FATAL, та же форма, что у values"""
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(invalid='ignore'):
+        fatal = (values > limits.upper_fatal) | (values < limits.lower_fatal)
+        critical = (values > limits.upper_critical) | (values < limits.lower_critical)
+        warning = (values > limits.normal_max) | (values < limits.normal_min)
+    result = np.select([np.isnan(values), fatal, critical, warning], [MISSING, FATAL, CRITICAL, WARNING], OK)
+    return result.astype(np.int8)
+
+
+def evaluate(values, limits):
+    """
+    Оценивает снимок (вектор по датчикам) или ряд (матрица время x датчик) и
+    возвращает SensorVerdict на каждый датчик: худший уровень и число отсчетов по уровням.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[np.newaxis, :]
+    level = levels(values, limits)
+    worst = level.max(axis=0) if len(level) else np.full(len(limits.names), MISSING)
+    samples = (level != MISSING).sum(axis=0)
+    warning, critical, fatal = ((level == code).sum(axis=0) for code in (WARNING, CRITICAL, FATAL))
+    present = values[:, samples > 0]
+    minimum = np.full(len(limits.names), np.nan)
+    maximum = np.full(len(limits.names), np.nan)
+    if present.size:
+        minimum[samples > 0] = np.nanmin(present, axis=0)
+        maximum[samples > 0] = np.nanmax(present, axis=0)
+
+    verdicts = []
+    for i, name in enumerate(limits.names):
+        verdicts.append(SensorVerdict(
+            name, limits.classes[i], STATUS_NAMES[int(worst[i])], int(samples[i]),
+            None if np.isnan(minimum[i]) else float(minimum[i]),
+            None if np.isnan(maximum[i]) else float(maximum[i]),
+            int(warning[i]), int(critical[i]), int(fatal[i]), limits.for_sensor(i)))
+    return verdicts
@@ -0,0 +1,103 @@
+"""
+Ожидания для тестов WebUI на основе WebDriverWait/expected_conditions.
+
+Вместо фиксированных time.sleep тест ждет конкретного условия и идет дальше,
+как только оно выполнено. Каждое ожидание записывает фактическое время в
+timings, так что прогон показывает задержки UI, а не прячет их в паузах.
+"""
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+DEFAULT_TIMEOUT = 10
+POLL_FREQUENCY = 0.1
+
+
+class url_left_login:
+    """Условие: адрес страницы больше не содержит login"""
+
+    def __call__(self, driver):
+        url = driver.current_url.lower()
+        return url if "login" not in url else False
+
+
+class text_present:
+    """Условие: на странице есть хотя бы один из текстов (без учета регистра)"""
+
+    def __init__(self, texts):
+        self.texts = [text.lower() for text in texts]
+
+    def __call__(self, driver):
+        page_source = driver.page_source.lower()
+        for text in self.texts:
+            if text in page_source:
+                return text
+        return False
+
+
+class network_idle:
+    """
+    Условие: документ загружен и число загруженных ресурсов (Resource Timing)
+    не менялось idle_time секунд - XHR/fetch SPA завершились.
+    """
+
+    SCRIPT = ("return [document.readyState, "
+              "performance.getEntriesByType('resource').length];")
+
+    def __init__(self, idle_time=0.5):
+        self.idle_time = idle_time
+        self._last_count = None
+        self._since = None
+
+    def __call__(self, driver):
+        ready_state, count = driver.execute_script(self.SCRIPT)
+        now = time.monotonic()
+        if ready_state != "complete" or count != self._last_count:
+            self._last_count = count
+            self._since = now
+            return False
+        return now - self._since >= self.idle_time
+
+
+class UIWaits:
+    """Набор ожиданий для одного драйвера с записью длительности каждого"""
+
+    def __init__(self, driver, timeout=DEFAULT_TIMEOUT, poll_frequency=POLL_FREQUENCY):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.timings = []
+
+    def until(self, name, condition, timeout=None, required=True):
+        """
+        Ждет condition и записывает (name, секунды, выполнено ли).
+        required=False - по таймауту вернуть False вместо TimeoutException.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency).until(condition)
+        except TimeoutException:
+            self.timings.append((name, time.monotonic() - started, False))
+            if required:
+                raise
+            return False
+        self.timings.append((name, time.monotonic() - started, True))
+        return result
+
+    def url_left_login(self, timeout=None, required=False):
+        return self.until("url_left_login", url_left_login(), timeout, required)
+
+    def element_present(self, locator, timeout=None, required=True):
+        return self.until("element_present", EC.presence_of_element_located(locator), timeout, required)
+
+    def text_present(self, texts, timeout=None, required=False):
+        return self.until("text_present", text_present(texts), timeout, required)
+
+    def network_idle(self, idle_time=0.5, timeout=None, required=False):
+        return self.until("network_idle", network_idle(idle_time), timeout, required)
+
+    def total(self):
+        return sum(seconds for _, seconds, _ in self.timings)